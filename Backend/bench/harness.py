@@ -0,0 +1,338 @@
+"""
+Benchmark harness for the generation endpoints.
+
+Drives `/text/generate`, `/questions/generate` and `/models` at a chosen
+concurrency and reports throughput, latency percentiles, status codes and
+English-loop iterations. By default the app runs in-process against the
+stub server from `stub_server`, so no GPU or Groq quota is used; pass
+`--base-url` to benchmark a running deployment instead.
+
+Examples:
+
+    python -m Backend.bench.harness --endpoint text --requests 50 --concurrency 8
+    python -m Backend.bench.harness --endpoint mix --save-baseline main
+    python -m Backend.bench.harness --endpoint mix --compare main --tolerance 0.15
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+import httpx
+from .passages import design_passage
+from .stub_server import StubConfig, start_stub_server
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+ENDPOINTS = {
+    "text": ("POST", "/text/generate"),
+    "questions": ("POST", "/questions/generate"),
+    "models": ("GET", "/models/"),
+}
+LEVELS = ["Basic", "Intermediate", "Advanced"]
+# Metrics where a larger value is a regression; throughput is checked the other way
+LOWER_IS_BETTER = ["p50", "p95", "p99", "error_rate", "mean_iterations"]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Samples
+        fraction: Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        The percentile, or 0.0 without samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+class EndpointResult:
+    """Latencies, status codes and iterations collected for one endpoint."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.iterations: List[int] = []
+
+    def add(self, status: str, latency: float, body: Any) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status.startswith("2"):
+            self.latencies.append(latency)
+            if isinstance(body, dict) and body.get("iterations") is not None:
+                self.iterations.append(body["iterations"])
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        total = sum(self.statuses.values())
+        ok = len(self.latencies)
+        return {
+            "requests": total,
+            "ok": ok,
+            "throughput": ok / elapsed if elapsed else 0.0,
+            "error_rate": (total - ok) / total if total else 0.0,
+            "p50": percentile(self.latencies, 0.50),
+            "p90": percentile(self.latencies, 0.90),
+            "p95": percentile(self.latencies, 0.95),
+            "p99": percentile(self.latencies, 0.99),
+            "max": max(self.latencies, default=0.0),
+            "mean_iterations": sum(self.iterations) / len(self.iterations) if self.iterations else None,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+def build_request(endpoint: str, index: int, args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    """
+    Request body for the `index`-th call to an endpoint.
+
+    Args:
+        endpoint: "text", "questions" or "models"
+        index: Sequence number of the call
+        args: Parsed command line options
+
+    Returns:
+        The JSON body, or None for GET endpoints
+    """
+    if endpoint == "models":
+        return None
+    level = LEVELS[index % len(LEVELS)]
+    # Repeat topics when cache hits should be part of the measurement
+    topic = f"Benchmark topic {index % args.unique_topics if args.unique_topics else index}"
+    if endpoint == "text":
+        return {"topic": topic, "language": args.language, "level": level, "style": "Formal",
+                "provider": args.provider, "model": args.model, "bypass_cache": args.bypass_cache,
+                "reuse": args.reuse}
+    return {"generated_text": design_passage(9, 250, seed=index % 50), "num_questions": args.num_questions,
+            "language": args.language, "choices_num": 4, "provider": args.provider,
+            "model": args.model, "bypass_cache": args.bypass_cache}
+
+
+async def drive(client: httpx.AsyncClient, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Send the configured requests with bounded concurrency.
+
+    Args:
+        client: Client pointed at the app
+        args: Parsed command line options
+
+    Returns:
+        Per-endpoint summaries and the wall-clock time of the run
+    """
+    names = list(ENDPOINTS) if args.endpoint == "mix" else [args.endpoint]
+    plan = list(itertools.islice(itertools.cycle(names), args.requests))
+    results = {name: EndpointResult() for name in names}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def call(index: int, endpoint: str) -> None:
+        method, path = ENDPOINTS[endpoint]
+        body = build_request(endpoint, index, args)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, timeout=args.timeout)
+                status = str(response.status_code)
+                data = response.json() if response.status_code == 200 else None
+            except (httpx.HTTPError, json.JSONDecodeError) as e:
+                status, data = type(e).__name__, None
+            results[endpoint].add(status, time.perf_counter() - started, data)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(index, endpoint) for index, endpoint in enumerate(plan)))
+    elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "endpoints": {name: result.summary(elapsed) for name, result in results.items()}}
+
+
+async def run_in_process(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Start the stub server, point the app at it and benchmark the app in-process.
+
+    Args:
+        args: Parsed command line options
+
+    Returns:
+        The benchmark report, including the stub's call counters
+    """
+    config = StubConfig(
+        first_token_latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        cold_load_seconds=args.cold_load_seconds,
+        fog_bias=args.fog_bias,
+        groq_tokens_per_minute=args.groq_tokens_per_minute,
+        ollama_parallel=args.ollama_parallel,
+        seed=args.seed,
+    )
+    # One stub per Ollama host; the first also serves Groq
+    stubs = [await start_stub_server(config.model_copy(update={"seed": config.seed + index}))
+             for index in range(max(1, args.ollama_hosts))]
+    runner, stub_url = stubs[0]
+    # Settings are read at import time, so the environment must be set first
+    os.environ["OLLAMA_HOST"] = stub_url
+    if args.ollama_hosts > 1:
+        os.environ["OLLAMA_HOSTS"] = json.dumps([url for _, url in stubs])
+    os.environ["GROQ_BASE_URL"] = f"{stub_url}/openai/v1"
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    os.environ["CALIBRATION_SQLITE_PATH"] = ""
+    os.environ["CACHE_SQLITE_PATH"] = ""
+    os.environ["LIBRARY_SQLITE_PATH"] = ""
+    if args.static_calibration:
+        os.environ["CALIBRATION_ENABLED"] = "false"
+    from Backend.main import app
+
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                report = await drive(client, args)
+        report["stub"] = runner.app["llm"].stats.as_dict()
+        if len(stubs) > 1:
+            report["stub_hosts"] = [stub.app["llm"].stats.as_dict() for stub, _ in stubs]
+        return report
+    finally:
+        for stub, _ in stubs:
+            await stub.cleanup()
+
+
+async def run_external(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Benchmark an already running deployment.
+
+    Args:
+        args: Parsed command line options
+
+    Returns:
+        The benchmark report
+    """
+    async with httpx.AsyncClient(base_url=args.base_url) as client:
+        return await drive(client, args)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    List the metrics that got worse than the baseline by more than `tolerance`.
+
+    Args:
+        report: The current benchmark report
+        baseline: A saved report
+        tolerance: Allowed relative change (0.1 = 10%)
+
+    Returns:
+        One line per regression; empty if there are none
+    """
+    regressions = []
+    for endpoint, current in report["endpoints"].items():
+        previous = baseline["endpoints"].get(endpoint)
+        if not previous:
+            continue
+        for metric in LOWER_IS_BETTER:
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            # Small absolute slack keeps near-zero metrics (error rates) from flapping
+            if new > old * (1 + tolerance) + 0.01:
+                regressions.append(f"{endpoint}.{metric}: {old:.3f} -> {new:.3f}")
+        old, new = previous.get("throughput"), current.get("throughput")
+        if old and new < old * (1 - tolerance):
+            regressions.append(f"{endpoint}.throughput: {old:.2f} -> {new:.2f} req/s")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Elapsed: {report['elapsed']:.2f}s")
+    header = f"{'endpoint':<10} {'ok/total':>9} {'req/s':>7} {'p50':>7} {'p90':>7} {'p95':>7} {'p99':>7} {'max':>7} {'iters':>6}  statuses"
+    print(header)
+    for name, summary in report["endpoints"].items():
+        iterations = summary["mean_iterations"]
+        print(f"{name:<10} {summary['ok']:>4}/{summary['requests']:<4} {summary['throughput']:>7.2f} "
+              f"{summary['p50']:>7.3f} {summary['p90']:>7.3f} {summary['p95']:>7.3f} {summary['p99']:>7.3f} "
+              f"{summary['max']:>7.3f} {'-' if iterations is None else f'{iterations:.2f}':>6}  {summary['statuses']}")
+    if "stub" in report:
+        print(f"Stub: {report['stub']}")
+    for index, stats in enumerate(report.get("stub_hosts", [])):
+        print(f"Stub host {index}: {stats}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the reading passage API")
+    parser.add_argument("--endpoint", choices=[*ENDPOINTS, "mix"], default="mix")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--provider", default="ollama")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--language", default="English")
+    parser.add_argument("--num-questions", type=int, default=5)
+    parser.add_argument("--bypass-cache", action="store_true", help="Skip the result cache on every request")
+    parser.add_argument("--reuse", action="store_true",
+                        help="Let text requests be served from the passage library")
+    parser.add_argument("--unique-topics", type=int, default=0,
+                        help="Cycle through this many topics (0 makes every topic unique)")
+    parser.add_argument("--static-calibration", action="store_true",
+                        help="Disable adaptive calibration to measure the static English loop")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--base-url", default=None, help="Benchmark a running server instead of the stub")
+    # Stub behaviour
+    parser.add_argument("--latency", default="lognormal:0.3:0.3",
+                        help="First token latency: fixed:S, uniform:A:B or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--cold-load-seconds", type=float, default=2.0)
+    parser.add_argument("--fog-bias", type=float, default=4.0,
+                        help="How far above the level range the stub model writes by default")
+    parser.add_argument("--groq-tokens-per-minute", type=int, default=60000,
+                        help="Token limit the stub reports in Groq's x-ratelimit headers")
+    parser.add_argument("--ollama-hosts", type=int, default=1,
+                        help="Stub Ollama servers to start and balance across (sets OLLAMA_HOSTS)")
+    parser.add_argument("--ollama-parallel", type=int, default=0,
+                        help="Generations each stub Ollama server runs at once (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=0)
+    # Baselines
+    parser.add_argument("--save-baseline", metavar="NAME", default=None)
+    parser.add_argument("--compare", metavar="NAME", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_external(args) if args.base_url else run_in_process(args))
+    report["options"] = {key: value for key, value in vars(args).items()
+                         if key not in ("save_baseline", "compare", "json")}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline to {path}")
+
+    if args.compare:
+        path = BASELINE_DIR / f"{args.compare}.json"
+        if not path.exists():
+            print(f"Error: No baseline named '{args.compare}' in {BASELINE_DIR}")
+            return 2
+        regressions = compare(report, json.loads(path.read_text()), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions against baseline '{args.compare}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Import-time budget check for the API.
+
+Imports `Backend.main` in fresh interpreters with `-X importtime`, reports
+the best total and the slowest modules, and fails if the total exceeds the
+budget or if a provider SDK or scoring library is imported eagerly (those
+are loaded on first use).
+
+Examples:
+
+    python -m Backend.bench.import_time
+    python -m Backend.bench.import_time --budget 0.9 --runs 5
+"""
+from typing import List, Optional, Tuple
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+# Loaded by the provider backends and the scorer when first needed
+LAZY_MODULES = ["ollama", "aiohttp", "httpx", "textstat", "nltk", "pyphen", "requests"]
+_PROBE = "import sys, Backend.main; print(','.join(sorted(m for m in {modules} if m in sys.modules)))"
+
+
+def measure(modules: List[str]) -> Tuple[float, List[Tuple[str, float]], List[str]]:
+    """
+    Import the app once in a fresh interpreter.
+
+    Args:
+        modules: Modules that must not be imported by the app
+
+    Returns:
+        Total import time of `Backend.main` in seconds, the modules it
+        imports directly with their cumulative seconds, and the listed
+        modules that were imported anyway
+    """
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    env.setdefault("GROQ_API_KEY", "import-time-check")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(modules=modules)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+    total = 0.0
+    children: List[Tuple[str, float]] = []
+    pending: List[Tuple[str, float]] = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", children first
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        seconds = int(cumulative_us) / 1e6
+        if depth == 1:
+            pending.append((name.strip(), seconds))
+        elif depth == 0:
+            if name.strip() == "Backend.main":
+                total, children = seconds, pending
+            pending = []
+    eager = [name for name in result.stdout.strip().split(",") if name]
+    return total, sorted(children, key=lambda item: item[1], reverse=True), eager
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check the import time of the API")
+    parser.add_argument("--budget", type=float, default=0.9,
+                        help="Maximum seconds to import Backend.main (best of --runs)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    runs = [measure(LAZY_MODULES) for _ in range(max(1, args.runs))]
+    best, children, _ = min(runs, key=lambda run: run[0])
+    eager = sorted({name for _, _, names in runs for name in names})
+
+    print(f"Import time of Backend.main: {best:.3f}s (best of {len(runs)}, budget {args.budget:.3f}s)")
+    print("Slowest modules imported by the app (cumulative):")
+    for name, seconds in children[:args.top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    failed = False
+    if eager:
+        print(f"Error: Imported at startup instead of on first use: {', '.join(eager)}")
+        failed = True
+    if best > args.budget:
+        print(f"Error: Import time {best:.3f}s exceeds the budget of {args.budget:.3f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
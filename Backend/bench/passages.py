@@ -0,0 +1,75 @@
+from typing import List, Optional
+import random
+
+# One-syllable words that never count as difficult
+SIMPLE_WORDS = [
+    "the", "cat", "sat", "on", "a", "warm", "mat", "and", "dog", "ran", "to", "park",
+    "sun", "was", "high", "we", "saw", "birds", "fly", "near", "old", "tree", "kids",
+    "played", "with", "ball", "in", "green", "grass", "wind", "blew", "through", "town",
+    "fish", "swam", "cold", "lake", "boat", "moved", "slow", "light", "fell", "road",
+]
+
+# Words of three or more syllables that are not on the easy word list
+COMPLEX_WORDS = [
+    "information", "particularly", "development", "organization", "environmental",
+    "administration", "considerable", "contemporary", "infrastructure", "sophisticated",
+    "significantly", "responsibility", "international", "characteristic", "approximately",
+    "communication", "interpretation", "extraordinary", "manufacturing", "consequently",
+]
+
+
+def design_passage(target_fog: float,
+                   words: int,
+                   seed: Optional[int] = None) -> str:
+    """
+    Build a passage whose Gunning Fog score is close to `target_fog`.
+
+    Gunning Fog is 0.4 * (words per sentence + 100 * difficult word share),
+    so the passage is assembled from one-syllable words and a controlled
+    share of long words, in sentences of a fixed length.
+
+    Args:
+        target_fog: The designed Gunning Fog score
+        words: Approximate passage length in words
+        seed: Seed for reproducible word choice
+
+    Returns:
+        The passage, split into paragraphs of about five sentences
+    """
+    rng = random.Random(seed)
+    target_fog = max(1.0, target_fog)
+    # Spend the score on long words first (up to a quarter), the rest on sentence length
+    complex_share = min(0.25, max(0.0, (target_fog - 3) / 60))
+    sentence_length = max(3, round(target_fog / 0.4 - 100 * complex_share))
+
+    sentences: List[str] = []
+    produced = 0
+    while produced < words:
+        sentence = [
+            rng.choice(COMPLEX_WORDS) if rng.random() < complex_share else rng.choice(SIMPLE_WORDS)
+            for _ in range(sentence_length)
+        ]
+        sentence[0] = sentence[0].capitalize()
+        sentences.append(" ".join(sentence) + ".")
+        produced += sentence_length
+
+    paragraphs = [" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+    return "\n\n".join(paragraphs)
+
+
+def designed_fog(passage: str) -> float:
+    """
+    Gunning Fog score of a designed passage, computed without textstat.
+
+    Args:
+        passage: Text from `design_passage`
+
+    Returns:
+        0.4 * (words per sentence + 100 * long word share)
+    """
+    sentences = [s for s in passage.replace("\n", " ").split(".") if s.strip()]
+    words = passage.replace(".", " ").split()
+    if not words or not sentences:
+        return 0.0
+    long_words = sum(1 for word in words if word.lower() in COMPLEX_WORDS)
+    return 0.4 * (len(words) / len(sentences) + 100 * long_words / len(words))
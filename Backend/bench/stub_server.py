@@ -0,0 +1,389 @@
+"""
+Local stand-in for the Ollama and Groq APIs, used by the benchmark harness.
+
+Serves the Ollama `/api/generate`, `/api/chat`, `/api/tags` and `/api/ps`
+endpoints and the Groq (OpenAI-compatible) `/openai/v1/chat/completions`
+and `/openai/v1/models` endpoints, with configurable latency, token rate,
+error and 429 injection. Passages are built by `design_passage`, so their
+Gunning Fog score is known: the stub plays a model that misses the level
+range by `fog_bias` and moves by `fog_step` per simpler/more complex note.
+
+Run standalone with:
+
+    python -m Backend.bench.stub_server --port 8765
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import re
+import time
+from datetime import datetime, timezone
+from aiohttp import web
+from pydantic import BaseModel
+from Backend.core.prompts import LEVEL_RANGES
+from .passages import design_passage
+
+
+class LatencyDistribution:
+    """
+    Samples latencies from a spec string.
+
+    "fixed:0.5", "uniform:0.2:1.0" and "lognormal:0.5:0.4" (median and sigma)
+    are supported; all values are seconds.
+    """
+
+    def __init__(self, spec: str):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(param) for param in params]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma)
+
+
+class StubConfig(BaseModel):
+    first_token_latency: str = "lognormal:0.3:0.3"
+    tokens_per_second: float = 200.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    cold_load_seconds: float = 2.0
+    fog_bias: float = 4.0
+    fog_step: float = 3.0
+    fog_noise: float = 1.0
+    seed: int = 0
+    ollama_models: List[str] = ["gemma3:12b", "llama3.2:3b"]
+    # Ollama generations served at once, like OLLAMA_NUM_PARALLEL on one GPU (0 = unlimited)
+    ollama_parallel: int = 0
+    groq_models: List[str] = ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"]
+    groq_requests_per_day: int = 14400
+    groq_tokens_per_minute: int = 60000
+
+
+class StubStats:
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self.errors = 0
+        self.rate_limited = 0
+        self.cold_loads = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"calls": dict(self.calls), "errors": self.errors,
+                "rate_limited": self.rate_limited, "cold_loads": self.cold_loads}
+
+
+_NOTE_SHIFTS = [
+    ("which was too complex", -1.0),
+    ("which was too simple", 1.0),
+    ("below the usual complexity", -2.0),
+    ("simpler end of the level", -1.0),
+    ("more complex end of the level", 1.0),
+    ("above the usual complexity", 2.0),
+]
+_LEVEL_RE = re.compile(r"Create a (\w+) level reading passage")
+_WORDS_RE = re.compile(r"Word Count: (?:Approximately )?(\d+)-(\d+) words")
+_QUESTIONS_RE = re.compile(r"generate exactly (\d+) multiple-choice")
+_CHOICES_RE = re.compile(r"exactly (\d+) plausible answer choices")
+
+
+class StubLLM:
+    """The emulated model behind both APIs."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.latency = LatencyDistribution(config.first_token_latency)
+        self.rng = random.Random(config.seed)
+        self.stats = StubStats()
+        self.loaded: Dict[str, float] = {}
+        self._groq_window: List[Tuple[float, int]] = []
+        self._groq_requests = 0
+        self._slots = asyncio.Semaphore(config.ollama_parallel) if config.ollama_parallel > 0 else None
+
+    def count(self, endpoint: str) -> None:
+        self.stats.calls[endpoint] = self.stats.calls.get(endpoint, 0) + 1
+
+    def inject_failure(self) -> Optional[int]:
+        """Status code of an injected failure, or None."""
+        roll = self.rng.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats.rate_limited += 1
+            return 429
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self.stats.errors += 1
+            return 503
+        return None
+
+    async def load(self, model: str) -> float:
+        """Emulate loading a model into memory; returns the load time."""
+        if model in self.loaded:
+            return 0.001
+        self.stats.cold_loads += 1
+        await asyncio.sleep(self.config.cold_load_seconds)
+        self.loaded[model] = time.time()
+        return self.config.cold_load_seconds
+
+    def slot(self):
+        """Held while an Ollama generation runs."""
+        return self._slots or contextlib.nullcontext()
+
+    def respond(self, prompt: str, json_mode: bool) -> str:
+        """Build the completion for a prompt."""
+        questions = _QUESTIONS_RE.search(prompt)
+        if json_mode or questions:
+            count = int(questions.group(1)) if questions else 5
+            choices = _CHOICES_RE.search(prompt)
+            return self._questions(count, int(choices.group(1)) if choices else 4)
+
+        level = _LEVEL_RE.search(prompt)
+        low, high = LEVEL_RANGES.get(level.group(1).capitalize() if level else "", (6, 12))
+        words = _WORDS_RE.search(prompt)
+        length = (int(words.group(1)) + int(words.group(2))) // 2 if words else 200
+        target = (low + high) / 2 + self.config.fog_bias
+        for marker, shift in _NOTE_SHIFTS:
+            if marker in prompt:
+                target += shift * self.config.fog_step
+        target += self.rng.gauss(0, self.config.fog_noise)
+        return design_passage(target, length, seed=self.rng.randrange(1 << 30))
+
+    def _questions(self, count: int, choices: int) -> str:
+        questions = []
+        for index in range(count):
+            options = [f"Option {chr(65 + j)} for question {index + 1}" for j in range(choices)]
+            questions.append({
+                "question": f"Stub question {index + 1} number {self.rng.randrange(1 << 20)}?",
+                "choices": options,
+                "answer": options[self.rng.randrange(choices)],
+            })
+        return json.dumps({"questions": questions})
+
+    def chunks(self, text: str) -> List[str]:
+        # One word per token is close enough for pacing
+        return re.findall(r"\S+\s*", text)
+
+    async def first_token(self) -> None:
+        await asyncio.sleep(self.latency.sample(self.rng))
+
+    async def token_gap(self) -> None:
+        if self.config.tokens_per_second > 0:
+            await asyncio.sleep(1 / self.config.tokens_per_second)
+
+    def generation_seconds(self, text: str) -> float:
+        if self.config.tokens_per_second <= 0:
+            return 0.0
+        return len(self.chunks(text)) / self.config.tokens_per_second
+
+    async def full_response_delay(self, text: str) -> None:
+        await self.first_token()
+        await asyncio.sleep(self.generation_seconds(text))
+
+    def groq_headers(self, tokens: int) -> Dict[str, str]:
+        now = time.time()
+        self._groq_requests += 1
+        self._groq_window = [(at, used) for at, used in self._groq_window if now - at < 60]
+        self._groq_window.append((now, tokens))
+        used = sum(used for _, used in self._groq_window)
+        return {
+            "x-ratelimit-limit-requests": str(self.config.groq_requests_per_day),
+            "x-ratelimit-remaining-requests": str(max(0, self.config.groq_requests_per_day - self._groq_requests)),
+            "x-ratelimit-reset-requests": "86400s",
+            "x-ratelimit-limit-tokens": str(self.config.groq_tokens_per_minute),
+            "x-ratelimit-remaining-tokens": str(max(0, self.config.groq_tokens_per_minute - used)),
+            "x-ratelimit-reset-tokens": "60s",
+        }
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _prompt_of(body: Dict[str, Any]) -> str:
+    if "prompt" in body:
+        return body.get("prompt") or ""
+    return "\n".join(message.get("content", "") for message in body.get("messages", []))
+
+
+def create_app(config: Optional[StubConfig] = None) -> web.Application:
+    """
+    Build the stub server application.
+
+    Args:
+        config: Stub behaviour (defaults to StubConfig())
+
+    Returns:
+        The aiohttp application; `app["llm"]` holds the StubLLM and its stats
+    """
+    llm = StubLLM(config or StubConfig())
+    app = web.Application()
+    app["llm"] = llm
+
+    async def ollama_call(request: web.Request, chat: bool) -> web.StreamResponse:
+        body = await request.json()
+        llm.count("ollama.chat" if chat else "ollama.generate")
+        model = body.get("model", "")
+        failure = llm.inject_failure()
+        if failure:
+            return web.json_response({"error": "stub failure"}, status=failure)
+
+        load_seconds = await llm.load(model)
+        prompt = _prompt_of(body)
+        if not chat and not prompt:
+            # Preload request: load the model and return at once
+            return web.json_response({"model": model, "created_at": _now(), "response": "", "done": True,
+                                      "load_duration": int(load_seconds * 1e9)})
+        text = llm.respond(prompt, body.get("format") == "json")
+
+        def part(content: str, done: bool) -> Dict[str, Any]:
+            data: Dict[str, Any] = {"model": model, "created_at": _now(), "done": done}
+            if chat:
+                data["message"] = {"role": "assistant", "content": content}
+            else:
+                data["response"] = content
+            if done:
+                data["load_duration"] = int(load_seconds * 1e9)
+                data["eval_count"] = len(llm.chunks(text))
+                data["eval_duration"] = int(llm.generation_seconds(text) * 1e9)
+            return data
+
+        async with llm.slot():
+            if not body.get("stream", True):
+                await llm.full_response_delay(text)
+                return web.json_response(part(text, True))
+
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+            await llm.first_token()
+            try:
+                for chunk in llm.chunks(text):
+                    await response.write((json.dumps(part(chunk, False)) + "\n").encode())
+                    await llm.token_gap()
+                await response.write((json.dumps(part("", True)) + "\n").encode())
+                await response.write_eof()
+            except ConnectionResetError:
+                # The client stopped reading (e.g. an early-aborted attempt)
+                llm.count("aborted")
+            return response
+
+    async def ollama_generate(request: web.Request) -> web.StreamResponse:
+        return await ollama_call(request, chat=False)
+
+    async def ollama_chat(request: web.Request) -> web.StreamResponse:
+        return await ollama_call(request, chat=True)
+
+    async def ollama_tags(request: web.Request) -> web.Response:
+        llm.count("ollama.tags")
+        return web.json_response({"models": [
+            {"model": name, "name": name, "modified_at": _now(), "size": 4_000_000_000}
+            for name in llm.config.ollama_models
+        ]})
+
+    async def ollama_ps(request: web.Request) -> web.Response:
+        llm.count("ollama.ps")
+        return web.json_response({"models": [
+            {"model": name, "name": name, "expires_at": _now()} for name in llm.loaded
+        ]})
+
+    async def groq_chat(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        llm.count("groq.chat")
+        failure = llm.inject_failure()
+        if failure == 429:
+            return web.json_response({"error": {"message": "Rate limit reached"}}, status=429,
+                                     headers={"retry-after": str(llm.config.retry_after), **llm.groq_headers(0)})
+        if failure:
+            return web.json_response({"error": {"message": "stub failure"}}, status=failure)
+
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        prompt = _prompt_of(body)
+        text = llm.respond(prompt, json_mode)
+        headers = llm.groq_headers(len(prompt) // 4 + len(llm.chunks(text)))
+
+        if not body.get("stream"):
+            await llm.full_response_delay(text)
+            return web.json_response({
+                "id": "stub", "object": "chat.completion", "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"completion_tokens": len(llm.chunks(text)), "completion_time": llm.generation_seconds(text)},
+            }, headers=headers)
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", **headers})
+        await response.prepare(request)
+        await llm.first_token()
+        try:
+            for chunk in llm.chunks(text):
+                data = {"choices": [{"index": 0, "delta": {"content": chunk}}]}
+                await response.write(f"data: {json.dumps(data)}\n\n".encode())
+                await llm.token_gap()
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+        except ConnectionResetError:
+            llm.count("aborted")
+        return response
+
+    async def groq_models(request: web.Request) -> web.Response:
+        llm.count("groq.models")
+        return web.json_response({"object": "list", "data": [
+            {"id": name, "object": "model", "created": 0, "owned_by": "stub", "context_window": 8192}
+            for name in llm.config.groq_models
+        ]})
+
+    async def stub_stats(request: web.Request) -> web.Response:
+        return web.json_response(llm.stats.as_dict())
+
+    app.router.add_post("/api/generate", ollama_generate)
+    app.router.add_post("/api/chat", ollama_chat)
+    app.router.add_get("/api/tags", ollama_tags)
+    app.router.add_get("/api/ps", ollama_ps)
+    app.router.add_post("/openai/v1/chat/completions", groq_chat)
+    app.router.add_get("/openai/v1/models", groq_models)
+    app.router.add_get("/stub/stats", stub_stats)
+    return app
+
+
+async def start_stub_server(config: Optional[StubConfig] = None,
+                            host: str = "127.0.0.1",
+                            port: int = 0) -> Tuple[web.AppRunner, str]:
+    """
+    Start the stub server in the running event loop.
+
+    Args:
+        config: Stub behaviour
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+
+    Returns:
+        (runner, base URL); call `await runner.cleanup()` to stop it
+    """
+    runner = web.AppRunner(create_app(config))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub Ollama/Groq server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    for name, field in StubConfig.model_fields.items():
+        if field.annotation in (int, float, str):
+            parser.add_argument(f"--{name.replace('_', '-')}", type=field.annotation, default=field.default)
+    args = parser.parse_args()
+    config = StubConfig(**{name: getattr(args, name) for name in StubConfig.model_fields if hasattr(args, name)})
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
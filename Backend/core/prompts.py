@@ -7,6 +7,9 @@ LEVEL_RANGES = {
     "Advanced": (12, 25),
 }
 
+# Prompt nudges from simplest to most complex; None is the plain prompt
+NUDGES = ["much simpler", "simpler", None, "more complex", "much more complex"]
+
 WORDS_RANGES = {
     "Basic": "150-250",
     "Intermediate": "250-400",
@@ -21,6 +24,7 @@ def build_english_prompt(
     style: str,
     previous_score: Optional[float] = None,
     previous_text: Optional[str] = None,
+    nudge: Optional[str] = None,
 ) -> str:
     prompt = f"""
     Create a {level.lower()} level reading passage in English about "{topic}" with a {style.lower()} tone.
@@ -40,6 +44,14 @@ def build_english_prompt(
             prompt += f"\n- NOTE: The previous attempt scored {previous_score:.2f} (Gunning Fog), which was too complex for the target range {low}-{high}. Please generate a significantly simpler text."
         else:
             prompt += f"\n- NOTE: The previous attempt scored {previous_score:.2f} (Gunning Fog). Aim closer to the middle of the target range {low}-{high}."
+    if nudge == "much simpler":
+        prompt += "\n- NOTE: Write clearly below the usual complexity of the level: use short sentences and avoid words of three or more syllables wherever possible."
+    elif nudge == "simpler":
+        prompt += "\n- NOTE: Lean towards the simpler end of the level: prefer shorter sentences and fewer multi-syllable words."
+    elif nudge == "more complex":
+        prompt += "\n- NOTE: Lean towards the more complex end of the level: prefer longer sentences and richer vocabulary."
+    elif nudge == "much more complex":
+        prompt += "\n- NOTE: Write clearly above the usual complexity of the level: use long, multi-clause sentences and precise, multi-syllable vocabulary."
     if previous_text:
         prompt += f"\n\nHere is the previous generated text for reference:\n---\n{previous_text}\n---\nPlease use this as a reference and adjust the new passage accordingly."
     return prompt.strip()
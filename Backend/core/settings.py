@@ -1,21 +1,172 @@
 # app/core/settings.py
 
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
-import os
-print("Current working directory:", os.getcwd())
-print("GROQ_API_KEY set in environment:", "GROQ_API_KEY" in os.environ)
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# Default location of the SQLite files, next to the Backend package whatever the working directory
+DATA_DIR = Path(__file__).resolve().parent.parent
 
 
 class Settings(BaseSettings):
     OLLAMA_PROVIDER: str = "ollama"
     OLLAMA_MODEL: str = "gemma3:12b"
     GROQ_MODEL: str = "llama-3.1-8b-instant"
-    GROQ_API_KEY: str = GROQ_API_KEY
+    GROQ_API_KEY: Optional[str] = None
+    GROQ_BASE_URL: str = "https://api.groq.com/openai/v1"
+
+    # Extra provider backends, imported on first use: name -> "module:Class" or
+    # "module:Class@DEFAULT_MODEL_SETTING" (problems are reported at startup)
+    PROVIDER_BACKENDS: Dict[str, str] = {}
+
+    # Shared HTTP client (connection pool used for all Groq calls)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_TIMEOUT: float = 120.0
+
+    # Shared Ollama client (None falls back to the OLLAMA_HOST env var / localhost)
+    OLLAMA_HOST: Optional[str] = None
+    OLLAMA_MAX_CONNECTIONS: int = 20
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OLLAMA_TIMEOUT: float = 300.0
+
+    # Ollama host pool (None uses OLLAMA_HOST alone): calls go to the least-loaded
+    # healthy host, counting a host without the model loaded as OLLAMA_COLD_HOST_PENALTY
+    # calls busier. Hosts failing a health probe or a call are ejected for a backoff
+    # starting at OLLAMA_EJECT_SECONDS
+    OLLAMA_HOSTS: Optional[List[str]] = None
+    OLLAMA_HEALTH_CHECK_INTERVAL: float = 5.0
+    OLLAMA_HEALTH_CHECK_TIMEOUT: float = 2.0
+    OLLAMA_EJECT_SECONDS: float = 10.0
+    OLLAMA_MAX_EJECT_SECONDS: float = 300.0
+    OLLAMA_COLD_HOST_PENALTY: float = 2.0
+
+    # Ollama model residency: models loaded at startup (None preloads OLLAMA_MODEL),
+    # how long each model stays loaded after a call, and swap-aware scheduling
+    OLLAMA_PRELOAD_MODELS: Optional[List[str]] = None
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    OLLAMA_KEEP_ALIVE_PER_MODEL: Dict[str, str] = {}
+    OLLAMA_MAX_RESIDENT_MODELS: int = 1
+    OLLAMA_SWITCH_AFTER: int = 8
+    OLLAMA_SWAP_MAX_WAIT: float = 30.0
+    OLLAMA_RESIDENCY_POLL_INTERVAL: float = 15.0
+    # A load_duration above this (seconds) counts as a cold load
+    OLLAMA_COLD_LOAD_THRESHOLD: float = 1.0
+
+    # Candidates generated concurrently per English calibration round, per provider.
+    # 1 keeps the strictly sequential loop.
+    SPECULATIVE_CANDIDATES: Dict[str, int] = {"ollama": 1, "groq": 3}
+
+    # Abandon an English attempt while it streams once its running Gunning Fog
+    # score is confidently outside the level range or it overruns the word budget
+    EARLY_ABORT_ENABLED: bool = True
+    EARLY_ABORT_MIN_WORDS: int = 100
+    EARLY_ABORT_MARGIN: float = 3.0
+    EARLY_ABORT_WORD_SLACK: float = 1.25
+
+    # Adaptive calibration of the English loop: learned nudge/temperature per
+    # model, level and style (set CALIBRATION_ENABLED=false to measure the static loop),
+    # persisted in CALIBRATION_SQLITE_PATH (None keeps it in memory)
+    CALIBRATION_ENABLED: bool = True
+    CALIBRATION_SQLITE_PATH: Optional[str] = str(DATA_DIR / "calibration.sqlite3")
+    CALIBRATION_MIN_SAMPLES: int = 3
+    CALIBRATION_MIN_TEMPERATURE: float = 0.4
+
+    # Passage library: accepted passages (English ones inside the level range) kept in
+    # SQLite with an FTS5 index (None keeps it in memory). Requests with reuse=true are
+    # served a stored passage instead of running the LLM when the content words of one
+    # topic all appear in the other and make up at least LIBRARY_MIN_TOPIC_SIMILARITY
+    # (0-1) of their combined words ("Active volcanoes" ~ "Volcanoes" scores 0.5)
+    LIBRARY_ENABLED: bool = True
+    LIBRARY_SQLITE_PATH: Optional[str] = str(DATA_DIR / "library.sqlite3")
+    LIBRARY_MIN_TOPIC_SIMILARITY: float = 0.5
+    LIBRARY_SEARCH_LIMIT: int = 20
+
+    # Hedged requests: a call to a provider/model that has not answered within its
+    # tracked HEDGE_QUANTILE latency is duplicated to its secondary in HEDGE_TARGETS
+    # ("provider" or "provider/model" on both sides, e.g. {"groq": "ollama/gemma3:12b"})
+    # and the first answer wins. At most HEDGE_MAX_RATE of the calls are hedged.
+    HEDGE_ENABLED: bool = False
+    HEDGE_TARGETS: Dict[str, str] = {}
+    HEDGE_QUANTILE: float = 0.95
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_MIN_DELAY: float = 0.5
+    HEDGE_MAX_RATE: float = 0.1
+    HEDGE_BURST: float = 3.0
+    HEDGE_WINDOW: int = 200
+
+    # Background pre-generation: while a provider has nothing running or queued and has
+    # had no request for PREWARM_IDLE_SECONDS, passages and question sets are generated at
+    # background priority for PREWARM_COMBINATIONS (dicts with topic, level and optionally
+    # language, style, provider, model, num_questions, choices_num) and for the most
+    # requested combinations, at most PREWARM_MAX_JOBS_PER_HOUR generations per hour.
+    # Request popularity decays with PREWARM_HALF_LIFE and is tracked even when disabled
+    PREWARM_ENABLED: bool = False
+    PREWARM_COMBINATIONS: List[Dict[str, Any]] = []
+    PREWARM_INTERVAL: float = 5.0
+    PREWARM_IDLE_SECONDS: float = 10.0
+    PREWARM_MAX_JOBS_PER_HOUR: int = 30
+    PREWARM_TOP_COMBINATIONS: int = 20
+    PREWARM_MIN_REQUESTS: float = 1.5
+    PREWARM_HALF_LIFE: float = 3600.0
+    # Also warm the other levels of a trending topic, and this many question shapes per passage
+    PREWARM_EXPAND_LEVELS: bool = True
+    PREWARM_QUESTION_SETS: int = 1
+
+    # Result cache for text and question generation
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 512
+    CACHE_TTL_SECONDS: float = 24 * 3600
+    # Optional SQLite file for a cache tier that survives restarts
+    CACHE_SQLITE_PATH: Optional[str] = None
+
+    # Question generation: questions per concurrent shard, per provider, and the
+    # similarity (0-1) above which two questions count as duplicates
+    QUESTION_SHARD_SIZE: Dict[str, int] = {"ollama": 10, "groq": 5}
+    QUESTION_DEDUP_SIMILARITY: float = 0.85
+
+    # Model catalogue served by /models
+    MODEL_CATALOGUE_TTL: float = 300.0
+    MODEL_CATALOGUE_REFRESH_INTERVAL: float = 60.0
+    MODEL_CATALOGUE_FETCH_TIMEOUT: float = 5.0
+    MODEL_CATALOGUE_MAX_BACKOFF: float = 600.0
+
+    # Batch endpoints: concurrent items per provider and maximum batch size
+    BATCH_CONCURRENCY: Dict[str, int] = {"ollama": 2, "groq": 8}
+    BATCH_MAX_ITEMS: int = 500
+
+    # Admission control per provider/model: concurrent generations and wait queue size
+    # (per server: multiplied by the number of OLLAMA_HOSTS for Ollama)
+    ADMISSION_MAX_CONCURRENT: Dict[str, int] = {"ollama": 2, "groq": 16}
+    ADMISSION_MAX_QUEUE: Dict[str, int] = {"ollama": 32, "groq": 128}
+
+    # Groq client: retries of 429/5xx responses and token estimate used for pacing
+    GROQ_MAX_RETRIES: int = 4
+    GROQ_RETRY_BASE_DELAY: float = 0.5
+    GROQ_RETRY_MAX_DELAY: float = 20.0
+    GROQ_EXPECTED_COMPLETION_TOKENS: int = 1000
+
+    # Prometheus-style /metrics endpoint and its histogram buckets
+    METRICS_ENABLED: bool = True
+    METRICS_LATENCY_BUCKETS: List[float] = [0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160]
+    METRICS_TOKEN_RATE_BUCKETS: List[float] = [5, 10, 20, 40, 60, 80, 120, 200, 400, 800]
+
+    # Request tracing: share of requests traced (X-Debug-Trace: 1 always traces) and
+    # finished traces kept for /debug/traces
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 0.01
+    TRACE_BUFFER_SIZE: int = 200
+    # Token required in X-Debug-Token by the /debug endpoints (None disables them)
+    DEBUG_TOKEN: Optional[str] = None
+    # Sampling profiler toggled at runtime via /debug/profiler
+    PROFILER_INTERVAL: float = 0.005
+    PROFILER_MAX_SECONDS: float = 300.0
 
     class Config:
         env_file = ".env"
 
 
 settings = Settings()
-print("GROQ_API_KEY from settings:", bool(settings.GROQ_API_KEY))
@@ -0,0 +1,38 @@
+import json
+from typing import Any
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Format one Server-Sent Events message.
+
+    Args:
+        event: The event name
+        data: JSON-serialisable payload
+
+    Returns:
+        The encoded SSE frame, terminated by a blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def ndjson_line(data: Any) -> str:
+    """
+    Format one newline-delimited JSON record.
+
+    Args:
+        data: JSON-serialisable payload
+
+    Returns:
+        The encoded record followed by a newline
+    """
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Headers that keep proxies from buffering streamed responses
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
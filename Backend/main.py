@@ -1,16 +1,56 @@
 # app/main.py
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from Backend.routers import text, questions, models
+from Backend.routers import text, questions, pipeline, library, models, stats, metrics, debug
+from Backend.core.settings import settings
+from Backend.services.http_client import close_http_client
+from Backend.services.result_cache import text_cache, question_cache
+from Backend.services.model_catalogue import model_catalogue
+from Backend.services.ollama_pool import ollama_pool
+from Backend.services.ollama_residency import ollama_residency
+from Backend.services.calibration import calibration_store
+from Backend.services.passage_library import passage_library
+from Backend.services.prewarm import prewarm_worker
+from Backend.services.metrics import MetricsMiddleware
+from Backend.services.tracing import TracingMiddleware
+from Backend.services.profiler import profiler
+from Backend.services.providers import providers
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Configuration problems are reported here rather than when settings load
+    for problem in providers.check_settings():
+        print(f"Warning: {problem}")
+    # Shared, connection-pooled clients are created on first use and live
+    # for the rest of the app lifetime
+    await model_catalogue.start()
+    await ollama_pool.start()
+    await ollama_residency.start()
+    await prewarm_worker.start()
+    yield
+    await prewarm_worker.stop()
+    await ollama_residency.stop()
+    await ollama_pool.stop()
+    await model_catalogue.stop()
+    await close_http_client()
+    text_cache.close()
+    question_cache.close()
+    calibration_store.close()
+    passage_library.close()
+    profiler.stop()
+
+
 app = FastAPI(
     title="Reading Passage & Questions API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
@@ -23,10 +63,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods (GET, POST, etc.)
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Request-ID"],  # Lets the frontend report the ID of a slow request
 )
 app.include_router(text.router)
 app.include_router(questions.router)
+app.include_router(pipeline.router)
+app.include_router(library.router)
 app.include_router(models.router)  # Add the new models router
+app.include_router(stats.router)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+if settings.DEBUG_TOKEN:
+    # Traces and profiles expose request contents, so /debug only exists behind a token
+    app.include_router(debug.router)
+if settings.TRACING_ENABLED:
+    # Added last so it runs first and every log line carries the request ID
+    app.add_middleware(TracingMiddleware)
 
 
 @app.get("/")
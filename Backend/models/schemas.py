@@ -1,7 +1,7 @@
 # app/models/schemas.py
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from Backend.core.settings import settings
 from enum import Enum
 
@@ -26,6 +26,10 @@ class GeneratedTextRequest(BaseModel):
                        example="Formal")
     provider: str = settings.OLLAMA_PROVIDER
     model: Optional[str] = None
+    bypass_cache: bool = Field(False,
+                               description="Skip the result cache and always generate a fresh passage.")
+    reuse: bool = Field(False,
+                        description="Serve a stored passage from the library for the same or a near-matching topic, language, level and style when there is one, instead of generating.")
 
 
 class GeneratedTextResponse(BaseModel):
@@ -43,6 +47,15 @@ class GeneratedTextResponse(BaseModel):
                                               description="The list of texts that failed to generate.")
     prompts_used: Optional[List[str]] = Field(...,
                                               description="The list of prompts used to generate the text.")
+    library_id: Optional[int] = Field(None,
+                                      description="ID of the library passage served instead of generating (reuse mode).")
+
+
+class GenerateTextBatchRequest(BaseModel):
+    items: List[GeneratedTextRequest] = Field(...,
+                                              description="The passages to generate.",
+                                              min_length=1,
+                                              max_length=settings.BATCH_MAX_ITEMS)
 
 # --- Question generation ---
 
@@ -71,8 +84,63 @@ class GenerateQuestionsRequest(BaseModel):
     model: Optional[str] = Field(None,
                                  description="The specific model to use for question generation.",
                                  example="gemma:7b")
+    bypass_cache: bool = Field(False,
+                               description="Skip the result cache and always generate fresh questions.")
 
 
 class GenerateQuestionsResponse(BaseModel):
     questions: List[QuestionSchema] = Field(...,
                                             description="The list of questions generated.")
+
+
+class GenerateQuestionsBatchRequest(BaseModel):
+    items: List[GenerateQuestionsRequest] = Field(...,
+                                                  description="The question sets to generate.",
+                                                  min_length=1,
+                                                  max_length=settings.BATCH_MAX_ITEMS)
+
+# --- Pipeline ---
+
+
+class WorksheetRequest(GeneratedTextRequest):
+    num_questions: int = Field(5,
+                               description="The number of questions to generate for the passage.",
+                               example=5)
+    choices_num: int = Field(4,
+                             description="The number of choices for each question.",
+                             example=4)
+
+
+# --- Library ---
+
+
+class LibraryPassage(BaseModel):
+    id: int
+    topic: str
+    language: str
+    level: str
+    style: str
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    score: Optional[float] = None
+    created_at: float = Field(..., description="When the passage was stored (Unix time).")
+    uses: int = Field(0, description="How often the passage was served in reuse mode.")
+    snippet: Optional[str] = Field(None, description="The part of the text matching the search.")
+    text: Optional[str] = None
+
+
+class LibrarySearchResponse(BaseModel):
+    passages: List[LibraryPassage]
+
+
+# --- Models ---
+
+
+class ModelInfo(BaseModel):
+    id: str
+    provider: str
+    details: Dict[str, Any] = {}
+
+
+class ModelsResponse(BaseModel):
+    models: List[ModelInfo]
@@ -0,0 +1,88 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from Backend.core.settings import settings
+from Backend.services.tracing import trace_buffer
+from Backend.services.profiler import profiler
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    """Rejects the request unless it carries DEBUG_TOKEN."""
+    if not settings.DEBUG_TOKEN or x_debug_token != settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Debug-Token header")
+
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["Debug"],
+    dependencies=[Depends(require_debug_token)],
+)
+
+
+@router.get(
+    "/traces",
+    summary="Recent request traces",
+    description="Returns summaries of the most recent traced requests, newest first. Filter by minimum duration or request path to find slow requests."
+)
+async def list_traces(limit: int = 50, min_duration_ms: float = 0.0, path: Optional[str] = None):
+    """
+    Lists the traces held in the ring buffer.
+    """
+    return [trace.summary() for trace in trace_buffer.recent(limit, min_duration_ms, path)]
+
+
+@router.get(
+    "/traces/{request_id}",
+    summary="Trace of one request",
+    description="Returns every span (LLM calls, English iterations, prompt building, scoring, validation, serialization) and log line recorded for the request with this X-Request-ID."
+)
+async def get_trace(request_id: str):
+    """
+    Returns one trace from the ring buffer.
+    """
+    trace = trace_buffer.get(request_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"No trace for request {request_id}")
+    return trace.as_dict()
+
+
+@router.post(
+    "/profiler/start",
+    summary="Start the sampling profiler",
+    description="Starts sampling the event loop thread (or every thread) at the given interval, replacing the previous profile. The profiler stops by itself after PROFILER_MAX_SECONDS."
+)
+async def start_profiler(interval: float = settings.PROFILER_INTERVAL,
+                         all_threads: bool = False,
+                         max_seconds: float = settings.PROFILER_MAX_SECONDS):
+    """
+    Starts the sampling profiler.
+    """
+    profiler.start(interval, all_threads, max_seconds)
+    return profiler.report(top=0)
+
+
+@router.post(
+    "/profiler/stop",
+    summary="Stop the sampling profiler",
+    description="Stops sampling and returns the hottest functions of the collected profile."
+)
+async def stop_profiler(top: int = 30):
+    """
+    Stops the sampling profiler.
+    """
+    profiler.stop()
+    return profiler.report(top)
+
+
+@router.get(
+    "/profiler",
+    summary="Sampling profiler results",
+    description="Returns the hottest functions by self and total samples, or with format=collapsed the collapsed stacks for flame graph tools."
+)
+async def get_profile(top: int = 30, format: str = "json"):
+    """
+    Reports the collected profile.
+    """
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    return profiler.report(top)
@@ -0,0 +1,47 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from Backend.core.settings import settings
+from Backend.models.schemas import LevelEnum, LibraryPassage, LibrarySearchResponse
+from Backend.services.passage_library import passage_library
+
+router = APIRouter(
+    prefix="/library",
+    tags=["Library"],
+)
+
+
+@router.get(
+    "/search",
+    response_model=LibrarySearchResponse,
+    summary="Search the passage library",
+    description="Full-text search over the topics and texts of stored passages, best matches first. Every word of `q` must appear; without `q` the newest passages are listed. Results carry a snippet of the text; fetch `/library/{passage_id}` for the full passage."
+)
+async def search_library(q: str = Query("", description="Words to search for."),
+                         language: Optional[str] = None,
+                         level: Optional[LevelEnum] = None,
+                         style: Optional[str] = None,
+                         limit: int = Query(settings.LIBRARY_SEARCH_LIMIT, ge=1, le=100)):
+    """
+    Searches the stored passages.
+    """
+    try:
+        passages = await passage_library.search(q, language=language, level=level, style=style, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return LibrarySearchResponse(passages=[LibraryPassage(**passage) for passage in passages])
+
+
+@router.get(
+    "/{passage_id}",
+    response_model=LibraryPassage,
+    summary="Get a stored passage",
+    description="Returns one stored passage with its full text."
+)
+async def get_passage(passage_id: int):
+    """
+    Returns one stored passage.
+    """
+    passage = await passage_library.get(passage_id)
+    if passage is None:
+        raise HTTPException(status_code=404, detail=f"Passage {passage_id} not found")
+    return LibraryPassage(**passage)
@@ -0,0 +1,83 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from Backend.services.metrics import metrics
+from Backend.services.result_cache import text_cache, question_cache
+from Backend.services.single_flight import text_flight, question_flight
+from Backend.services.batch_scheduler import batch_scheduler
+from Backend.services.admission import admission_stats
+from Backend.services.json_repair import repair_stats
+from Backend.services.ollama_pool import ollama_pool
+
+router = APIRouter(
+    tags=["Metrics"],
+)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _cache_families():
+    caches = {"text": text_cache.stats(), "questions": question_cache.stats()}
+    yield ("cache_hits_total", "counter", "Result cache hits by cache and tier.",
+           [({"cache": name, "tier": tier}, stats[f"{tier}_hits"])
+            for name, stats in caches.items() for tier in ("memory", "disk")])
+    yield ("cache_misses_total", "counter", "Result cache misses by cache.",
+           [({"cache": name}, stats["misses"]) for name, stats in caches.items()])
+    yield ("cache_entries", "gauge", "Entries held in memory by each result cache.",
+           [({"cache": name}, stats["entries"]) for name, stats in caches.items()])
+    flights = {"text": text_flight.stats(), "questions": question_flight.stats()}
+    yield ("coalesced_requests_total", "counter", "Requests that joined an identical generation already in flight.",
+           [({"kind": name}, stats["coalesced"]) for name, stats in flights.items()])
+
+
+def _queue_families():
+    controllers = admission_stats()
+    yield ("admission_active", "gauge", "Generations running per provider/model.",
+           [(_provider_model(key), stats["active"]) for key, stats in controllers.items()])
+    yield ("admission_queue_depth", "gauge", "Generations waiting for admission per provider/model and priority.",
+           [({**_provider_model(key), "priority": priority}, depth)
+            for key, stats in controllers.items() for priority, depth in stats["queued"].items()])
+    yield ("admission_rejected_total", "counter", "Generations rejected because the admission queue was full.",
+           [(_provider_model(key), stats["rejected"]) for key, stats in controllers.items()])
+    yield ("batch_queue_depth", "gauge", "Batch items waiting per provider lane.",
+           [({"provider": provider}, stats["queued"]) for provider, stats in batch_scheduler.stats().items()])
+
+
+def _ollama_host_families():
+    hosts = ollama_pool.stats()
+    yield ("ollama_host_in_flight", "gauge", "Calls running per Ollama host.",
+           [({"host": host}, stats["in_flight"]) for host, stats in hosts.items()])
+    yield ("ollama_host_healthy", "gauge", "Whether each Ollama host is in rotation (1) or ejected (0).",
+           [({"host": host}, int(stats["healthy"])) for host, stats in hosts.items()])
+    yield ("ollama_host_ejections_total", "counter", "Times each Ollama host was ejected after a failure.",
+           [({"host": host}, stats["ejections"]) for host, stats in hosts.items()])
+
+
+def _repair_families():
+    yield ("question_json_responses_total", "counter", "Question responses parsed as a whole.",
+           [({}, repair_stats["responses"])])
+    yield ("question_json_salvaged_total", "counter", "Questions recovered from repaired or partly invalid responses.",
+           [({}, repair_stats["salvaged"])])
+
+
+def _provider_model(key: str) -> dict:
+    provider, _, model = key.partition("/")
+    return {"provider": provider, "model": model}
+
+
+metrics.collector(_cache_families)
+metrics.collector(_queue_families)
+metrics.collector(_ollama_host_families)
+metrics.collector(_repair_families)
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="Returns request, LLM call, calibration, question JSON, cache and queue metrics in the Prometheus text exposition format."
+)
+async def get_metrics():
+    """
+    Renders every registered metric for a Prometheus scrape.
+    """
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
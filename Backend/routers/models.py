@@ -1,11 +1,6 @@
-from fastapi import APIRouter, HTTPException
-import os
-import aiohttp
-import ollama
-import asyncio
-from typing import List, Dict, Any
-from pydantic import BaseModel
-from Backend.core.settings import settings
+from fastapi import APIRouter, Request, Response
+from Backend.models.schemas import ModelInfo, ModelsResponse
+from Backend.services.model_catalogue import model_catalogue
 
 router = APIRouter(
     prefix="/models",
@@ -13,90 +8,41 @@ router = APIRouter(
 )
 
 
-class ModelInfo(BaseModel):
-    id: str
-    provider: str
-    details: Dict[str, Any] = {}
-
-
-class ModelsResponse(BaseModel):
-    models: List[ModelInfo]
-
-
 @router.get(
     "/",
     response_model=ModelsResponse,
     summary="Get available models",
-    description="Returns a list of available models from Ollama and Groq providers"
+    description="Returns a list of available models from Ollama and Groq providers. The list is served from a background-refreshed catalogue and supports conditional requests via ETag/If-None-Match."
 )
-async def get_models():
+async def get_models(request: Request, response: Response):
     """
-    Fetches available models from both Ollama and Groq.
+    Returns the cached catalogue of models from both Ollama and Groq.
 
     Returns:
-        A combined list of models from both providers.
+        A combined list of models from both providers, or 304 if the
+        client's ETag is still current.
     """
-    models = []
+    models = await model_catalogue.get_models()
+    cache_headers = {
+        "ETag": model_catalogue.etag,
+        "Last-Modified": model_catalogue.last_modified,
+        # Let the browser keep the list but revalidate it on every load
+        "Cache-Control": "no-cache",
+    }
+    if request.headers.get("if-none-match") == model_catalogue.etag:
+        return Response(status_code=304, headers=cache_headers)
 
-    # Fetch Ollama models
-    try:
-        loop = asyncio.get_running_loop()
-        ollama_models_response = await loop.run_in_executor(None, ollama.list)
-        ollama_models = [
-            ModelInfo(
-                id=model['model'],
-                provider="ollama",
-                details={"tags": model.get(
-                    'tags', []), "size": model.get('size', 0)}
-            )
-            for model in ollama_models_response.get('models', [])
-            if "whisper" not in model['model'].lower() and "tts" not in model['model'].lower()
-        ]
-        models.extend(ollama_models)
-    except Exception as e:
-        # Don't fail if Ollama is not accessible
-        print(f"Warning: Could not fetch models from Ollama: {e}")
-        # Add default Ollama model as a fallback
-        models.append(ModelInfo(id=settings.OLLAMA_MODEL, provider="ollama"))
+    response.headers.update(cache_headers)
+    return ModelsResponse(models=[ModelInfo(**model) for model in models])
 
-    # Fetch Groq models
-    try:
-        GROQ_API_KEY = os.getenv("GROQ_API_KEY", settings.GROQ_API_KEY)
-        if GROQ_API_KEY:
-            headers = {
-                "Authorization": f"Bearer {GROQ_API_KEY}"
-            }
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.groq.com/openai/v1/models",
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        groq_models = [
-                            ModelInfo(
-                                id=model['id'],
-                                provider="groq",
-                                details={
-                                    "created": model.get('created'),
-                                    "owned_by": model.get('owned_by'),
-                                    "context_window": model.get('context_window')
-                                }
-                            )
-                            for model in data.get('data', [])
-                            if "whisper" not in model['id'].lower() and "tts" not in model['id'].lower()
-                        ]
-                        models.extend(groq_models)
-                    else:
-                        # If Groq API fails, add default model
-                        models.append(
-                            ModelInfo(id=settings.GROQ_MODEL, provider="groq"))
-        else:
-            # If no API key, just add the default model
-            models.append(ModelInfo(id=settings.GROQ_MODEL, provider="groq"))
-    except Exception as e:
-        print(f"Warning: Could not fetch models from Groq: {e}")
-        # Add default Groq model as a fallback
-        models.append(ModelInfo(id=settings.GROQ_MODEL, provider="groq"))
 
-    return ModelsResponse(models=models)
+@router.get(
+    "/health",
+    summary="Get provider health",
+    description="Returns the health and cache state of each provider in the model catalogue."
+)
+async def get_models_health():
+    """
+    Reports per-provider health of the model catalogue.
+    """
+    return model_catalogue.health()
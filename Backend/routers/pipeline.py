@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from Backend.core.streaming import ndjson_line, STREAM_HEADERS, NDJSON_MEDIA_TYPE
+from Backend.models.schemas import WorksheetRequest
+from Backend.services.pipeline import WorksheetPipeline
+from Backend.services.admission import QueueFullError
+
+router = APIRouter(
+    prefix="/pipeline",
+    tags=["Pipeline"],
+)
+
+
+@router.post(
+    "/generate",
+    summary="Generate a passage together with its questions",
+    description="Generates a reading passage and then multiple-choice questions about it in a single request. Results are streamed as NDJSON, one `{\"event\", \"data\"}` record per line: `iteration` records report each English refinement attempt, a `text` record carries the GeneratedTextResponse payload as soon as the passage is accepted, and a final `questions` record carries the GenerateQuestionsResponse payload. Failures are reported as an `error` record."
+)
+async def generate_worksheet(req: WorksheetRequest):
+    """
+    Handles the request to generate a passage and its questions.
+    """
+    pipeline = WorksheetPipeline(provider=req.provider, model=req.model)
+
+    async def lines():
+        try:
+            async for event, data in pipeline.run(
+                topic=req.topic,
+                language=req.language,
+                level=req.level,
+                style=req.style,
+                num_questions=req.num_questions,
+                choices_num=req.choices_num,
+                bypass_cache=req.bypass_cache,
+                reuse=req.reuse,
+            ):
+                yield ndjson_line({"event": event, "data": data})
+        except QueueFullError as e:
+            yield ndjson_line({"event": "error", "data": {"detail": str(e), "status": 429, "retry_after": e.retry_after}})
+        except Exception as e:
+            yield ndjson_line({"event": "error", "data": {"detail": str(e)}})
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=STREAM_HEADERS)
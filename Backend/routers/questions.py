@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException
-from Backend.models.schemas import QuestionSchema, GenerateQuestionsRequest, GenerateQuestionsResponse
+from fastapi.responses import StreamingResponse
+from Backend.core.streaming import ndjson_line, STREAM_HEADERS, NDJSON_MEDIA_TYPE
+from Backend.models.schemas import QuestionSchema, GenerateQuestionsRequest, GenerateQuestionsResponse, GenerateQuestionsBatchRequest
 from Backend.services.question_generator import QuestionGenerator
+from Backend.services.batch_scheduler import batch_scheduler
+from Backend.services.admission import QueueFullError
 
 router = APIRouter(
     prefix="/questions",
@@ -25,6 +29,67 @@ async def generate_questions(req: GenerateQuestionsRequest):
             num_questions=req.num_questions,
             language=req.language,
             choices_num=req.choices_num,
+            bypass_cache=req.bypass_cache,
         )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={
+                            "Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/generate/stream",
+    summary="Stream multiple-choice questions",
+    description="Streams questions as NDJSON, one `{\"event\", \"data\"}` record per line: a `question` record with `{\"index\", \"question\"}` as soon as each question is complete, then a `result` record carrying the GenerateQuestionsResponse payload. Failures are reported as an `error` record."
+)
+async def generate_questions_stream(req: GenerateQuestionsRequest):
+    """
+    Handles the request to stream multiple-choice questions.
+    """
+    qg = QuestionGenerator(provider=req.provider, model=req.model)
+
+    async def lines():
+        try:
+            async for event, data in qg.generate_questions_stream(
+                generated_text=req.generated_text,
+                num_questions=req.num_questions,
+                language=req.language,
+                choices_num=req.choices_num,
+                bypass_cache=req.bypass_cache,
+            ):
+                yield ndjson_line({"event": event, "data": data})
+        except QueueFullError as e:
+            yield ndjson_line({"event": "error", "data": {"detail": str(e), "status": 429, "retry_after": e.retry_after}})
+        except Exception as e:
+            yield ndjson_line({"event": "error", "data": {"detail": str(e)}})
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=STREAM_HEADERS)
+
+
+@router.post(
+    "/generate_batch",
+    summary="Generate many question sets",
+    description="Generates questions for every passage in the batch with bounded per-provider concurrency. Results are streamed back as NDJSON, one line per item in completion order: `{\"index\", \"status\": \"ok\", \"result\"}` or `{\"index\", \"status\": \"error\", \"error\"}`. A failing item does not fail the batch."
+)
+async def generate_questions_batch(req: GenerateQuestionsBatchRequest):
+    """
+    Handles the request to generate a batch of question sets.
+    """
+    def item_job(item: GenerateQuestionsRequest):
+        qg = QuestionGenerator(provider=item.provider, model=item.model)
+        return lambda: qg.generate_questions(
+            generated_text=item.generated_text,
+            num_questions=item.num_questions,
+            language=item.language,
+            choices_num=item.choices_num,
+            bypass_cache=item.bypass_cache,
+        )
+
+    jobs = [(item.provider, item_job(item)) for item in req.items]
+
+    async def lines():
+        async for index, outcome in batch_scheduler.run(jobs):
+            yield ndjson_line({"index": index, **outcome})
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=STREAM_HEADERS)
@@ -0,0 +1,157 @@
+from fastapi import APIRouter
+from Backend.services.result_cache import text_cache, question_cache
+from Backend.services.single_flight import text_flight, question_flight
+from Backend.services.batch_scheduler import batch_scheduler
+from Backend.services.admission import admission_stats
+from Backend.services.groq_client import groq_client
+from Backend.services.hedging import hedge_policy
+from Backend.services.ollama_pool import ollama_pool
+from Backend.services.ollama_residency import ollama_residency
+from Backend.services.json_repair import repair_stats
+from Backend.services.calibration import calibration_store
+from Backend.services.passage_library import passage_library
+from Backend.services.prewarm import prewarm_worker
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["Stats"],
+)
+
+
+@router.get(
+    "/cache",
+    summary="Result cache statistics",
+    description="Returns hit/miss counters and sizes of the text and question result caches."
+)
+async def get_cache_stats():
+    """
+    Reports the state of the result caches.
+    """
+    return {
+        "text": text_cache.stats(),
+        "questions": question_cache.stats(),
+    }
+
+
+@router.get(
+    "/coalescing",
+    summary="Request coalescing statistics",
+    description="Returns how many generations were started and how many identical concurrent requests joined one already in flight."
+)
+async def get_coalescing_stats():
+    """
+    Reports the state of the single-flight request coalescing.
+    """
+    return {
+        "text": text_flight.stats(),
+        "questions": question_flight.stats(),
+    }
+
+
+@router.get(
+    "/batches",
+    summary="Batch scheduler statistics",
+    description="Returns the concurrency limit, active items and queued items of each provider lane of the batch scheduler."
+)
+async def get_batch_stats():
+    """
+    Reports the state of the batch scheduler.
+    """
+    return batch_scheduler.stats()
+
+
+@router.get(
+    "/admission",
+    summary="Admission control statistics",
+    description="Returns active generations, queue depth per priority class, rejections and wait times for every provider/model."
+)
+async def get_admission_stats():
+    """
+    Reports the state of the per-provider admission controllers.
+    """
+    return admission_stats()
+
+
+@router.get(
+    "/groq",
+    summary="Groq rate-limit statistics",
+    description="Returns the client-side view of the Groq request and token quotas along with retry and throttling counters."
+)
+async def get_groq_stats():
+    """
+    Reports the state of the rate-limit-aware Groq client.
+    """
+    return groq_client.stats()
+
+
+@router.get(
+    "/hedging",
+    summary="Hedged request statistics",
+    description="Returns the hedge targets and, per provider/model/call type, the tracked latency threshold, how many calls were hedged, how often the secondary answered first and the remaining hedge budget."
+)
+async def get_hedging_stats():
+    """
+    Reports the state of the hedging policy.
+    """
+    return hedge_policy.stats()
+
+
+@router.get(
+    "/ollama",
+    summary="Ollama model residency statistics",
+    description="Returns which Ollama models are loaded, their keep_alive, cold-load counts and durations, the calls running and waiting per model, and the load, health and loaded models of every Ollama host."
+)
+async def get_ollama_stats():
+    """
+    Reports the state of the Ollama residency manager and host pool.
+    """
+    return {**ollama_residency.stats(), "hosts": ollama_pool.stats()}
+
+
+@router.get(
+    "/repair",
+    summary="Question JSON repair statistics",
+    description="Returns how many question responses were parsed, how many needed local repair, and how many questions were salvaged or rejected."
+)
+async def get_repair_stats():
+    """
+    Reports the state of the local JSON repair stage.
+    """
+    return dict(repair_stats)
+
+
+@router.get(
+    "/calibration",
+    summary="Adaptive calibration statistics",
+    description="Returns the observed Gunning Fog scores per provider/model/level/style and prompt nudge, and the mean iterations per English request for adaptive and static calibration."
+)
+async def get_calibration_stats():
+    """
+    Reports the state of the calibration store.
+    """
+    await calibration_store.load()
+    return calibration_store.stats()
+
+
+@router.get(
+    "/library",
+    summary="Passage library statistics",
+    description="Returns the number of stored passages, how many were added since startup and how many reuse lookups served a stored passage."
+)
+async def get_library_stats():
+    """
+    Reports the state of the passage library.
+    """
+    return await passage_library.stats()
+
+
+@router.get(
+    "/prewarm",
+    summary="Background pre-generation statistics",
+    description="Returns the pre-generation jobs run, failed and cancelled for interactive work, the remaining hourly budget, the cache hit rate of text and question requests, and the most requested combinations."
+)
+async def get_prewarm_stats():
+    """
+    Reports the state of the pre-generation worker and request popularity.
+    """
+    return prewarm_worker.stats()
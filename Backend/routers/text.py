@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException
-from Backend.models.schemas import GeneratedTextRequest, GeneratedTextResponse
+from fastapi.responses import StreamingResponse
+from Backend.core.streaming import sse_event, ndjson_line, STREAM_HEADERS, NDJSON_MEDIA_TYPE
+from Backend.models.schemas import GeneratedTextRequest, GeneratedTextResponse, GenerateTextBatchRequest
 from Backend.services.text_generator import TextGenerator
+from Backend.services.batch_scheduler import batch_scheduler
+from Backend.services.admission import QueueFullError
 
 router = APIRouter(
     prefix="/text",
@@ -12,7 +16,7 @@ router = APIRouter(
     "/generate",
     response_model=GeneratedTextResponse,
     summary="Generate a reading passage",
-    description="Generates a reading passage based on the provided topic, language, level, and style. Supports iterative refinement for English passages to meet specific difficulty criteria (Gunning Fog score)."
+    description="Generates a reading passage based on the provided topic, language, level, and style. Supports iterative refinement for English passages to meet specific difficulty criteria (Gunning Fog score). With `reuse`, a stored library passage on the same or a near-matching topic is served instead when there is one."
 
 )
 async def generate_text(req: GeneratedTextRequest):
@@ -29,6 +33,70 @@ async def generate_text(req: GeneratedTextRequest):
             language=req.language,
             level=req.level,
             style=req.style,
+            bypass_cache=req.bypass_cache,
+            reuse=req.reuse,
         )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={
+                            "Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/generate/stream",
+    summary="Stream a reading passage",
+    description="Streams the passage as Server-Sent Events: `token` events carry text chunks as the model produces them, `iteration` events report the Gunning Fog score of each English refinement attempt, and a final `result` event carries the GeneratedTextResponse payload. Failures are reported as an `error` event."
+)
+async def generate_text_stream(req: GeneratedTextRequest):
+    """
+    Handles the request to stream a text passage.
+    """
+    tg = TextGenerator(provider=req.provider, model=req.model)
+
+    async def event_stream():
+        try:
+            async for event, data in tg.generate_text_stream(
+                topic=req.topic,
+                language=req.language,
+                level=req.level,
+                style=req.style,
+                bypass_cache=req.bypass_cache,
+                reuse=req.reuse,
+            ):
+                yield sse_event(event, data)
+        except QueueFullError as e:
+            yield sse_event("error", {"detail": str(e), "status": 429, "retry_after": e.retry_after})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=STREAM_HEADERS)
+
+
+@router.post(
+    "/generate_batch",
+    summary="Generate many reading passages",
+    description="Generates every passage in the batch with bounded per-provider concurrency. Results are streamed back as NDJSON, one line per item in completion order: `{\"index\", \"status\": \"ok\", \"result\"}` or `{\"index\", \"status\": \"error\", \"error\"}`. A failing item does not fail the batch."
+)
+async def generate_text_batch(req: GenerateTextBatchRequest):
+    """
+    Handles the request to generate a batch of text passages.
+    """
+    def item_job(item: GeneratedTextRequest):
+        tg = TextGenerator(provider=item.provider, model=item.model)
+        return lambda: tg.generate_text(
+            topic=item.topic,
+            language=item.language,
+            level=item.level,
+            style=item.style,
+            bypass_cache=item.bypass_cache,
+            reuse=item.reuse,
+        )
+
+    jobs = [(item.provider, item_job(item)) for item in req.items]
+
+    async def lines():
+        async for index, outcome in batch_scheduler.run(jobs):
+            yield ndjson_line({"index": index, **outcome})
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=STREAM_HEADERS)
@@ -0,0 +1,206 @@
+from typing import Any, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from Backend.core.settings import settings
+from .providers import providers
+
+
+class Priority(IntEnum):
+    """Admission priority classes; lower values are served first."""
+    INTERACTIVE = 0
+    BATCH = 1
+    BACKGROUND = 2
+
+
+# Priority of the LLM calls made by the current request or task
+request_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.INTERACTIVE)
+
+
+class QueueFullError(Exception):
+    """Raised when a provider's wait queue is full and the call is rejected."""
+
+    def __init__(self, provider: str, model: str, retry_after: int):
+        super().__init__(
+            f"Too many pending requests for {provider} model {model}; retry in {retry_after}s")
+        self.provider = provider
+        self.model = model
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits concurrent generations against one provider/model.
+
+    Calls beyond `max_concurrent` wait in a bounded priority queue
+    (interactive before batch before background, FIFO within a class).
+    When the queue is full a new call is rejected straight away, unless it
+    outranks the lowest-priority waiter, which is then rejected instead.
+    """
+
+    def __init__(self, provider: str, model: str, max_concurrent: int, max_queue: int):
+        """
+        Initialize the controller.
+
+        Args:
+            provider: The provider name
+            model: The model name
+            max_concurrent: Maximum generations running at once
+            max_queue: Maximum calls waiting for a slot
+        """
+        self.provider = provider
+        self.model = model
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        # Running generations per priority class
+        self.running = {priority: 0 for priority in Priority}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # Exponentially weighted average of how long a generation holds its slot
+        self.avg_service_time = 10.0
+
+    @asynccontextmanager
+    async def admit(self, priority: Optional[Priority] = None):
+        """
+        Hold a generation slot for the duration of the block.
+
+        Args:
+            priority: Priority class (defaults to the current request's priority)
+
+        Raises:
+            QueueFullError: If the wait queue is full
+        """
+        if priority is None:
+            priority = request_priority.get()
+        queued_at = time.perf_counter()
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+        else:
+            await self._wait(priority)
+        waited = time.perf_counter() - queued_at
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+        started_at = time.perf_counter()
+        self.running[priority] += 1
+        try:
+            yield
+        finally:
+            self.running[priority] -= 1
+            service_time = time.perf_counter() - started_at
+            self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * service_time
+            self._release()
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a queued call would be admitted."""
+        backlog = (len(self._waiters) + 1) / self.max_concurrent
+        return max(1, math.ceil(backlog * self.avg_service_time))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times and counters."""
+        queued = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[Priority(priority).name.lower()] += 1
+        return {
+            "active": self.active,
+            "running": {priority.name.lower(): count for priority, count in self.running.items()},
+            "max_concurrent": self.max_concurrent,
+            "queued": queued,
+            "queue_depth": sum(queued.values()),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "mean_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            "max_wait": self.max_wait,
+            "avg_service_time": self.avg_service_time,
+        }
+
+    async def _wait(self, priority: Priority) -> None:
+        self._discard_done()
+        if len(self._waiters) >= self.max_queue:
+            self._evict_or_reject(priority)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (int(priority), next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was granted just as the caller gave up: pass it on
+                self._release()
+            raise
+
+    def _evict_or_reject(self, priority: Priority) -> None:
+        lowest = max(self._waiters, key=lambda waiter: (
+            waiter[0], waiter[1]), default=None)
+        if lowest is None or lowest[0] <= priority:
+            self.rejected += 1
+            raise QueueFullError(self.provider, self.model, self.retry_after())
+        self._waiters.remove(lowest)
+        heapq.heapify(self._waiters)
+        self.rejected += 1
+        lowest[2].set_exception(QueueFullError(
+            self.provider, self.model, self.retry_after()))
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard_done(self) -> None:
+        if any(future.done() for _, _, future in self._waiters):
+            self._waiters = [
+                waiter for waiter in self._waiters if not waiter[2].done()]
+            heapq.heapify(self._waiters)
+
+
+_controllers: Dict[Tuple[str, str], AdmissionController] = {}
+
+
+def get_admission_controller(provider: str, model: str) -> AdmissionController:
+    """
+    Get the admission controller of a provider/model pair.
+
+    Args:
+        provider: The provider name
+        model: The model name
+
+    Returns:
+        The shared AdmissionController, created on first use
+    """
+    key = (provider.lower(), model)
+    controller = _controllers.get(key)
+    if controller is None:
+        # Limits are per server, e.g. per host of the Ollama pool
+        capacity = providers.get(provider).capacity
+        controller = AdmissionController(
+            provider,
+            model,
+            settings.ADMISSION_MAX_CONCURRENT.get(provider.lower(), 4) * capacity,
+            settings.ADMISSION_MAX_QUEUE.get(provider.lower(), 32) * capacity,
+        )
+        _controllers[key] = controller
+    return controller
+
+
+def admission_stats() -> Dict[str, Any]:
+    """Statistics of every admission controller, keyed by "provider/model"."""
+    return {f"{provider}/{model}": controller.stats() for (provider, model), controller in _controllers.items()}
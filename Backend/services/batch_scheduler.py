@@ -0,0 +1,137 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Set, Tuple
+from collections import deque
+import asyncio
+from Backend.core.settings import settings
+from .admission import Priority, request_priority
+
+BatchItem = Tuple[str, Callable[[], Awaitable[Any]]]
+
+
+class _Batch:
+    def __init__(self, size: int):
+        self.pending: Dict[str, Deque[Tuple[int, Callable[[], Awaitable[Any]]]]] = {}
+        self.running: Set[asyncio.Task] = set()
+        self.results: asyncio.Queue = asyncio.Queue()
+        self.size = size
+
+
+class _Lane:
+    """Work queue of one provider: the batches waiting on it, served round-robin."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.batches: Deque[_Batch] = deque()
+
+
+class BatchScheduler:
+    """
+    Runs batch items with bounded per-provider concurrency.
+
+    Each provider has a lane with a concurrency limit. Batches waiting on a
+    lane are served round-robin, one item at a time, so a large batch
+    cannot starve a small one submitted after it. Items run as soon as a
+    slot frees up, which keeps the provider busy without overloading it.
+    """
+
+    def __init__(self, limits: Dict[str, int] = settings.BATCH_CONCURRENCY):
+        """
+        Initialize the scheduler.
+
+        Args:
+            limits: Maximum concurrent items per provider
+        """
+        self.limits = limits
+        self._lanes: Dict[str, _Lane] = {}
+
+    async def run(self, items: List[BatchItem]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Run a batch, yielding each item's outcome as soon as it finishes.
+
+        A failing item does not affect the others. If the consumer stops
+        iterating (e.g. the client disconnected), the batch's queued items
+        are dropped and its running items are cancelled.
+
+        Args:
+            items: (provider, coroutine function) pairs
+
+        Yields:
+            (index, outcome) tuples in completion order, where outcome is
+            {"status": "ok", "result": ...} or {"status": "error", "error": ...}
+        """
+        batch = _Batch(len(items))
+        for index, (provider, fn) in enumerate(items):
+            batch.pending.setdefault(provider.lower(), deque()).append((index, fn))
+
+        for provider in batch.pending:
+            lane = self._lane(provider)
+            lane.batches.append(batch)
+            self._pump(provider)
+
+        try:
+            for _ in range(batch.size):
+                yield await batch.results.get()
+        finally:
+            self._abandon(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        """Active and queued items per provider lane."""
+        return {
+            provider: {
+                "limit": lane.limit,
+                "active": lane.active,
+                "batches": len(lane.batches),
+                "queued": sum(len(batch.pending.get(provider, ())) for batch in lane.batches),
+            }
+            for provider, lane in self._lanes.items()
+        }
+
+    def _lane(self, provider: str) -> _Lane:
+        lane = self._lanes.get(provider)
+        if lane is None:
+            lane = _Lane(max(1, self.limits.get(provider, 1)))
+            self._lanes[provider] = lane
+        return lane
+
+    def _pump(self, provider: str) -> None:
+        lane = self._lanes[provider]
+        while lane.active < lane.limit and lane.batches:
+            batch = lane.batches.popleft()
+            queue = batch.pending.get(provider)
+            if not queue:
+                continue
+            index, fn = queue.popleft()
+            if queue:
+                # Back of the line: the next slot goes to another batch
+                lane.batches.append(batch)
+            lane.active += 1
+            task = asyncio.create_task(self._run_item(batch, index, fn))
+            batch.running.add(task)
+            task.add_done_callback(
+                lambda task, batch=batch: self._finished(provider, batch, task))
+
+    async def _run_item(self, batch: _Batch, index: int, fn: Callable[[], Awaitable[Any]]) -> None:
+        # Batch work yields to interactive requests at admission control
+        request_priority.set(Priority.BATCH)
+        try:
+            outcome = {"status": "ok", "result": await fn()}
+        except Exception as e:
+            outcome = {"status": "error", "error": str(e)}
+        batch.results.put_nowait((index, outcome))
+
+    def _finished(self, provider: str, batch: _Batch, task: asyncio.Task) -> None:
+        batch.running.discard(task)
+        self._lanes[provider].active -= 1
+        self._pump(provider)
+
+    def _abandon(self, batch: _Batch) -> None:
+        for provider, queue in batch.pending.items():
+            queue.clear()
+            lane = self._lanes.get(provider)
+            if lane is not None and batch in lane.batches:
+                lane.batches.remove(batch)
+        for task in list(batch.running):
+            task.cancel()
+
+
+batch_scheduler = BatchScheduler()
@@ -0,0 +1,285 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import math
+import sqlite3
+import threading
+from Backend.core.prompts import LEVEL_RANGES, NUDGES
+from Backend.core.settings import settings
+from .tracing import log
+
+ObservationKey = Tuple[str, str, str, str, str]
+RequestKey = Tuple[str, str, str, str]
+
+
+def _level_name(level: str) -> str:
+    # Routers pass LevelEnum members; keys hold the plain value, as loaded from SQLite
+    return str(getattr(level, "value", level))
+
+
+class _Observations:
+    """Running count, mean and spread of the scores seen for one key."""
+
+    def __init__(self, count: int = 0, total: float = 0.0, total_squares: float = 0.0, in_range: int = 0):
+        self.count = count
+        self.total = total
+        self.total_squares = total_squares
+        self.in_range = in_range
+
+    def add(self, score: float, in_range: bool) -> None:
+        self.count += 1
+        self.total += score
+        self.total_squares += score * score
+        self.in_range += int(in_range)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_squares - self.count * self.mean ** 2) / (self.count - 1)
+        return math.sqrt(max(0.0, variance))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_score": self.mean,
+            "std": self.std,
+            "in_range_rate": self.in_range / self.count if self.count else 0.0,
+        }
+
+
+class CalibrationStore:
+    """
+    Learns how each model scores for a level, style and prompt nudge.
+
+    Every fully scored English attempt is recorded per (provider, model,
+    level, style, nudge). `plan` uses these statistics to pick the nudge
+    whose observed mean Gunning Fog score is closest to the middle of the
+    level range, in the direction the previous attempt missed, and lowers
+    the temperature for nudges whose scores vary a lot. Iteration counts
+    per request are recorded separately for adaptive and static runs so
+    the effect can be compared.
+
+    Statistics are kept in memory and written through to an optional
+    SQLite file in a worker thread.
+    """
+
+    def __init__(self, sqlite_path: Optional[str] = settings.CALIBRATION_SQLITE_PATH):
+        """
+        Initialize the store.
+
+        Args:
+            sqlite_path: Path of the SQLite file, or None for memory only
+        """
+        self.sqlite_path = sqlite_path
+        self._observations: Dict[ObservationKey, _Observations] = {}
+        self._requests: Dict[RequestKey, List[int]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        """Read the persisted statistics, once."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            if self.sqlite_path:
+                try:
+                    observations, requests = await asyncio.to_thread(self._disk_load)
+                    self._observations.update(observations)
+                    self._requests.update(requests)
+                except sqlite3.Error as e:
+                    log(f"Warning: Could not load calibration statistics: {e}")
+            self._loaded = True
+
+    async def plan(self,
+                   provider: str,
+                   model: str,
+                   level: str,
+                   style: str,
+                   previous_score: Optional[float] = None,
+                   previous_nudge: Optional[str] = None) -> Tuple[Optional[str], Optional[float]]:
+        """
+        Choose the prompt nudge and temperature for the next attempt.
+
+        Args:
+            provider: The provider name
+            model: The model name
+            level: The difficulty level
+            style: The writing style
+            previous_score: Score of the reference attempt, if any
+            previous_nudge: Nudge used by the reference attempt
+
+        Returns:
+            (nudge, temperature); temperature is None to keep the provider default
+        """
+        await self.load()
+        low, high = LEVEL_RANGES.get(level, (0, 25))
+        center = (low + high) / 2
+        position = NUDGES.index(previous_nudge) if previous_nudge in NUDGES else NUDGES.index(None)
+
+        if previous_score is None:
+            allowed = NUDGES
+        elif previous_score < low:
+            allowed = NUDGES[position + 1:] or NUDGES[-1:]
+        elif previous_score > high:
+            allowed = NUDGES[:position] or NUDGES[:1]
+        else:
+            allowed = [previous_nudge]
+
+        known = {
+            nudge: observations
+            for nudge in allowed
+            if (observations := self._observations.get(self._key(provider, model, level, style, nudge)))
+            and observations.count >= settings.CALIBRATION_MIN_SAMPLES
+        }
+        if known:
+            nudge = min(known, key=lambda n: (abs(known[n].mean - center), known[n].std))
+            return nudge, self._temperature(known[nudge], high - low)
+
+        if previous_score is None or low <= previous_score <= high:
+            return (previous_nudge if previous_score is not None else None), None
+        # No statistics yet: step one nudge towards the range, two for a wide miss
+        miss = low - previous_score if previous_score < low else previous_score - high
+        step = 2 if miss > high - low else 1
+        direction = 1 if previous_score < low else -1
+        index = min(len(NUDGES) - 1, max(0, position + direction * step))
+        return NUDGES[index], None
+
+    async def observe(self,
+                      provider: str,
+                      model: str,
+                      level: str,
+                      style: str,
+                      nudge: Optional[str],
+                      score: float) -> None:
+        """
+        Record the score of a fully generated attempt.
+
+        Args:
+            provider: The provider name
+            model: The model name
+            level: The difficulty level
+            style: The writing style
+            nudge: The nudge the attempt was generated with
+            score: Its Gunning Fog score
+        """
+        await self.load()
+        low, high = LEVEL_RANGES.get(level, (0, 25))
+        key = self._key(provider, model, level, style, nudge)
+        observations = self._observations.setdefault(key, _Observations())
+        observations.add(score, low <= score <= high)
+        if self.sqlite_path:
+            await asyncio.to_thread(self._disk_set_observations, key, observations)
+
+    async def record_request(self, provider: str, model: str, level: str, adaptive: bool, iterations: int) -> None:
+        """
+        Record how many iterations a finished English request needed.
+
+        Args:
+            provider: The provider name
+            model: The model name
+            level: The difficulty level
+            adaptive: Whether adaptive calibration was used
+            iterations: Iterations the request took
+        """
+        await self.load()
+        key = (provider.lower(), model, _level_name(level), "adaptive" if adaptive else "static")
+        totals = self._requests.setdefault(key, [0, 0])
+        totals[0] += 1
+        totals[1] += iterations
+        if self.sqlite_path:
+            await asyncio.to_thread(self._disk_set_requests, key, totals)
+
+    def stats(self) -> Dict[str, Any]:
+        """Observed scores per nudge and mean iterations per request."""
+        observations: Dict[str, Dict[str, Any]] = {}
+        for (provider, model, level, style, nudge), entry in sorted(self._observations.items()):
+            group = observations.setdefault(f"{provider}/{model}/{level}/{style}", {})
+            group[nudge] = entry.as_dict()
+        requests: Dict[str, Dict[str, Any]] = {}
+        for (provider, model, level, mode), (count, iterations) in sorted(self._requests.items()):
+            group = requests.setdefault(f"{provider}/{model}/{level}", {})
+            group[mode] = {"requests": count,
+                           "mean_iterations": iterations / count if count else 0.0}
+        return {
+            "enabled": settings.CALIBRATION_ENABLED,
+            "persistent": bool(self.sqlite_path),
+            "observations": observations,
+            "iterations": requests,
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection, if open."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    @staticmethod
+    def _key(provider: str, model: str, level: str, style: str, nudge: Optional[str]) -> ObservationKey:
+        return (provider.lower(), model, _level_name(level), " ".join(style.casefold().split()), nudge or "none")
+
+    @staticmethod
+    def _temperature(observations: _Observations, width: float) -> Optional[float]:
+        if observations.count < 2 or width <= 0:
+            return None
+        spread = observations.std / width
+        if spread < 0.1:
+            # Consistent scores: keep the provider's default temperature
+            return None
+        # Scores that spread across the range call for a steadier, cooler sample
+        return round(max(settings.CALIBRATION_MIN_TEMPERATURE, 1.0 - spread), 2)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS calibration_observations "
+                "(provider TEXT, model TEXT, level TEXT, style TEXT, nudge TEXT, "
+                "count INTEGER, total REAL, total_squares REAL, in_range INTEGER, "
+                "PRIMARY KEY (provider, model, level, style, nudge))")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS calibration_requests "
+                "(provider TEXT, model TEXT, level TEXT, mode TEXT, requests INTEGER, iterations INTEGER, "
+                "PRIMARY KEY (provider, model, level, mode))")
+            self._db.commit()
+        return self._db
+
+    def _disk_load(self) -> Tuple[Dict[ObservationKey, _Observations], Dict[RequestKey, List[int]]]:
+        with self._db_lock:
+            db = self._connection()
+            observations = {
+                tuple(row[:5]): _Observations(*row[5:])
+                for row in db.execute("SELECT * FROM calibration_observations")
+            }
+            requests = {
+                tuple(row[:4]): [row[4], row[5]]
+                for row in db.execute("SELECT * FROM calibration_requests")
+            }
+            return observations, requests
+
+    def _disk_set_observations(self, key: ObservationKey, observations: _Observations) -> None:
+        with self._db_lock:
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO calibration_observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, observations.count, observations.total, observations.total_squares, observations.in_range))
+            db.commit()
+
+    def _disk_set_requests(self, key: RequestKey, totals: List[int]) -> None:
+        with self._db_lock:
+            db = self._connection()
+            db.execute(
+                "INSERT OR REPLACE INTO calibration_requests VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, *totals))
+            db.commit()
+
+
+calibration_store = CalibrationStore()
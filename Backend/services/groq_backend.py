@@ -0,0 +1,86 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+import json
+import os
+import time
+from Backend.core.settings import settings
+from .groq_client import groq_client
+from .metrics import observe_tokens
+from .providers import ProviderBackend, is_text_model
+
+
+class GroqBackend(ProviderBackend):
+    """Models hosted by Groq, through its OpenAI-compatible API."""
+
+    name = "groq"
+    strict_question_counts = True
+
+    async def generate(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Dict[str, str]:
+        resp_json = await groq_client.chat(self._payload(model, messages, kwargs))
+        self._record_tokens(model, resp_json.get("usage"))
+        return {"content": resp_json["choices"][0]["message"]["content"]}
+
+    async def stream(self, model: str, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        payload = self._payload(model, messages, kwargs)
+        payload["stream"] = True
+        async with groq_client.chat_stream(payload) as response:
+            usage = None
+            chunk_count = 0
+            first_chunk_at = None
+            # OpenAI-compatible SSE: one "data: {...}" line per chunk
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                # Groq reports usage on the last chunk under "x_groq"
+                usage = (chunk.get("x_groq") or {}).get("usage") or usage
+                if not chunk.get("choices"):
+                    continue
+                content = chunk["choices"][0].get("delta", {}).get("content")
+                if content:
+                    chunk_count += 1
+                    first_chunk_at = first_chunk_at or time.perf_counter()
+                    yield content
+            if usage is None and first_chunk_at is not None:
+                # Without usage, one streamed chunk is roughly one token
+                usage = {"completion_tokens": chunk_count,
+                         "completion_time": time.perf_counter() - first_chunk_at}
+            self._record_tokens(model, usage)
+
+    async def list_models(self) -> List[Dict[str, Any]]:
+        GROQ_API_KEY = os.getenv("GROQ_API_KEY", settings.GROQ_API_KEY)
+        if not GROQ_API_KEY:
+            # Without an API key only the default model is offered
+            return [{"id": settings.GROQ_MODEL, "provider": "groq", "details": {}}]
+        data = await groq_client.get("/models")
+        return [
+            {
+                "id": model['id'],
+                "provider": "groq",
+                "details": {
+                    "created": model.get('created'),
+                    "owned_by": model.get('owned_by'),
+                    "context_window": model.get('context_window')
+                },
+            }
+            for model in data.get('data', [])
+            if is_text_model(model['id'])
+        ]
+
+    def _record_tokens(self, model: str, usage: Optional[Dict[str, Any]]) -> None:
+        if usage:
+            observe_tokens(self.name, model, usage.get("completion_tokens"), usage.get("completion_time"))
+
+    @staticmethod
+    def _payload(model: str, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        data = {
+            "model": model,
+            "messages": messages,
+            "temperature": kwargs.get("temperature", 1)
+        }
+        if "response_format" in kwargs:
+            data["response_format"] = kwargs["response_format"]
+        return data
@@ -0,0 +1,311 @@
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import os
+import random
+import re
+import time
+from Backend.core.settings import settings
+from .http_client import get_http_session
+from .tracing import log
+
+if TYPE_CHECKING:
+    import aiohttp
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Groq rate-limit duration such as "2m59.56s" or "120ms".
+
+    Args:
+        value: Header value
+
+    Returns:
+        Duration in seconds, or None if the value cannot be parsed
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """
+    Client-side view of one Groq quota (requests or tokens).
+
+    The bucket refills continuously and is re-synchronised from the
+    `x-ratelimit-*` headers of every response, so it tracks the server's
+    accounting while also counting calls that are still in flight.
+    """
+
+    def __init__(self, window: float):
+        """
+        Initialize the bucket.
+
+        Args:
+            window: Period over which the full limit is granted, used until
+                the reset headers give a better refill rate
+        """
+        self.window = window
+        self.capacity: Optional[float] = None
+        self.level = 0.0
+        self.rate = 0.0
+        self.updated = time.monotonic()
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds to wait before `amount` can be taken (0 if available now)."""
+        if self.capacity is None:
+            return 0.0
+        self._refill()
+        # Never wait for more than a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        if self.rate <= 0:
+            return self.window
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity is not None:
+            self._refill()
+            self.level -= amount
+
+    def refund(self, amount: float) -> None:
+        """Give back quota taken for a call the server did not count."""
+        if self.capacity is not None:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, limit: Optional[str], remaining: Optional[str], reset: Optional[str]) -> None:
+        """Adopt the server's view from the rate-limit headers of a response."""
+        try:
+            capacity = float(limit)
+            level = float(remaining)
+        except (TypeError, ValueError):
+            return
+        reset_seconds = parse_duration(reset)
+        self.capacity = capacity
+        self.level = level
+        if reset_seconds and level < capacity:
+            self.rate = (capacity - level) / reset_seconds
+        else:
+            self.rate = capacity / self.window
+        self.updated = time.monotonic()
+
+    def as_dict(self) -> Dict[str, Any]:
+        if self.capacity is not None:
+            self._refill()
+        return {"capacity": self.capacity, "available": self.level, "refill_per_second": self.rate}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level +
+                         (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class GroqClient:
+    """
+    Rate-limit-aware client for the Groq API.
+
+    All calls in the process share one request bucket and one token
+    bucket, and are paced so that neither quota is exceeded. 429 and 5xx
+    responses are retried with jittered exponential backoff, honouring the
+    `retry-after` header; a 429 also pauses every other call until then.
+    """
+
+    def __init__(self):
+        # Groq grants requests per day and tokens per minute
+        self.requests = TokenBucket(window=24 * 3600)
+        self.tokens = TokenBucket(window=60)
+        self._pace_lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        self.retries = 0
+        self.throttled = 0
+        self.paced_seconds = 0.0
+
+    async def chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a chat completion request.
+
+        Args:
+            payload: The chat completion request body
+
+        Returns:
+            The decoded JSON response
+        """
+        response = await self._request("POST", "/chat/completions", payload)
+        try:
+            return await response.json()
+        finally:
+            response.release()
+
+    @asynccontextmanager
+    async def chat_stream(self, payload: Dict[str, Any]):
+        """
+        Send a streaming chat completion request.
+
+        Retries happen before the first byte is read; once the response is
+        handed out it is consumed as-is.
+
+        Args:
+            payload: The chat completion request body (with "stream": True)
+
+        Yields:
+            The aiohttp response whose body carries the SSE stream
+        """
+        response = await self._request("POST", "/chat/completions", payload)
+        try:
+            yield response
+        finally:
+            response.release()
+
+    async def get(self, path: str) -> Dict[str, Any]:
+        """
+        Send a GET request, e.g. for the model list.
+
+        Args:
+            path: Path below GROQ_BASE_URL
+
+        Returns:
+            The decoded JSON response
+        """
+        response = await self._request("GET", path, None, cost=0)
+        try:
+            return await response.json()
+        finally:
+            response.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Quota view and retry counters."""
+        return {
+            "requests": self.requests.as_dict(),
+            "tokens": self.tokens.as_dict(),
+            "blocked_for": max(0.0, self._blocked_until - time.monotonic()),
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "paced_seconds": self.paced_seconds,
+        }
+
+    async def _request(self,
+                       method: str,
+                       path: str,
+                       payload: Optional[Dict[str, Any]],
+                       cost: Optional[float] = None) -> "aiohttp.ClientResponse":
+        # Imported on first use so importing the app does not load aiohttp
+        import aiohttp
+
+        if cost is None:
+            cost = self._estimate_tokens(payload)
+        session = get_http_session()
+        attempt = 0
+        while True:
+            await self._pace(cost)
+            try:
+                response = await session.request(
+                    method, f"{settings.GROQ_BASE_URL}{path}", headers=self._headers(), json=payload)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self._refund(cost)
+                if attempt >= settings.GROQ_MAX_RETRIES:
+                    raise
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, None))
+                continue
+
+            if "x-ratelimit-remaining-requests" in response.headers:
+                self._sync(response.headers)
+            elif response.status >= 400:
+                # No quota headers on the error: assume the call was not counted
+                self._refund(cost)
+            if response.status < 400:
+                return response
+
+            retryable = response.status == 429 or response.status >= 500
+            if not retryable or attempt >= settings.GROQ_MAX_RETRIES:
+                try:
+                    response.raise_for_status()
+                finally:
+                    response.release()
+
+            retry_after = parse_duration(response.headers.get("retry-after"))
+            response.release()
+            attempt += 1
+            self.retries += 1
+            delay = self._backoff(attempt, retry_after)
+            if response.status == 429:
+                self.throttled += 1
+                # Everyone waits out the server's cooldown, not just this call
+                self._blocked_until = max(
+                    self._blocked_until, time.monotonic() + delay)
+            log(
+                f"Groq returned {response.status}; retry {attempt}/{settings.GROQ_MAX_RETRIES} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def _pace(self, cost: float) -> None:
+        async with self._pace_lock:
+            while True:
+                delay = max(
+                    self._blocked_until - time.monotonic(),
+                    self.requests.delay_for(1),
+                    self.tokens.delay_for(cost),
+                )
+                if delay <= 0:
+                    break
+                self.paced_seconds += delay
+                await asyncio.sleep(delay)
+            self.requests.take(1)
+            self.tokens.take(cost)
+
+    def _refund(self, cost: float) -> None:
+        self.requests.refund(1)
+        self.tokens.refund(cost)
+
+    def _sync(self, headers) -> None:
+        self.requests.sync(headers.get("x-ratelimit-limit-requests"),
+                           headers.get("x-ratelimit-remaining-requests"),
+                           headers.get("x-ratelimit-reset-requests"))
+        self.tokens.sync(headers.get("x-ratelimit-limit-tokens"),
+                         headers.get("x-ratelimit-remaining-tokens"),
+                         headers.get("x-ratelimit-reset-tokens"))
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter keeps concurrent retries from hitting the API in lockstep
+        ceiling = min(settings.GROQ_RETRY_MAX_DELAY,
+                      settings.GROQ_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay += retry_after
+        return delay
+
+    @staticmethod
+    def _estimate_tokens(payload: Optional[Dict[str, Any]]) -> float:
+        if not payload:
+            return 0.0
+        # Roughly four characters per token for the prompt, plus the expected completion
+        prompt_chars = sum(len(message.get("content", ""))
+                           for message in payload.get("messages", []))
+        completion = payload.get(
+            "max_tokens") or settings.GROQ_EXPECTED_COMPLETION_TOKENS
+        return prompt_chars / 4 + completion
+
+    @staticmethod
+    def _headers() -> Dict[str, str]:
+        GROQ_API_KEY = os.getenv("GROQ_API_KEY", settings.GROQ_API_KEY)
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {GROQ_API_KEY}"
+        }
+
+
+groq_client = GroqClient()
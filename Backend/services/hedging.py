@@ -0,0 +1,319 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from collections import deque
+import asyncio
+import math
+from contextlib import aclosing
+from Backend.core.settings import settings
+from .metrics import llm_hedges
+from .providers import providers
+from .tracing import log, span
+
+
+class _HedgeState:
+    """Latency samples and hedge budget of one provider/model/call type."""
+
+    def __init__(self, window: int, burst: float):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.budget = burst
+        self.calls = 0
+        self.hedged = 0
+        self.secondary_wins = 0
+        self.over_budget = 0
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class HedgePolicy:
+    """
+    Decides when a slow LLM call gets a duplicate sent to a secondary provider/model.
+
+    Latencies of successful calls are tracked per provider, model and call
+    type (total time for `generate`, time to the first chunk for
+    `stream`). Once a call has taken longer than the tracked `quantile`, a
+    duplicate goes to the secondary configured in HEDGE_TARGETS; the first
+    answer wins and the other call is cancelled. Every call earns
+    `max_rate` of a hedge, banked up to `burst`, so at most that share of
+    calls is duplicated even when a provider slows down as a whole.
+    """
+
+    def __init__(self,
+                 enabled: bool = settings.HEDGE_ENABLED,
+                 targets: Dict[str, str] = settings.HEDGE_TARGETS,
+                 quantile: float = settings.HEDGE_QUANTILE,
+                 min_samples: int = settings.HEDGE_MIN_SAMPLES,
+                 min_delay: float = settings.HEDGE_MIN_DELAY,
+                 max_rate: float = settings.HEDGE_MAX_RATE,
+                 burst: float = settings.HEDGE_BURST,
+                 window: int = settings.HEDGE_WINDOW):
+        """
+        Initialize the policy.
+
+        Args:
+            enabled: Whether calls are hedged at all (latencies are tracked either way)
+            targets: "provider" or "provider/model" -> secondary "provider" or "provider/model"
+            quantile: Latency quantile after which a call is hedged
+            min_samples: Latencies needed before a provider/model is hedged
+            min_delay: Shortest wait before hedging, in seconds
+            max_rate: Largest share of calls that may be hedged
+            burst: Hedges that can be banked for a run of slow calls
+            window: Latency samples kept per provider/model/call type
+        """
+        self.enabled = enabled
+        self.targets = {key.lower(): value for key, value in targets.items()}
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_rate = max_rate
+        self.burst = burst
+        self.window = window
+        self._states: Dict[Tuple[str, str, str], _HedgeState] = {}
+
+    def observe(self, provider: str, model: str, call: str, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        self._state(provider, model, call).latencies.append(seconds)
+
+    def plan(self, provider: str, model: str, call: str) -> Optional[Tuple[float, str, str]]:
+        """
+        Decide whether a call may be hedged.
+
+        Args:
+            provider: The primary provider
+            model: The primary model
+            call: "generate" or "stream"
+
+        Returns:
+            (delay in seconds, secondary provider, secondary model), or None
+            if the call runs unhedged
+        """
+        if not self.enabled:
+            return None
+        secondary = self.secondary(provider, model)
+        if secondary is None:
+            return None
+        state = self._state(provider, model, call)
+        state.calls += 1
+        state.budget = min(self.burst, state.budget + self.max_rate)
+        if len(state.latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, state.quantile(self.quantile)), *secondary
+
+    def secondary(self, provider: str, model: str) -> Optional[Tuple[str, str]]:
+        """The configured secondary of a provider/model, or None."""
+        target = self.targets.get(f"{provider}/{model}".lower()) or self.targets.get(provider.lower())
+        if not target:
+            return None
+        secondary_provider, _, secondary_model = target.partition("/")
+        secondary_model = secondary_model or providers.default_model(secondary_provider)
+        if (secondary_provider.lower(), secondary_model) == (provider.lower(), model):
+            return None
+        return secondary_provider, secondary_model
+
+    def try_hedge(self, provider: str, model: str, call: str) -> bool:
+        """Spend one hedge from the budget, if there is one."""
+        state = self._state(provider, model, call)
+        if state.budget < 1:
+            state.over_budget += 1
+            llm_hedges.inc(provider, model, call, "over_budget")
+            return False
+        state.budget -= 1
+        state.hedged += 1
+        return True
+
+    def won(self, provider: str, model: str, call: str, by_secondary: bool) -> None:
+        """Record which side of a hedged call answered first."""
+        if by_secondary:
+            self._state(provider, model, call).secondary_wins += 1
+        llm_hedges.inc(provider, model, call, "secondary_won" if by_secondary else "primary_won")
+
+    def stats(self) -> Dict[str, Any]:
+        """Latency quantile, hedges and budget per "provider/model/call"."""
+        return {
+            "enabled": self.enabled,
+            "targets": dict(self.targets),
+            "calls": {
+                f"{provider}/{model}/{call}": {
+                    "samples": len(state.latencies),
+                    "threshold": state.quantile(self.quantile),
+                    "calls": state.calls,
+                    "hedged": state.hedged,
+                    "secondary_wins": state.secondary_wins,
+                    "over_budget": state.over_budget,
+                    "budget": round(state.budget, 3),
+                }
+                for (provider, model, call), state in self._states.items()
+            },
+        }
+
+    def _state(self, provider: str, model: str, call: str) -> _HedgeState:
+        key = (provider.lower(), model, call)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _HedgeState(self.window, self.burst)
+        return state
+
+
+hedge_policy = HedgePolicy()
+
+
+async def _cancel(task: Optional[asyncio.Future]) -> None:
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except BaseException:
+            pass
+
+
+async def hedged_call(primary: Awaitable[Any],
+                      secondary: Callable[[], Awaitable[Any]],
+                      plan: Tuple[float, str, str],
+                      provider: str,
+                      model: str) -> Any:
+    """
+    Await a call, sending a duplicate to the secondary if it is slow.
+
+    Args:
+        primary: The call to the primary provider/model
+        secondary: Starts the same call on the secondary provider/model
+        plan: The (delay, provider, model) returned by `hedge_policy.plan`
+        provider: The primary provider
+        model: The primary model
+
+    Returns:
+        The result of whichever call succeeded first
+
+    Raises:
+        Exception: The primary's error if both calls fail
+    """
+    delay, secondary_provider, secondary_model = plan
+    primary_task = asyncio.ensure_future(primary)
+    secondary_task = None
+    with span("llm.hedge", delay_ms=round(delay * 1000, 3), secondary=f"{secondary_provider}/{secondary_model}") as hedge_span:
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done or not hedge_policy.try_hedge(provider, model, "generate"):
+                return await primary_task
+
+            log(f"Hedging {provider}/{model} call to {secondary_provider}/{secondary_model} after {delay:.1f}s")
+            hedge_span.set(fired=True)
+            secondary_task = asyncio.ensure_future(secondary())
+            pending = {primary_task, secondary_task}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        by_secondary = task is secondary_task
+                        hedge_policy.won(provider, model, "generate", by_secondary)
+                        hedge_span.set(winner="secondary" if by_secondary else "primary")
+                        return task.result()
+            # Both failed: report the primary's error
+            return primary_task.result()
+        finally:
+            await _cancel(primary_task)
+            await _cancel(secondary_task)
+
+
+class _StreamRunner:
+    """Drives one stream to the end inside its own task, forwarding chunks through a queue."""
+
+    _END = object()
+
+    def __init__(self, stream: AsyncIterator[str]):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # The whole stream runs in this task, so context it sets (spans, host
+        # affinity, HTTP timeouts) stays with it from the first chunk to the last
+        self.task = asyncio.create_task(self._pump(stream))
+
+    async def _pump(self, stream: AsyncIterator[str]) -> None:
+        try:
+            async with aclosing(stream) as chunks:
+                async for chunk in chunks:
+                    self.queue.put_nowait(chunk)
+        finally:
+            self.queue.put_nowait(self._END)
+
+    async def next(self) -> Optional[str]:
+        """The next chunk, or None at the end; raises the stream's error."""
+        chunk = await self.queue.get()
+        if chunk is self._END:
+            await self.task
+            return None
+        return chunk
+
+    async def cancel(self) -> None:
+        await _cancel(self.task)
+
+
+async def hedged_stream(primary: AsyncIterator[str],
+                        secondary: Callable[[], AsyncIterator[str]],
+                        plan: Tuple[float, str, str],
+                        provider: str,
+                        model: str) -> AsyncIterator[str]:
+    """
+    Stream a call, racing a duplicate on the secondary if the first chunk is late.
+
+    Each stream runs in a task of its own. Whichever produces its first
+    chunk first is streamed to the end; the other one is cancelled.
+
+    Args:
+        primary: The stream from the primary provider/model
+        secondary: Starts the same stream on the secondary provider/model
+        plan: The (delay, provider, model) returned by `hedge_policy.plan`
+        provider: The primary provider
+        model: The primary model
+
+    Yields:
+        Chunks of the winning stream
+    """
+    delay, secondary_provider, secondary_model = plan
+    runners = {"primary": _StreamRunner(primary)}
+    firsts: Dict[str, asyncio.Future] = {"primary": asyncio.ensure_future(runners["primary"].next())}
+    winner = None
+    first_chunk = None
+    try:
+        with span("llm.hedge", delay_ms=round(delay * 1000, 3), secondary=f"{secondary_provider}/{secondary_model}") as hedge_span:
+            done, _ = await asyncio.wait(set(firsts.values()), timeout=delay)
+            if not done and hedge_policy.try_hedge(provider, model, "stream"):
+                log(f"Hedging {provider}/{model} stream to {secondary_provider}/{secondary_model} after {delay:.1f}s")
+                hedge_span.set(fired=True)
+                runners["secondary"] = _StreamRunner(secondary())
+                firsts["secondary"] = asyncio.ensure_future(runners["secondary"].next())
+
+            error = None
+            while winner is None:
+                if not firsts:
+                    # Both failed: report the primary's error
+                    raise error
+                done, _ = await asyncio.wait(set(firsts.values()), return_when=asyncio.FIRST_COMPLETED)
+                for name in [name for name, first in firsts.items() if first in done]:
+                    exception = firsts[name].exception()
+                    if exception is None:
+                        winner = name
+                        first_chunk = firsts[name].result()
+                        break
+                    if name == "primary" or error is None:
+                        error = exception
+                    del firsts[name]
+            if "secondary" in runners:
+                hedge_policy.won(provider, model, "stream", winner == "secondary")
+                hedge_span.set(winner=winner)
+    finally:
+        for name, first in firsts.items():
+            if name != winner:
+                await _cancel(first)
+        for name, runner in runners.items():
+            if name != winner:
+                await runner.cancel()
+
+    runner = runners[winner]
+    try:
+        chunk = first_chunk
+        while chunk is not None:
+            yield chunk
+            chunk = await runner.next()
+    finally:
+        await runner.cancel()
@@ -0,0 +1,83 @@
+from typing import TYPE_CHECKING, Dict, Optional
+from Backend.core.settings import settings
+
+if TYPE_CHECKING:
+    import aiohttp
+    import ollama
+
+# Connection-pooled clients shared by every outgoing call: an aiohttp
+# session for Groq and a native async Ollama client per Ollama host. Each
+# is created (and its library imported) on first use, and all are closed by
+# the FastAPI lifespan in `Backend.main`.
+_session: Optional["aiohttp.ClientSession"] = None
+_ollama_clients: Dict[Optional[str], "ollama.AsyncClient"] = {}
+
+
+def _create_session() -> "aiohttp.ClientSession":
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_MAX_CONNECTIONS,
+        limit_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.HTTP_TIMEOUT,
+        sock_connect=settings.HTTP_CONNECT_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+def _create_ollama_client(host: Optional[str]) -> "ollama.AsyncClient":
+    import httpx
+    import ollama
+
+    limits = httpx.Limits(
+        max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_TIMEOUT,
+    )
+    timeout = httpx.Timeout(
+        settings.OLLAMA_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+    return ollama.AsyncClient(host=host, limits=limits, timeout=timeout)
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP clients and release pooled connections."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    for client in _ollama_clients.values():
+        await client.close()
+    _ollama_clients.clear()
+
+
+def get_http_session() -> "aiohttp.ClientSession":
+    """
+    Get the shared HTTP session, creating it on first use.
+
+    Returns:
+        The process-wide aiohttp.ClientSession
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+
+def get_ollama_client(host: Optional[str] = settings.OLLAMA_HOST) -> "ollama.AsyncClient":
+    """
+    Get the shared async Ollama client of a host, creating it on first use.
+
+    Args:
+        host: The Ollama server URL (None uses the OLLAMA_HOST env var / localhost)
+
+    Returns:
+        The process-wide ollama.AsyncClient of that host
+    """
+    client = _ollama_clients.get(host)
+    if client is None:
+        client = _ollama_clients[host] = _create_ollama_client(host)
+    return client
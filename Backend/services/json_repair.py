@@ -0,0 +1,214 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import re
+from pydantic import ValidationError
+from Backend.models.schemas import QuestionSchema
+from .json_stream import JsonArrayItemStream
+from .metrics import question_json_failures
+
+_FENCE_RE = re.compile(r"```[A-Za-z]*\s*(.*?)(?:```|$)", re.S)
+_CHOICE_LABEL_RE = re.compile(r"^\(?([A-Za-z]|\d{1,2})[).:]?(?:\s+(.*))?$", re.S)
+
+# Counters of what the repair stage saved, reported by /stats/repair
+repair_stats = {
+    "responses": 0,
+    "repaired": 0,
+    "salvaged": 0,
+    "rejected": 0,
+}
+
+
+def repair_json(text: str) -> str:
+    """
+    Fix the JSON faults models commonly make, without calling the model again.
+
+    Handles code fences, prose around the document, `//` and `/* */`
+    comments, single-quoted strings, trailing commas, raw newlines inside
+    strings and documents cut off part-way (open strings and brackets are
+    closed).
+
+    Args:
+        text: The raw model output
+
+    Returns:
+        The repaired text (unchanged if it needed no repair)
+    """
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [position for position in (text.find("{"), text.find("[")) if position != -1]
+    if starts:
+        text = text[min(starts):]
+
+    out: List[str] = []
+    stack: List[str] = []
+    quote: Optional[str] = None
+    i = 0
+    while i < len(text):
+        char = text[i]
+        following = text[i + 1] if i + 1 < len(text) else ""
+        if quote:
+            if char == "\\" and following:
+                # \' is not a JSON escape
+                out.append("'" if following == "'" else char + following)
+                i += 2
+                continue
+            if char == quote:
+                out.append('"')
+                quote = None
+            elif char == '"':
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            else:
+                out.append(char)
+            i += 1
+            continue
+
+        if char in "\"'":
+            quote = char
+            out.append('"')
+        elif char == "/" and following == "/":
+            end = text.find("\n", i)
+            i = len(text) if end == -1 else end
+            continue
+        elif char == "/" and following == "*":
+            end = text.find("*/", i + 2)
+            i = len(text) if end == -1 else end + 2
+            continue
+        elif char in "{[":
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                # Ignore anything after the document
+                break
+        else:
+            out.append(char)
+        i += 1
+
+    if quote:
+        out.append('"')
+    if stack:
+        _strip_trailing_comma(out)
+        if out and out[-1] == ":":
+            out.append("null")
+        for bracket in reversed(stack):
+            out.append("}" if bracket == "{" else "]")
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    while out and (out[-1].isspace() or out[-1] == ","):
+        out.pop()
+
+
+def validate_question(item: Any) -> Optional[Dict[str, Any]]:
+    """
+    Validate one question object and make sure its answer is one of its choices.
+
+    An answer that differs from a choice only by case or whitespace, or
+    that names a choice by its letter or number ("B", "b)", "2"), is
+    replaced by that choice's text.
+
+    Args:
+        item: The decoded question object
+
+    Returns:
+        The cleaned question dictionary, or None if it is unusable
+    """
+    try:
+        question = QuestionSchema.model_validate(item)
+    except ValidationError:
+        return None
+    choices = [choice.strip() for choice in question.choices if choice.strip()]
+    if not question.question.strip() or len({choice.casefold() for choice in choices}) < 2:
+        return None
+
+    answer = _match_answer(question.answer.strip(), choices)
+    if answer is None:
+        return None
+    return {"question": question.question.strip(), "choices": choices, "answer": answer}
+
+
+def _match_answer(answer: str, choices: List[str]) -> Optional[str]:
+    if answer in choices:
+        return answer
+    folded = answer.casefold()
+    for choice in choices:
+        if choice.casefold() == folded:
+            return choice
+    label = _CHOICE_LABEL_RE.match(answer)
+    if label:
+        index = label.group(1)
+        position = int(index) - 1 if index.isdigit() else ord(index.upper()) - ord("A")
+        rest = (label.group(2) or "").strip().casefold()
+        if 0 <= position < len(choices) and (not rest or rest == choices[position].casefold()):
+            return choices[position]
+    return None
+
+
+def salvage_questions(text: str) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Recover every usable question from a model response.
+
+    The response is repaired and parsed as a whole; if that still fails,
+    each complete question object is picked out individually. Every
+    question is validated with `validate_question`.
+
+    Args:
+        text: The raw model output
+
+    Returns:
+        (questions, rejected) where rejected counts unusable question objects
+    """
+    repair_stats["responses"] += 1
+    repaired = False
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        repaired = True
+        repair_stats["repaired"] += 1
+        question_json_failures.inc("invalid_json")
+        text = repair_json(text or "")
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = JsonArrayItemStream(repair=repair_json).feed(text)
+
+    items = _question_items(data)
+    questions: List[Dict[str, Any]] = []
+    rejected = 0
+    for item in items:
+        question = validate_question(item)
+        if question is None:
+            rejected += 1
+        else:
+            questions.append(question)
+    repair_stats["rejected"] += rejected
+    if rejected:
+        question_json_failures.inc("invalid_question", amount=rejected)
+    if repaired or rejected:
+        # Questions that would have been lost with the whole response
+        repair_stats["salvaged"] += len(questions)
+    return questions, rejected
+
+
+def _question_items(data: Any) -> List[Any]:
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        if isinstance(data.get("questions"), list):
+            return data["questions"]
+        if "question" in data:
+            # A single question instead of a list
+            return [data]
+        # The list under an unexpected key
+        for value in data.values():
+            if isinstance(value, list):
+                return value
+    return []
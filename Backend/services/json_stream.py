@@ -0,0 +1,88 @@
+from typing import Any, Callable, Dict, List, Optional
+import json
+
+
+class JsonArrayItemStream:
+    """
+    Incremental parser that picks complete objects out of a streamed JSON array.
+
+    Feed it the raw text chunks of a response shaped like
+    `{"questions": [{...}, {...}]}` (or a bare `[{...}, {...}]`) and it
+    returns every element object as soon as its closing brace arrives,
+    without waiting for, or needing, the rest of the document.
+    """
+
+    def __init__(self, repair: Optional[Callable[[str], str]] = None):
+        """
+        Initialize the parser.
+
+        Args:
+            repair: Optional function that fixes up an element's text when it
+                is not valid JSON on its own
+        """
+        self.repair = repair
+        # Open brackets of the enclosing structure, e.g. ["{", "["]
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._item: Optional[List[str]] = None
+        self._item_depth = 0
+        self.skipped = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next chunk of the response.
+
+        Args:
+            chunk: Text as received from the model
+
+        Returns:
+            The element objects completed by this chunk (malformed ones are
+            counted in `skipped` and left out)
+        """
+        items: List[Dict[str, Any]] = []
+        start = 0
+        for position, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._item is None and self._stack and self._stack[-1] == "[":
+                    # An object directly inside an array: start capturing it
+                    self._item = []
+                    self._item_depth = len(self._stack)
+                    start = position
+                self._stack.append(char)
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if self._item is not None and len(self._stack) == self._item_depth:
+                    self._item.append(chunk[start:position + 1])
+                    item = self._decode("".join(self._item))
+                    if item is not None:
+                        items.append(item)
+                    self._item = None
+        if self._item is not None:
+            self._item.append(chunk[start:])
+        return items
+
+    def _decode(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                item = json.loads(self.repair(text)) if self.repair else None
+            except json.JSONDecodeError:
+                item = None
+        if not isinstance(item, dict):
+            self.skipped += 1
+            return None
+        return item
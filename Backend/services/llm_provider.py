@@ -1,16 +1,20 @@
-from typing import Dict, List, Any
-import os
+from typing import Dict, List, AsyncIterator
 import asyncio
-import aiohttp
-import ollama
-from Backend.core import settings
+import time
+from contextlib import aclosing
+from .admission import get_admission_controller
+from .hedging import hedge_policy, hedged_call, hedged_stream
+from .metrics import llm_calls, llm_call_duration
+from .providers import providers
+from .tracing import span
 
 
 class LLMProvider:
     """
     Class for interacting with different LLM providers.
-    Abstracts the generation process for different providers.
-    Currently supports Ollama and Groq.
+    Abstracts the generation process for different providers: admission
+    control, hedging, metrics and tracing happen here, the provider API
+    calls in the backend registered for the provider (see `providers`).
     """
 
     def __init__(self, provider: str, model: str):
@@ -18,7 +22,7 @@ class LLMProvider:
         Initialize the LLM provider.
 
         Args:
-            provider: The provider name ("ollama" or "groq")
+            provider: The provider name (e.g. "ollama" or "groq")
             model: The model name to use
         """
         self.provider = provider
@@ -28,54 +32,123 @@ class LLMProvider:
         """
         Generate text using the configured LLM provider.
 
+        With hedging configured for the provider/model (HEDGE_TARGETS), a
+        call slower than its tracked latency quantile is duplicated to the
+        secondary and the first answer is returned.
+
         Args:
             messages: List of message dictionaries with role and content
             **kwargs: Additional provider-specific parameters
 
         Returns:
             Dictionary containing the generated content
+
+        Raises:
+            ValueError: If the provider is unknown
+            QueueFullError: If the provider's admission queue is full
+        """
+        plan = hedge_policy.plan(self.provider, self.model, "generate")
+        if plan is None:
+            return await self._generate(messages, **kwargs)
+        secondary = LLMProvider(plan[1], plan[2])
+        return await hedged_call(self._generate(messages, **kwargs),
+                                 lambda: secondary._generate(messages, **kwargs),
+                                 plan, self.provider, self.model)
+
+    async def _generate(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, str]:
+        with span("llm.generate", provider=self.provider, model=self.model) as call_span:
+            backend = providers.get(self.provider)
+            queued = time.perf_counter()
+            async with get_admission_controller(self.provider, self.model).admit():
+                async with backend.hold(self.model):
+                    started = time.perf_counter()
+                    call_span.set(wait_ms=round((started - queued) * 1000, 3))
+                    outcome = "error"
+                    try:
+                        result = await backend.generate(self.model, messages, **kwargs)
+                        outcome = "ok"
+                        hedge_policy.observe(self.provider, self.model, "generate", time.perf_counter() - queued)
+                        return result
+                    except asyncio.CancelledError:
+                        outcome = "cancelled"
+                        raise
+                    finally:
+                        self._record_call("generate", outcome, started)
+
+    async def stream(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """
+        Stream generated text from the configured LLM provider.
+
+        Accepts the same arguments as `generate`, but yields content chunks
+        as soon as the provider produces them. The admission slot is held
+        until the stream is exhausted or closed. A hedged stream races the
+        secondary for the first chunk.
+
+        Args:
+            messages: List of message dictionaries with role and content
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            Chunks of generated content
+
+        Raises:
+            ValueError: If the provider is unknown
+            QueueFullError: If the provider's admission queue is full
         """
-        if self.provider == "ollama":
-            # Only the first user message is used as prompt for Ollama
-            prompt = next((msg["content"]
-                          for msg in messages if msg["role"] == "user"), "")
-            system = next((msg["content"]
-                          for msg in messages if msg["role"] == "system"), None)
-
-            # Use run_in_executor to make the synchronous call non-blocking
-            loop = asyncio.get_running_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: ollama.generate(
-                    model=self.model,
-                    prompt=prompt,
-                    system=system
-                )
-            )
-            return {"content": response["response"]}
-
-        elif self.provider == "groq":
-            GROQ_API_KEY = os.getenv("GROQ_API_KEY", settings.GROQ_API_KEY)
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {GROQ_API_KEY}"
-            }
-            data = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": kwargs.get("temperature", 1)
-            }
-            if "response_format" in kwargs:
-                data["response_format"] = kwargs["response_format"]
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers=headers,
-                    json=data
-                ) as response:
-                    response.raise_for_status()
-                    resp_json = await response.json()
-                    return {"content": resp_json["choices"][0]["message"]["content"]}
+        plan = hedge_policy.plan(self.provider, self.model, "stream")
+        if plan is None:
+            chunks = self._stream(messages, **kwargs)
         else:
-            raise ValueError(f"Unknown provider: {self.provider}")
+            secondary = LLMProvider(plan[1], plan[2])
+            chunks = hedged_stream(self._stream(messages, **kwargs),
+                                   lambda: secondary._stream(messages, **kwargs),
+                                   plan, self.provider, self.model)
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                yield chunk
+
+    async def _stream(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        with span("llm.stream", provider=self.provider, model=self.model) as call_span:
+            backend = providers.get(self.provider)
+            queued = time.perf_counter()
+            async with get_admission_controller(self.provider, self.model).admit():
+                async with backend.hold(self.model):
+                    started = time.perf_counter()
+                    call_span.set(wait_ms=round((started - queued) * 1000, 3))
+                    # A stream closed by the consumer before its end counts as cancelled
+                    outcome = "cancelled"
+                    chunk_count = 0
+                    try:
+                        async with aclosing(backend.stream(self.model, messages, **kwargs)) as chunks:
+                            async for chunk in chunks:
+                                if not chunk_count:
+                                    call_span.set(first_chunk_ms=round((time.perf_counter() - started) * 1000, 3))
+                                    hedge_policy.observe(self.provider, self.model, "stream", time.perf_counter() - queued)
+                                chunk_count += 1
+                                yield chunk
+                        outcome = "ok"
+                    except (GeneratorExit, asyncio.CancelledError):
+                        raise
+                    except Exception:
+                        outcome = "error"
+                        raise
+                    finally:
+                        call_span.set(outcome=outcome, chunks=chunk_count)
+                        self._record_call("stream", outcome, started)
+
+    def affinity(self):
+        """
+        Keep the calls made inside the block on one server of the provider.
+
+        Used around the English calibration loop so its iterations reuse a
+        warm model and prompt cache (a no-op for single-server providers).
+
+        Raises:
+            ValueError: If the provider is unknown
+        """
+        return providers.get(self.provider).affinity()
+
+    def _record_call(self, call: str, outcome: str, started: float) -> None:
+        llm_calls.inc(self.provider, self.model, call, outcome)
+        if outcome == "ok":
+            llm_call_duration.observe(time.perf_counter() - started, self.provider, self.model, call)
@@ -0,0 +1,239 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import bisect
+import math
+import time
+from enum import Enum
+from Backend.core.settings import settings
+from .tracing import log
+
+Labels = Tuple[str, ...]
+# A collector returns (name, type, help, [(labels, value), ...]) families at scrape time
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value.value if isinstance(value, Enum) else value))}"'
+             for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Add to the counter.
+
+        Args:
+            *labels: Label values, in the order of `labelnames`
+            amount: Increment (must not be negative)
+        """
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set.
+
+    Observations only bump one bucket counter, the sum and the count; the
+    cumulative counts Prometheus expects are computed when scraped.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = sorted(buckets)
+        # labels -> [count per bucket (+Inf last), sum, count]
+        self._series: Dict[Labels, List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: The observed value
+            *labels: Label values, in the order of `labelnames`
+        """
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket in zip([*self.buckets, math.inf], counts):
+                cumulative += bucket
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics and renders them in the Prometheus text format.
+
+    Counters and histograms are updated on the hot path with a dictionary
+    lookup and an integer increment (no locks: everything runs on the event
+    loop). Values other services already keep, such as cache counters and
+    queue depths, are read by collectors only when `/metrics` is scraped.
+    """
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = settings.METRICS_LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], Iterable[Family]]) -> None:
+        """
+        Register a function that reports metric families at scrape time.
+
+        Args:
+            collect: Returns (name, type, help, [(labels, value), ...]) tuples
+        """
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                log(f"Warning: Metrics collector {collect.__name__} failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"])
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "Time until the response body was fully sent, by route.", ["method", "route"])
+llm_calls = metrics.counter(
+    "llm_calls_total", "LLM calls by provider, model, call type and outcome.", ["provider", "model", "call", "outcome"])
+llm_call_duration = metrics.histogram(
+    "llm_call_duration_seconds", "LLM call latency after admission, by provider and model.", ["provider", "model", "call"])
+llm_hedges = metrics.counter(
+    "llm_hedged_calls_total",
+    "Slow LLM calls duplicated to a secondary: primary_won, secondary_won, over_budget (not hedged).",
+    ["provider", "model", "call", "result"])
+llm_completion_tokens = metrics.counter(
+    "llm_completion_tokens_total", "Completion tokens generated, by provider and model.", ["provider", "model"])
+llm_tokens_per_second = metrics.histogram(
+    "llm_tokens_per_second", "Generation speed of LLM calls, by provider and model.", ["provider", "model"],
+    buckets=settings.METRICS_TOKEN_RATE_BUCKETS)
+english_iterations = metrics.histogram(
+    "english_refinement_iterations", "Calibration iterations per English text request.", ["provider", "level"],
+    buckets=[1, 2, 3, 4, 5, 6, 8, 10])
+library_lookups = metrics.counter(
+    "passage_library_lookups_total", "Reuse lookups in the passage library: hit (served) or miss.", ["result"])
+prewarm_jobs = metrics.counter(
+    "prewarm_jobs_total", "Background pre-generations by kind and outcome: done, failed, preempted.", ["kind", "outcome"])
+question_json_failures = metrics.counter(
+    "question_json_failures_total",
+    "Question JSON failures: invalid_json (repaired locally), invalid_question, unusable_response.", ["kind"])
+
+
+def observe_tokens(provider: str, model: str, tokens: Optional[int], seconds: Optional[float]) -> None:
+    """
+    Record the completion tokens and generation speed of one LLM call.
+
+    Args:
+        provider: The provider name
+        model: The model name
+        tokens: Completion tokens, if the provider reported them
+        seconds: Time spent generating them
+    """
+    if not tokens:
+        return
+    llm_completion_tokens.inc(provider, model, amount=tokens)
+    if seconds and seconds > 0:
+        llm_tokens_per_second.observe(tokens / seconds, provider, model)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts and latencies per route.
+
+    Routes are labelled by their path template (`/text/generate`), so
+    path parameters do not create new series; unmatched paths share one
+    label. Streaming responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_requests.inc(method, path, status)
+            http_request_duration.observe(time.perf_counter() - started, method, path)
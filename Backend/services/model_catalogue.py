@@ -0,0 +1,212 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import time
+from email.utils import formatdate
+from Backend.core.settings import settings
+from .providers import providers
+from .tracing import log
+
+
+class ProviderState:
+    """Cached model list and health of one provider."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.models: Optional[List[Dict[str, Any]]] = None
+        self.fetched_at = 0.0
+        self.healthy = True
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_error: Optional[str] = None
+
+    def fallback(self) -> List[Dict[str, Any]]:
+        default = providers.default_model(self.provider)
+        return [{"id": default, "provider": self.provider, "details": {}}]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "models": len(self.models) if self.models is not None else 0,
+            "fetched_at": self.fetched_at or None,
+            "failures": self.failures,
+            "retry_at": self.retry_at or None,
+            "last_error": self.last_error,
+        }
+
+
+class ModelCatalogue:
+    """
+    Cached catalogue of the models offered by every provider.
+
+    Model lists are refreshed in the background and served from memory, so
+    listing models never waits on a provider. A provider that fails is
+    marked unhealthy and skipped (its default model is offered instead)
+    until an exponential backoff expires.
+    """
+
+    def __init__(self,
+                 ttl: float = settings.MODEL_CATALOGUE_TTL,
+                 refresh_interval: float = settings.MODEL_CATALOGUE_REFRESH_INTERVAL,
+                 fetch_timeout: float = settings.MODEL_CATALOGUE_FETCH_TIMEOUT,
+                 max_backoff: float = settings.MODEL_CATALOGUE_MAX_BACKOFF):
+        """
+        Initialize the catalogue.
+
+        Args:
+            ttl: Age after which a provider's model list is refreshed
+            refresh_interval: Period of the background refresh loop
+            fetch_timeout: Timeout of a single provider query
+            max_backoff: Longest time an unhealthy provider is skipped
+        """
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.fetch_timeout = fetch_timeout
+        self.max_backoff = max_backoff
+        self._states = {provider: ProviderState(
+            provider) for provider in providers.names()}
+        self._models: List[Dict[str, Any]] = []
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._background_refresh: Optional[asyncio.Task] = None
+        self.etag = '"0"'
+        self.last_modified = formatdate(usegmt=True)
+
+    async def start(self) -> None:
+        """
+        Start the background refresh loop.
+
+        The first refresh runs in the background too, so startup does not
+        wait on (or import the client of) any provider.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop the background refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get_models(self) -> List[Dict[str, Any]]:
+        """
+        Get the combined model list.
+
+        Only the very first call waits for the providers; afterwards the
+        cached list is returned and stale entries are refreshed in the
+        background.
+
+        Returns:
+            List of model dictionaries with id, provider and details
+        """
+        if not self._models:
+            await self.refresh()
+        elif self._stale() and not self._refresh_lock.locked():
+            self._background_refresh = asyncio.create_task(self.refresh())
+        return self._models
+
+    async def get_model_ids(self, provider: str) -> List[str]:
+        """
+        Get the model ids offered by one provider.
+
+        Args:
+            provider: The provider name
+
+        Returns:
+            List of model ids (the provider's default model if it is down)
+        """
+        models = await self.get_models()
+        return [model["id"] for model in models if model["provider"] == provider]
+
+    def is_healthy(self, provider: str) -> bool:
+        """Whether the last query of the provider succeeded."""
+        state = self._states.get(provider)
+        return state is None or state.healthy
+
+    def health(self) -> Dict[str, Any]:
+        """Per-provider health and cache state."""
+        return {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "providers": {name: state.as_dict() for name, state in self._states.items()},
+        }
+
+    async def refresh(self, force: bool = False) -> None:
+        """
+        Re-query every provider whose list is stale and that is not backing off.
+
+        Args:
+            force: Query every provider regardless of age and backoff
+        """
+        async with self._refresh_lock:
+            now = time.time()
+            due = [
+                state for state in self._states.values()
+                if force or state.models is None
+                or (state.healthy and now - state.fetched_at >= self.ttl)
+                or (not state.healthy and now >= state.retry_at)
+            ]
+            if due:
+                await asyncio.gather(*(self._refresh_provider(state) for state in due))
+            self._rebuild()
+
+    async def _refresh_provider(self, state: ProviderState) -> None:
+        try:
+            backend = providers.get(state.provider)
+            models = await asyncio.wait_for(backend.list_models(), self.fetch_timeout)
+            state.models = models
+            state.fetched_at = time.time()
+            state.healthy = True
+            state.failures = 0
+            state.retry_at = 0.0
+            state.last_error = None
+        except Exception as e:
+            log(
+                f"Warning: Could not fetch models from {state.provider}: {e}")
+            state.healthy = False
+            state.failures += 1
+            state.retry_at = time.time() + min(
+                self.max_backoff, self.refresh_interval * 2 ** (state.failures - 1))
+            state.last_error = str(e) or type(e).__name__
+            if state.models is None:
+                state.models = []
+
+    def _rebuild(self) -> None:
+        models = []
+        for state in self._states.values():
+            if state.models:
+                # A provider that went down keeps its last known list
+                models.extend(state.models)
+            else:
+                models.extend(state.fallback())
+        digest = hashlib.sha256(json.dumps(
+            models, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        etag = f'"{digest}"'
+        if etag != self.etag:
+            self.etag = etag
+            self.last_modified = formatdate(usegmt=True)
+        self._models = models
+
+    def _stale(self) -> bool:
+        now = time.time()
+        return any(
+            (state.healthy and now - state.fetched_at >= self.ttl)
+            or (not state.healthy and now >= state.retry_at)
+            for state in self._states.values()
+        )
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                log(f"Warning: Model catalogue refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+model_catalogue = ModelCatalogue()
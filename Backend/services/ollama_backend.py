@@ -0,0 +1,160 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import time
+from contextlib import aclosing
+from .http_client import get_ollama_client
+from .metrics import observe_tokens
+from .ollama_pool import OllamaHost, ollama_pool
+from .ollama_residency import ollama_residency
+from .providers import ProviderBackend, is_text_model
+
+
+class OllamaBackend(ProviderBackend):
+    """Local models served by one or more Ollama servers (see `ollama_pool`)."""
+
+    name = "ollama"
+
+    async def generate(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Dict[str, str]:
+        attempt = 0
+        while True:
+            try:
+                async with ollama_pool.acquire(model) as host:
+                    return await self._generate_on(host, model, messages, kwargs)
+            except ConnectionError:
+                # Nothing reached the host; try another one while any is left
+                attempt += 1
+                if attempt >= ollama_pool.size:
+                    raise
+
+    async def stream(self, model: str, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with ollama_pool.acquire(model) as host:
+                    async with aclosing(self._stream_on(host, model, messages, kwargs)) as parts:
+                        async for part in parts:
+                            started = True
+                            yield part
+                return
+            except ConnectionError:
+                attempt += 1
+                if started or attempt >= ollama_pool.size:
+                    raise
+
+    async def list_models(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        hosts = [host for host in ollama_pool.hosts if host.available(now)] or ollama_pool.hosts
+        results = await asyncio.gather(
+            *(get_ollama_client(host.url).list() for host in hosts), return_exceptions=True)
+        responses = [result for result in results if not isinstance(result, BaseException)]
+        if not responses:
+            raise results[0]
+        # Union of the models installed on any reachable host
+        models: Dict[str, Dict[str, Any]] = {}
+        for response in responses:
+            for model in response.get('models', []):
+                if is_text_model(model['model']):
+                    models.setdefault(model['model'], {
+                        "id": model['model'],
+                        "provider": "ollama",
+                        "details": {"tags": model.get('tags', []), "size": model.get('size', 0)},
+                    })
+        return list(models.values())
+
+    @property
+    def capacity(self) -> int:
+        return ollama_pool.size
+
+    def affinity(self):
+        # Keep a calibration loop on one host so its model and prompt cache stay warm
+        return ollama_pool.sticky()
+
+    async def _generate_on(self, host: OllamaHost, model: str,
+                           messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, str]:
+        client = get_ollama_client(host.url)
+        options = self._options(kwargs)
+
+        if "response_format" in kwargs:
+            # JSON mode goes through the chat endpoint with the full conversation
+            response = await client.chat(
+                model=model,
+                messages=messages,
+                format="json",
+                options=options,
+                keep_alive=ollama_residency.keep_alive(model)
+            )
+            self._finished(model, response)
+            return {"content": response["message"]["content"]}
+
+        prompt, system = self._split_messages(messages)
+        response = await client.generate(
+            model=model,
+            prompt=prompt,
+            system=system,
+            options=options,
+            keep_alive=ollama_residency.keep_alive(model)
+        )
+        self._finished(model, response)
+        return {"content": response["response"]}
+
+    async def _stream_on(self, host: OllamaHost, model: str,
+                         messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> AsyncIterator[str]:
+        client = get_ollama_client(host.url)
+        options = self._options(kwargs)
+
+        if "response_format" in kwargs:
+            parts = await client.chat(
+                model=model,
+                messages=messages,
+                format="json",
+                options=options,
+                keep_alive=ollama_residency.keep_alive(model),
+                stream=True
+            )
+            async for part in parts:
+                if part.get("done"):
+                    self._finished(model, part)
+                if part["message"]["content"]:
+                    yield part["message"]["content"]
+            return
+
+        prompt, system = self._split_messages(messages)
+        parts = await client.generate(
+            model=model,
+            prompt=prompt,
+            system=system,
+            options=options,
+            keep_alive=ollama_residency.keep_alive(model),
+            stream=True
+        )
+        async for part in parts:
+            if part.get("done"):
+                self._finished(model, part)
+            if part["response"]:
+                yield part["response"]
+
+    def hold(self, model: str):
+        # Ollama shares one server's memory between models
+        return ollama_residency.hold(model)
+
+    def _finished(self, model: str, response: Any) -> None:
+        ollama_residency.record(model, response)
+        # eval_duration excludes model loading and prompt evaluation (nanoseconds)
+        observe_tokens(self.name, model, response.get("eval_count"),
+                       (response.get("eval_duration") or 0) / 1e9)
+
+    @staticmethod
+    def _split_messages(messages: List[Dict[str, str]]) -> tuple:
+        # Only the first user message is used as prompt for Ollama
+        prompt = next((msg["content"]
+                      for msg in messages if msg["role"] == "user"), "")
+        system = next((msg["content"]
+                      for msg in messages if msg["role"] == "system"), None)
+        return prompt, system
+
+    @staticmethod
+    def _options(kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if "temperature" in kwargs:
+            return {"temperature": kwargs["temperature"]}
+        return None
@@ -0,0 +1,255 @@
+from typing import Any, Dict, Iterator, List, Optional
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import asyncio
+import time
+from Backend.core.settings import settings
+from .http_client import get_ollama_client
+from .tracing import log
+
+# Host chosen per model by the enclosing `OllamaHostPool.sticky()` block
+_affinity: ContextVar[Optional[Dict[str, "OllamaHost"]]] = ContextVar("ollama_affinity", default=None)
+
+
+class OllamaHost:
+    """Load, health and resident models of one Ollama server."""
+
+    def __init__(self, url: Optional[str]):
+        self.url = url
+        self.in_flight = 0
+        self.calls = 0
+        # Consecutive failed probes or calls
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.last_error: Optional[str] = None
+        # Loaded models as reported by /api/ps (or seen answering a call)
+        self.resident: Dict[str, Dict[str, Any]] = {}
+        self.probed_at = 0.0
+
+    @property
+    def name(self) -> str:
+        # None lets the client use the OLLAMA_HOST env var / localhost
+        return self.url or "default"
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def as_dict(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "healthy": self.available(now),
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "ejected_for": max(0.0, self.ejected_until - now),
+            "last_error": self.last_error,
+            "resident": sorted(self.resident),
+        }
+
+
+class OllamaHostPool:
+    """
+    Routes Ollama calls across several servers.
+
+    Each call goes to the healthy host with the fewest calls in flight,
+    where a host that does not have the model loaded counts as
+    `cold_penalty` calls busier. Hosts are probed in the background
+    (`/api/ps`, which also reports their loaded models); a host that fails
+    a probe or a call is ejected for a backoff that doubles with every
+    consecutive failure, and re-admitted by the first probe that succeeds.
+    Inside a `sticky()` block every call for a model goes to the same host.
+    """
+
+    def __init__(self,
+                 hosts: Optional[List[str]] = settings.OLLAMA_HOSTS,
+                 probe_interval: float = settings.OLLAMA_HEALTH_CHECK_INTERVAL,
+                 probe_timeout: float = settings.OLLAMA_HEALTH_CHECK_TIMEOUT,
+                 eject_seconds: float = settings.OLLAMA_EJECT_SECONDS,
+                 max_eject_seconds: float = settings.OLLAMA_MAX_EJECT_SECONDS,
+                 cold_penalty: float = settings.OLLAMA_COLD_HOST_PENALTY):
+        """
+        Initialize the pool.
+
+        Args:
+            hosts: Ollama server URLs (None or empty uses OLLAMA_HOST alone)
+            probe_interval: Period of the background health probes
+            probe_timeout: Timeout of a single probe
+            eject_seconds: Ejection after the first failure
+            max_eject_seconds: Longest ejection
+            cold_penalty: Calls in flight a host without the model loaded counts as
+        """
+        self.hosts = [OllamaHost(url) for url in (hosts or [settings.OLLAMA_HOST])]
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.cold_penalty = cold_penalty
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.hosts)
+
+    async def start(self) -> None:
+        """Start the background health probes."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background health probes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @contextmanager
+    def sticky(self) -> Iterator[None]:
+        """
+        Send every call for a model made inside the block to one host.
+
+        Also applies to tasks started inside the block. The host is chosen
+        by the first call and replaced only if it gets ejected.
+        """
+        previous = _affinity.get()
+        token = _affinity.set({})
+        try:
+            yield
+        finally:
+            try:
+                _affinity.reset(token)
+            except ValueError:
+                # An async generator finished in a different context than it started in
+                _affinity.set(previous)
+
+    def pick(self, model: str) -> OllamaHost:
+        """
+        Choose the host for a call.
+
+        Args:
+            model: The model name
+
+        Returns:
+            The sticky host if there is a usable one, else the least-loaded
+            healthy host (any host if all are ejected)
+        """
+        now = time.monotonic()
+        pinned = _affinity.get()
+        if pinned is not None:
+            host = pinned.get(model)
+            if host is not None and host.available(now):
+                return host
+        candidates = [host for host in self.hosts if host.available(now)] or self.hosts
+        host = min(candidates, key=lambda host: (
+            host.in_flight + (0 if model in host.resident else self.cold_penalty), host.calls))
+        if pinned is not None:
+            pinned[model] = host
+        return host
+
+    @asynccontextmanager
+    async def acquire(self, model: str):
+        """
+        Run one call on the chosen host.
+
+        A connection or server failure ejects the host; success marks the
+        model as loaded there.
+
+        Args:
+            model: The model name
+
+        Yields:
+            The OllamaHost to send the call to
+        """
+        host = self.pick(model)
+        host.in_flight += 1
+        host.calls += 1
+        try:
+            yield host
+        except Exception as e:
+            if is_host_failure(e):
+                self.fail(host, e)
+            raise
+        else:
+            host.failures = 0
+            host.resident.setdefault(model, {})
+        finally:
+            host.in_flight -= 1
+
+    def fail(self, host: OllamaHost, error: BaseException) -> None:
+        """Eject a host after a failed probe or call."""
+        host.failures += 1
+        host.ejections += 1
+        host.last_error = str(error) or type(error).__name__
+        backoff = min(self.max_eject_seconds, self.eject_seconds * 2 ** (host.failures - 1))
+        host.ejected_until = time.monotonic() + backoff
+        if self.size > 1:
+            log(f"Warning: Ejected Ollama host {host.name} for {backoff:.0f}s: {host.last_error}")
+
+    async def probe(self, host: OllamaHost) -> None:
+        """Check one host and re-read its loaded models."""
+        try:
+            response = await asyncio.wait_for(get_ollama_client(host.url).ps(), self.probe_timeout)
+        except Exception as e:
+            self.fail(host, e)
+            return
+        host.resident = {model.get("model") or model.get("name"): model
+                         for model in response.get("models", [])}
+        host.probed_at = time.monotonic()
+        host.failures = 0
+        host.ejected_until = 0.0
+        host.last_error = None
+
+    async def refresh(self) -> None:
+        """Probe every host."""
+        await asyncio.gather(*(self.probe(host) for host in self.hosts))
+
+    def loaded_models(self) -> Dict[str, Dict[str, Any]]:
+        """Models loaded on any healthy host, with the /api/ps entry of one of them."""
+        now = time.monotonic()
+        loaded: Dict[str, Dict[str, Any]] = {}
+        for host in self.hosts:
+            if host.available(now):
+                for model, entry in host.resident.items():
+                    if entry or model not in loaded:
+                        loaded[model] = entry
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        """Load and health per host."""
+        return {host.name: host.as_dict() for host in self.hosts}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                log(f"Warning: Ollama health probe failed: {e}")
+            await asyncio.sleep(self.probe_interval)
+
+
+def is_host_failure(error: BaseException) -> bool:
+    """
+    Whether an error means the host (rather than the request) is at fault.
+
+    Args:
+        error: Exception raised by an Ollama call
+
+    Returns:
+        True for connection errors, timeouts and server errors
+    """
+    if isinstance(error, (ConnectionError, asyncio.TimeoutError)):
+        return True
+    # Only reached after a call, so the client libraries are already loaded
+    import httpx
+    import ollama
+
+    if isinstance(error, httpx.TransportError):
+        return True
+    return isinstance(error, ollama.ResponseError) and error.status_code >= 500
+
+
+ollama_pool = OllamaHostPool()
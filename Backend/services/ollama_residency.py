@@ -0,0 +1,281 @@
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import time
+from Backend.core.settings import settings
+from .http_client import get_ollama_client
+from .ollama_pool import OllamaHost, ollama_pool
+from .tracing import log
+
+
+class _ModelRecord:
+    """Residency and load history of one Ollama model."""
+
+    def __init__(self):
+        self.resident = False
+        self.expires_at: Optional[str] = None
+        self.calls = 0
+        self.cold_loads = 0
+        self.cold_load_seconds = 0.0
+        self.last_cold_load: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "resident": self.resident,
+            "expires_at": self.expires_at,
+            "calls": self.calls,
+            "cold_loads": self.cold_loads,
+            "cold_load_seconds": self.cold_load_seconds,
+            "mean_cold_load": self.cold_load_seconds / self.cold_loads if self.cold_loads else 0.0,
+            "last_cold_load": self.last_cold_load,
+        }
+
+
+class ResidencyManager:
+    """
+    Keeps Ollama models loaded and schedules calls to avoid swapping.
+
+    Configured models are preloaded at startup and every call asks Ollama
+    to keep its model loaded for a per-model `keep_alive`. Calls for
+    different models are grouped: at most `max_resident` models run at
+    once, a call for a model that is already running joins it, and when a
+    model drains the next group goes to a model that is still resident
+    before one that would need loading. A model kept busy by new arrivals
+    lets others in after `switch_after` calls, and a model waiting longer
+    than `max_wait` is served next regardless of residency.
+    """
+
+    def __init__(self,
+                 max_resident: int = settings.OLLAMA_MAX_RESIDENT_MODELS,
+                 switch_after: int = settings.OLLAMA_SWITCH_AFTER,
+                 max_wait: float = settings.OLLAMA_SWAP_MAX_WAIT,
+                 poll_interval: float = settings.OLLAMA_RESIDENCY_POLL_INTERVAL):
+        """
+        Initialize the manager.
+
+        Args:
+            max_resident: Models that may run at the same time on one host
+            switch_after: Calls a running model admits while others wait
+            max_wait: Seconds after which a waiting model is served next
+            poll_interval: Period of the resident model refresh
+        """
+        # Each host of the pool can keep its own set of models loaded
+        self.max_resident = max(1, max_resident) * ollama_pool.size
+        self.switch_after = max(1, switch_after)
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self._records: Dict[str, _ModelRecord] = {}
+        # Calls running per model, and calls admitted while another model waited
+        self._running: Dict[str, int] = {}
+        self._served: Dict[str, int] = {}
+        self._waiting: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {}
+        self._last_started: Optional[str] = None
+        self.switches = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def keep_alive(self, model: str) -> str:
+        """How long Ollama should keep `model` loaded after a call."""
+        return settings.OLLAMA_KEEP_ALIVE_PER_MODEL.get(model, settings.OLLAMA_KEEP_ALIVE)
+
+    async def start(self) -> None:
+        """Start preloading the configured models and polling residency."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background preload and polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def preload(self, model: str) -> None:
+        """
+        Load a model into memory on every Ollama host without generating anything.
+
+        Args:
+            model: The model name
+
+        Raises:
+            Exception: The first error, if the model could not be loaded on any host
+        """
+        async with self.hold(model):
+            results = await asyncio.gather(
+                *(self._preload_on(host, model) for host in ollama_pool.hosts), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if len(errors) == len(results):
+            raise errors[0]
+
+    @asynccontextmanager
+    async def hold(self, model: str):
+        """
+        Run the block once `model` may use the Ollama server.
+
+        Args:
+            model: The model name
+        """
+        if self._can_start(model):
+            self._enter(model)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            queue = self._waiting.setdefault(model, deque())
+            queue.append((time.monotonic(), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Started just as the caller gave up
+                    self._leave(model)
+                else:
+                    self._forget(model, future)
+                raise
+        try:
+            yield
+        finally:
+            self._leave(model)
+
+    def record(self, model: str, response: Any) -> None:
+        """
+        Update residency from a finished Ollama response.
+
+        Args:
+            model: The model name
+            response: The final generate/chat response (or stream part)
+        """
+        record = self._record(model)
+        record.calls += 1
+        record.resident = True
+        load_duration = (response.get("load_duration") or 0) / 1e9
+        if load_duration >= settings.OLLAMA_COLD_LOAD_THRESHOLD:
+            record.cold_loads += 1
+            record.cold_load_seconds += load_duration
+            record.last_cold_load = load_duration
+            log(f"Ollama loaded {model} in {load_duration:.1f}s")
+
+    async def refresh(self) -> None:
+        """Re-read the set of loaded models from the latest Ollama host probes."""
+        loaded = ollama_pool.loaded_models()
+        for name, record in self._records.items():
+            record.resident = name in loaded
+        for name, model in loaded.items():
+            record = self._record(name)
+            record.resident = True
+            expires_at = model.get("expires_at")
+            record.expires_at = expires_at.isoformat() if expires_at else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Residency, cold loads and scheduling state per model."""
+        return {
+            "max_resident": self.max_resident,
+            "running": dict(self._running),
+            "waiting": {model: len(queue) for model, queue in self._waiting.items()},
+            "switches": self.switches,
+            "models": {
+                model: {**record.as_dict(), "keep_alive": self.keep_alive(model)}
+                for model, record in self._records.items()
+            },
+        }
+
+    async def _preload_on(self, host: OllamaHost, model: str) -> None:
+        # An empty prompt makes Ollama load the model and return at once
+        response = await get_ollama_client(host.url).generate(
+            model=model, prompt="", keep_alive=self.keep_alive(model))
+        self.record(model, response)
+        host.resident.setdefault(model, {})
+
+    def _record(self, model: str) -> _ModelRecord:
+        record = self._records.get(model)
+        if record is None:
+            record = self._records[model] = _ModelRecord()
+        return record
+
+    def _can_start(self, model: str) -> bool:
+        if model in self._running:
+            # Stay on the hot model, but not indefinitely while others wait
+            others_waiting = any(name != model for name in self._waiting)
+            return not others_waiting or self._served[model] < self.switch_after
+        # Queue behind models that are waiting for a slot of their own
+        queued = any(name not in self._running for name in self._waiting)
+        return len(self._running) < self.max_resident and not queued
+
+    def _enter(self, model: str) -> None:
+        if model not in self._running:
+            if self._last_started is not None and self._last_started != model:
+                self.switches += 1
+            self._last_started = model
+            self._running[model] = 0
+            self._served[model] = 0
+        self._running[model] += 1
+        if any(name != model for name in self._waiting):
+            self._served[model] += 1
+
+    def _leave(self, model: str) -> None:
+        self._running[model] -= 1
+        drained = None
+        if self._running[model] == 0:
+            del self._running[model]
+            del self._served[model]
+            drained = model
+        self._dispatch(drained)
+
+    def _dispatch(self, drained: Optional[str] = None) -> None:
+        while self._waiting:
+            model = self._next_model(drained)
+            if model is None:
+                return
+            # Start the whole group waiting on this model together
+            queue = self._waiting.pop(model)
+            for _, future in queue:
+                if not future.done():
+                    self._enter(model)
+                    future.set_result(None)
+
+    def _next_model(self, drained: Optional[str]) -> Optional[str]:
+        if len(self._running) >= self.max_resident:
+            return None
+        now = time.monotonic()
+
+        def priority(model: str) -> Tuple[bool, bool, bool, float]:
+            waited_since = self._waiting[model][0][0]
+            overdue = now - waited_since >= self.max_wait
+            # The model that just had its turn goes after the others
+            return (not overdue, model == drained, not self._record(model).resident, waited_since)
+
+        candidates = [model for model in self._waiting if model not in self._running]
+        return min(candidates, key=priority, default=None)
+
+    def _forget(self, model: str, future: asyncio.Future) -> None:
+        queue = self._waiting.get(model)
+        if queue is None:
+            return
+        for entry in list(queue):
+            if entry[1] is future:
+                queue.remove(entry)
+        if not queue:
+            del self._waiting[model]
+            self._dispatch()
+
+    def _preload_models(self) -> List[str]:
+        if settings.OLLAMA_PRELOAD_MODELS is None:
+            return [settings.OLLAMA_MODEL]
+        return settings.OLLAMA_PRELOAD_MODELS
+
+    async def _run(self) -> None:
+        for model in self._preload_models():
+            try:
+                await self.preload(model)
+            except Exception as e:
+                log(f"Warning: Could not preload Ollama model {model}: {e}")
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                log(f"Warning: Could not refresh resident Ollama models: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+ollama_residency = ResidencyManager()
@@ -0,0 +1,369 @@
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from Backend.core.prompts import LEVEL_RANGES
+from Backend.core.settings import settings
+from .metrics import library_lookups
+from .tracing import log
+
+# Words ignored when comparing topics ("The history of the internet" ~ "Internet history")
+_STOPWORDS = {"a", "an", "the", "of", "in", "on", "and", "or", "for", "to", "about", "with", "at", "by"}
+_COLUMNS = "p.id, p.topic, p.language, p.level, p.style, p.provider, p.model, p.score, p.created_at, p.uses"
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\w+", text.casefold())
+
+
+def normalize_topic(topic: str) -> str:
+    """Lower-cased topic with punctuation and extra whitespace removed."""
+    return " ".join(_words(topic))
+
+
+def _stem(word: str) -> str:
+    # Crude plural folding, applied to both sides: "cities" ~ "city", "houses" ~ "house"
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return word[:-1] if word.endswith("e") else word
+
+
+def _topic_terms(topic: str) -> Set[str]:
+    # The "s" of a possessive ("internet's") is split off as a word of its own
+    return {_stem(word) for word in _words(topic) if word != "s" and word not in _STOPWORDS}
+
+
+def topic_similarity(first: str, second: str) -> float:
+    """
+    How alike two topics are, from 0 to 1.
+
+    Topics are compared by their content words (articles, prepositions and
+    plurals aside). When the words of one topic all appear in the other,
+    the similarity is the share of their combined words they have in
+    common: "Active volcanoes" and "Volcanoes" score 0.5, reordered topics
+    1.0. Otherwise it is 0, so "World War 1" and "World War 2" never match.
+
+    Args:
+        first: A topic
+        second: Another topic
+
+    Returns:
+        1.0 for the same topic, 0.0 for unrelated ones
+    """
+    first_terms, second_terms = _topic_terms(first), _topic_terms(second)
+    if not first_terms or not second_terms:
+        return float(normalize_topic(first) == normalize_topic(second))
+    if not (first_terms <= second_terms or second_terms <= first_terms):
+        return 0.0
+    return len(first_terms & second_terms) / len(first_terms | second_terms)
+
+
+def _match_query(words: List[str], operator: str) -> str:
+    # Quoted so user input can never be read as FTS5 query syntax
+    return f" {operator} ".join(f'"{word}"' for word in words)
+
+
+class PassageLibrary:
+    """
+    Accepted passages kept for reuse and search.
+
+    Every passage the text generator accepts (English ones only when they
+    landed inside the level range) is stored with its topic, language,
+    level, style, provider, model and Gunning Fog score. An FTS5 index over
+    topic and text finds candidates for `find_reusable` and `search`; where
+    SQLite lacks FTS5, LIKE queries are used instead. Identical texts are
+    stored once.
+
+    Queries run in a worker thread so the event loop is never blocked.
+    """
+
+    def __init__(self,
+                 sqlite_path: Optional[str] = settings.LIBRARY_SQLITE_PATH,
+                 enabled: bool = settings.LIBRARY_ENABLED,
+                 min_similarity: float = settings.LIBRARY_MIN_TOPIC_SIMILARITY):
+        """
+        Initialize the library.
+
+        Args:
+            sqlite_path: Path of the SQLite file, or None for an in-memory database
+            enabled: Whether passages are stored and reused at all
+            min_similarity: Topic similarity (0-1) a stored passage needs to be reused
+        """
+        self.sqlite_path = sqlite_path
+        self.enabled = enabled
+        self.min_similarity = min_similarity
+        self.fts = True
+        self.stored = 0
+        self.lookups = 0
+        self.reused = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+    async def add(self, topic: str, result: Dict[str, Any], provider: str, model: str) -> Optional[int]:
+        """
+        Store a generated passage if it was accepted.
+
+        Storage failures are logged and never fail the request.
+
+        Args:
+            topic: The topic the passage was generated for
+            result: The GeneratedTextResponse dictionary
+            provider: The provider that generated it
+            model: The model that generated it
+
+        Returns:
+            ID of the new passage, or None if it was not stored
+        """
+        if not self.enabled or result.get("library_id") is not None or not self._accepted(result):
+            return None
+        try:
+            passage_id = await asyncio.to_thread(self._disk_add, topic, result, provider, model)
+        except sqlite3.Error as e:
+            log(f"Warning: Could not store passage in the library: {e}")
+            return None
+        if passage_id is not None:
+            self.stored += 1
+        return passage_id
+
+    async def find_reusable(self, topic: str, language: str, level: str, style: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a stored passage to serve instead of generating a new one.
+
+        Args:
+            topic: The requested topic
+            language: The requested language
+            level: The requested difficulty level
+            style: The requested writing style
+
+        Returns:
+            The passage (including its text) on the most similar topic (see
+            `topic_similarity`), at least `min_similarity` alike and, for
+            scored passages, still inside the level range; on ties the least
+            served one, then the best bm25 match. None if there is no such
+            passage
+        """
+        if not self.enabled:
+            return None
+        self.lookups += 1
+        try:
+            candidates = await asyncio.to_thread(self._disk_candidates, topic, language, level, style)
+        except sqlite3.Error as e:
+            log(f"Warning: Could not search the passage library: {e}")
+            candidates = []
+
+        low, high = LEVEL_RANGES.get(level, (0, 25))
+        best = None
+        best_rank = None
+        # Candidates come exact topic first, then in bm25 order
+        for position, candidate in enumerate(candidates):
+            if candidate["score"] is not None and not low <= candidate["score"] <= high:
+                continue
+            similarity = topic_similarity(topic, candidate["topic"])
+            if similarity < self.min_similarity:
+                continue
+            rank = (similarity, -candidate["uses"], -position)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = candidate, rank
+
+        library_lookups.inc("hit" if best is not None else "miss")
+        if best is None:
+            return None
+        self.reused += 1
+        best["similarity"] = round(best_rank[0], 3)
+        try:
+            await asyncio.to_thread(self._disk_mark_used, best["id"])
+        except sqlite3.Error as e:
+            log(f"Warning: Could not update passage {best['id']} in the library: {e}")
+        return best
+
+    async def search(self,
+                     query: str = "",
+                     language: Optional[str] = None,
+                     level: Optional[str] = None,
+                     style: Optional[str] = None,
+                     limit: int = settings.LIBRARY_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Full-text search over the topics and texts of stored passages.
+
+        Args:
+            query: Words that must all appear in the topic or text (empty lists the newest passages)
+            language: Only passages in this language
+            level: Only passages of this level
+            style: Only passages in this style
+            limit: Maximum number of passages
+
+        Returns:
+            Passage metadata with a short "snippet" of the text, best matches first
+        """
+        return await asyncio.to_thread(self._disk_search, query, language, level, style, limit)
+
+    async def get(self, passage_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get one stored passage.
+
+        Args:
+            passage_id: The passage ID
+
+        Returns:
+            The passage including its text, or None if there is none with that ID
+        """
+        return await asyncio.to_thread(self._disk_get, passage_id)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Stored passages, lookups and reuse counters."""
+        passages = await asyncio.to_thread(self._disk_count)
+        return {
+            "enabled": self.enabled,
+            "persistent": bool(self.sqlite_path),
+            "full_text_index": self.fts,
+            "passages": passages,
+            "stored": self.stored,
+            "lookups": self.lookups,
+            "reused": self.reused,
+            "reuse_rate": self.reused / self.lookups if self.lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection, if open."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    @staticmethod
+    def _accepted(result: Dict[str, Any]) -> bool:
+        score = result.get("score")
+        if score is None:
+            # Non-English passages are not scored
+            return result.get("language") != "English"
+        low, high = LEVEL_RANGES.get(result.get("level"), (0, 25))
+        return low <= score <= high
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.sqlite_path or ":memory:", check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS passages "
+                "(id INTEGER PRIMARY KEY, topic TEXT NOT NULL, topic_key TEXT NOT NULL, "
+                "language TEXT NOT NULL, level TEXT NOT NULL, style TEXT NOT NULL, style_key TEXT NOT NULL, "
+                "provider TEXT, model TEXT, score REAL, text TEXT NOT NULL, text_hash TEXT UNIQUE, "
+                "created_at REAL NOT NULL, uses INTEGER NOT NULL DEFAULT 0, last_used_at REAL)")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS passages_request "
+                "ON passages (language COLLATE NOCASE, level, style_key)")
+            try:
+                self._db.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS passages_fts USING fts5"
+                    "(topic, text, content='passages', content_rowid='id', tokenize='porter unicode61')")
+            except sqlite3.OperationalError as e:
+                log(f"Warning: SQLite has no FTS5, the passage library falls back to LIKE queries: {e}")
+                self.fts = False
+            self._db.commit()
+        return self._db
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {name: row[name] for name in row.keys()}
+
+    def _disk_add(self, topic: str, result: Dict[str, Any], provider: str, model: str) -> Optional[int]:
+        text = result["generated_text"]
+        with self._db_lock:
+            db = self._connection()
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO passages "
+                "(topic, topic_key, language, level, style, style_key, provider, model, score, text, text_hash, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (topic.strip(), normalize_topic(topic), result["language"], result["level"], result["style"],
+                 " ".join(result["style"].casefold().split()), provider.lower(), model, result.get("score"),
+                 text, hashlib.sha256(text.encode("utf-8")).hexdigest(), time.time()))
+            if cursor.rowcount == 0:
+                # The same text is already stored
+                return None
+            if self.fts:
+                db.execute("INSERT INTO passages_fts (rowid, topic, text) VALUES (?, ?, ?)",
+                           (cursor.lastrowid, topic.strip(), text))
+            db.commit()
+            return cursor.lastrowid
+
+    def _disk_candidates(self, topic: str, language: str, level: str, style: str) -> List[Dict[str, Any]]:
+        filters = "p.language = ? COLLATE NOCASE AND p.level = ? AND p.style_key = ?"
+        params = (language, level, " ".join(style.casefold().split()))
+        words = _words(topic)
+        with self._db_lock:
+            db = self._connection()
+            rows = db.execute(
+                f"SELECT {_COLUMNS}, p.text FROM passages p WHERE p.topic_key = ? AND {filters}",
+                (normalize_topic(topic), *params)).fetchall()
+            if words and self.fts:
+                rows += db.execute(
+                    f"SELECT {_COLUMNS}, p.text FROM passages_fts JOIN passages p ON p.id = passages_fts.rowid "
+                    f"WHERE passages_fts MATCH ? AND {filters} ORDER BY bm25(passages_fts) LIMIT 50",
+                    (f"topic : ({_match_query(words, 'OR')})", *params)).fetchall()
+            elif words:
+                rows += db.execute(
+                    f"SELECT {_COLUMNS}, p.text FROM passages p "
+                    f"WHERE ({' OR '.join('p.topic_key LIKE ?' for _ in words)}) AND {filters} LIMIT 50",
+                    (*(f"%{word}%" for word in words), *params)).fetchall()
+        return list({row["id"]: self._row(row) for row in rows}.values())
+
+    def _disk_mark_used(self, passage_id: int) -> None:
+        with self._db_lock:
+            db = self._connection()
+            db.execute("UPDATE passages SET uses = uses + 1, last_used_at = ? WHERE id = ?",
+                       (time.time(), passage_id))
+            db.commit()
+
+    def _disk_search(self, query: str, language: Optional[str], level: Optional[str],
+                     style: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        filters = []
+        params: List[Any] = []
+        if language:
+            filters.append("p.language = ? COLLATE NOCASE")
+            params.append(language)
+        if level:
+            filters.append("p.level = ?")
+            params.append(level)
+        if style:
+            filters.append("p.style_key = ?")
+            params.append(" ".join(style.casefold().split()))
+        words = _words(query)
+        with self._db_lock:
+            db = self._connection()
+            if words and self.fts:
+                where = " AND ".join(["passages_fts MATCH ?", *filters])
+                rows = db.execute(
+                    f"SELECT {_COLUMNS}, snippet(passages_fts, 1, '', '', '...', 24) AS snippet "
+                    f"FROM passages_fts JOIN passages p ON p.id = passages_fts.rowid "
+                    f"WHERE {where} ORDER BY bm25(passages_fts) LIMIT ?",
+                    (_match_query(words, "AND"), *params, limit)).fetchall()
+            else:
+                for word in words:
+                    filters.append("(p.topic LIKE ? OR p.text LIKE ?)")
+                    params.extend([f"%{word}%"] * 2)
+                where = " AND ".join(filters) or "1"
+                rows = db.execute(
+                    f"SELECT {_COLUMNS}, substr(p.text, 1, 160) AS snippet FROM passages p "
+                    f"WHERE {where} ORDER BY p.created_at DESC LIMIT ?",
+                    (*params, limit)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def _disk_get(self, passage_id: int) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            row = self._connection().execute(
+                f"SELECT {_COLUMNS}, p.text FROM passages p WHERE p.id = ?", (passage_id,)).fetchone()
+        return self._row(row) if row is not None else None
+
+    def _disk_count(self) -> int:
+        with self._db_lock:
+            return self._connection().execute("SELECT COUNT(*) FROM passages").fetchone()[0]
+
+
+passage_library = PassageLibrary()
@@ -0,0 +1,90 @@
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import asyncio
+from contextlib import aclosing
+from .question_generator import QuestionGenerator
+from .text_generator import TextGenerator
+
+
+class WorksheetPipeline:
+    """
+    Generates a passage and its questions in one server-side pass.
+
+    Question generation starts as soon as the passage is accepted, so it
+    runs while the passage is still being serialised and sent, and the
+    passage never has to make a round trip through the client.
+    """
+
+    def __init__(self, provider: str, model: Optional[str] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            provider: The provider name used for both stages
+            model: The model name (defaults to the provider's default model)
+        """
+        self.text_generator = TextGenerator(provider=provider, model=model)
+        self.question_generator = QuestionGenerator(
+            provider=provider, model=model)
+
+    async def run(self,
+                  topic: str,
+                  language: str,
+                  level: str,
+                  style: str,
+                  num_questions: int,
+                  choices_num: int,
+                  bypass_cache: bool = False,
+                  reuse: bool = False) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate a worksheet, yielding each stage's output as it is ready.
+
+        Args:
+            topic: The topic for the generated text
+            language: The language of the text and questions
+            level: The difficulty level (Basic, Intermediate, Advanced)
+            style: The writing style
+            num_questions: The number of questions to generate
+            choices_num: The number of choices for each question
+            bypass_cache: Skip the result caches and always generate
+            reuse: Serve a matching passage from the library if there is one
+
+        Yields:
+            (event, data) tuples: "iteration" for each scored English
+            attempt, "text" with the generated text response, then
+            "questions" with the generated questions response
+
+        Raises:
+            ValueError: If topic is empty
+            Exception: If either stage fails
+        """
+        question_task: Optional[asyncio.Task] = None
+        try:
+            async with aclosing(self.text_generator.generate_text_stream(
+                    topic=topic,
+                    language=language,
+                    level=level,
+                    style=style,
+                    bypass_cache=bypass_cache,
+                    stream_tokens=False,
+                    reuse=reuse)) as events:
+                async for event, data in events:
+                    if event != "result":
+                        yield event, data
+                        continue
+                    # Start on the questions before the passage goes out
+                    question_task = asyncio.create_task(self.question_generator.generate_questions(
+                        generated_text=data["generated_text"],
+                        num_questions=num_questions,
+                        language=language,
+                        choices_num=choices_num,
+                        bypass_cache=bypass_cache,
+                    ))
+                    yield "text", data
+
+            if question_task is None:
+                raise Exception("Text generation finished without a passage")
+            yield "questions", await question_task
+        finally:
+            if question_task is not None and not question_task.done():
+                # The client went away: stop paying for the questions
+                question_task.cancel()
@@ -0,0 +1,186 @@
+from typing import Any, Dict, List, Optional, Tuple
+import time
+from Backend.core.settings import settings
+from .admission import Priority, request_priority
+
+TextKey = Tuple[str, str, str, str, str, str]
+QuestionKey = Tuple[str, str, str, int, int]
+# Combinations remembered per kind; the least requested are forgotten first
+MAX_TRACKED = 2000
+
+
+def _value(value: Any) -> str:
+    # Enum members (LevelEnum) are tracked by their value
+    return str(getattr(value, "value", value))
+
+
+def _fold(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+
+class _Demand:
+    """Request count of one combination, decaying with a half-life."""
+
+    def __init__(self, fields: Dict[str, Any]):
+        # The combination as first requested, used to generate it again
+        self.fields = fields
+        self.score = 0.0
+        self.requests = 0
+        self.updated_at = time.time()
+
+    def current(self, now: float, half_life: float) -> float:
+        return self.score * 0.5 ** ((now - self.updated_at) / half_life)
+
+    def add(self, now: float, half_life: float) -> None:
+        self.score = self.current(now, half_life) + 1
+        self.updated_at = now
+        self.requests += 1
+
+
+class RequestPopularity:
+    """
+    Tracks which text and question requests are popular, and how many hit the cache.
+
+    Every text or question request that is not background work counts
+    towards its combination with a weight that halves every `half_life`
+    seconds, so `trending_texts` follows what is asked for right now.
+    The time of the last request per provider tells the pre-generation
+    worker when a provider has gone quiet.
+    """
+
+    def __init__(self, half_life: float = settings.PREWARM_HALF_LIFE):
+        """
+        Initialize the tracker.
+
+        Args:
+            half_life: Seconds after which a request counts half
+        """
+        self.half_life = half_life
+        self._texts: Dict[TextKey, _Demand] = {}
+        self._questions: Dict[QuestionKey, _Demand] = {}
+        self._last_request: Dict[str, float] = {}
+        self._lookups = {"text": [0, 0], "questions": [0, 0]}
+
+    def text_requested(self,
+                       provider: str,
+                       model: str,
+                       topic: str,
+                       language: str,
+                       level: str,
+                       style: str,
+                       cached: Optional[bool]) -> None:
+        """
+        Count a text request.
+
+        Args:
+            provider: The provider name
+            model: The model name
+            topic: The requested topic
+            language: The requested language
+            level: The requested difficulty level
+            style: The requested writing style
+            cached: Whether it was served from the cache (None if the cache was bypassed)
+        """
+        if not self._counted(provider, "text", cached):
+            return
+        level = _value(level)
+        key = (provider.lower(), model, _fold(topic), language, level, _fold(style))
+        self._add(self._texts, key, {"provider": provider.lower(), "model": model, "topic": topic.strip(),
+                                     "language": language, "level": level, "style": style})
+
+    def questions_requested(self,
+                            provider: str,
+                            model: str,
+                            language: str,
+                            num_questions: int,
+                            choices_num: int,
+                            cached: Optional[bool]) -> None:
+        """
+        Count a question request.
+
+        Args:
+            provider: The provider name
+            model: The model name
+            language: The language of the questions
+            num_questions: The number of questions
+            choices_num: The number of choices per question
+            cached: Whether it was served from the cache (None if the cache was bypassed)
+        """
+        if not self._counted(provider, "questions", cached):
+            return
+        key = (provider.lower(), model, language, num_questions, choices_num)
+        self._add(self._questions, key, {"provider": provider.lower(), "model": model, "language": language,
+                                         "num_questions": num_questions, "choices_num": choices_num})
+
+    def trending_texts(self, limit: int, min_score: float) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        The most requested text combinations.
+
+        Args:
+            limit: Maximum number of combinations
+            min_score: Decayed request count a combination needs
+
+        Returns:
+            (combination, decayed request count) pairs, most requested first
+        """
+        return self._top(self._texts, limit, min_score)
+
+    def question_shapes(self, language: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        The most requested question settings for passages in a language.
+
+        Args:
+            language: The language of the passage
+            limit: Maximum number of settings
+
+        Returns:
+            Dictionaries with provider, model, language, num_questions and choices_num
+        """
+        matching = {key: demand for key, demand in self._questions.items() if key[2] == language}
+        return [fields for fields, _ in self._top(matching, limit, 0.0)]
+
+    def idle_for(self, provider: str) -> float:
+        """Seconds since the last counted request to a provider."""
+        last = self._last_request.get(provider.lower())
+        return float("inf") if last is None else time.monotonic() - last
+
+    def stats(self, limit: int = settings.PREWARM_TOP_COMBINATIONS) -> Dict[str, Any]:
+        """Cache hit rates of counted requests and the most requested combinations."""
+        return {
+            "hit_rate": {
+                kind: {"lookups": lookups, "hits": hits, "hit_rate": hits / lookups if lookups else 0.0}
+                for kind, (lookups, hits) in self._lookups.items()
+            },
+            "trending_texts": [{**fields, "score": round(score, 2)}
+                               for fields, score in self.trending_texts(limit, 0.0)],
+            "trending_questions": [{**fields, "score": round(score, 2)}
+                                   for fields, score in self._top(self._questions, limit, 0.0)],
+        }
+
+    def _counted(self, provider: str, kind: str, cached: Optional[bool]) -> bool:
+        if request_priority.get() is Priority.BACKGROUND:
+            # Pre-generation does not make a combination more popular
+            return False
+        self._last_request[provider.lower()] = time.monotonic()
+        if cached is not None:
+            self._lookups[kind][0] += 1
+            self._lookups[kind][1] += int(cached)
+        return True
+
+    def _add(self, demands: Dict[Any, _Demand], key: Any, fields: Dict[str, Any]) -> None:
+        now = time.time()
+        demand = demands.get(key)
+        if demand is None:
+            if len(demands) >= MAX_TRACKED:
+                del demands[min(demands, key=lambda k: demands[k].current(now, self.half_life))]
+            demand = demands[key] = _Demand(fields)
+        demand.add(now, self.half_life)
+
+    def _top(self, demands: Dict[Any, _Demand], limit: int, min_score: float) -> List[Tuple[Dict[str, Any], float]]:
+        now = time.time()
+        scored = [(demand.fields, demand.current(now, self.half_life)) for demand in demands.values()]
+        scored = [item for item in scored if item[1] >= min_score]
+        return sorted(scored, key=lambda item: item[1], reverse=True)[:limit]
+
+
+popularity = RequestPopularity()
@@ -0,0 +1,276 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+import asyncio
+import time
+from Backend.core.prompts import LEVEL_RANGES
+from Backend.core.settings import settings
+from .admission import Priority, admission_stats, request_priority
+from .metrics import prewarm_jobs
+from .popularity import popularity
+from .question_generator import QuestionGenerator
+from .result_cache import question_cache, text_cache
+from .text_generator import TextGenerator
+from .tracing import log
+
+# Seconds between checks for interactive work on the provider of a running pre-generation
+PREEMPT_CHECK_INTERVAL = 0.5
+# Seconds a combination is skipped after its pre-generation failed
+FAILURE_COOLDOWN = 600.0
+
+Job = Tuple[str, str, str, Callable[[], Awaitable[Any]]]
+
+
+def _combination(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """A PREWARM_COMBINATIONS entry with the defaults of a text request filled in."""
+    provider = entry.get("provider", settings.OLLAMA_PROVIDER)
+    return {
+        "provider": provider.lower(),
+        "model": entry.get("model"),
+        "topic": entry["topic"],
+        "language": entry.get("language", "English"),
+        "level": entry["level"],
+        "style": entry.get("style", "Formal"),
+        "num_questions": entry.get("num_questions"),
+        "choices_num": entry.get("choices_num"),
+    }
+
+
+class PrewarmWorker:
+    """
+    Pre-generates popular passages and question sets while providers are idle.
+
+    Candidates are the configured combinations, the most requested text
+    combinations (see `popularity`) and, optionally, the other levels of
+    those topics. For each candidate whose passage is not cached, the
+    passage is generated; once it is, question sets in the most requested
+    shapes for its language are generated for it. Both go through the
+    regular generators, so they fill the result caches and the passage
+    library exactly as an interactive request would.
+
+    A job only starts when its provider has no generation running or
+    queued and has had no request for `idle_seconds`. Its LLM calls run at
+    background priority and the job is cancelled as soon as an interactive
+    or batch call runs or waits on the same provider. At most
+    `max_jobs_per_hour` jobs start in any hour.
+    """
+
+    def __init__(self,
+                 enabled: bool = settings.PREWARM_ENABLED,
+                 combinations: List[Dict[str, Any]] = settings.PREWARM_COMBINATIONS,
+                 interval: float = settings.PREWARM_INTERVAL,
+                 idle_seconds: float = settings.PREWARM_IDLE_SECONDS,
+                 max_jobs_per_hour: int = settings.PREWARM_MAX_JOBS_PER_HOUR,
+                 top_combinations: int = settings.PREWARM_TOP_COMBINATIONS,
+                 min_requests: float = settings.PREWARM_MIN_REQUESTS,
+                 expand_levels: bool = settings.PREWARM_EXPAND_LEVELS,
+                 question_sets: int = settings.PREWARM_QUESTION_SETS):
+        """
+        Initialize the worker.
+
+        Args:
+            enabled: Whether the worker runs at all
+            combinations: Text combinations always kept warm
+            interval: Pause between scheduling passes that found nothing to do
+            idle_seconds: Quiet time a provider needs before it is used
+            max_jobs_per_hour: Most pre-generations started in any hour
+            top_combinations: Most requested combinations considered
+            min_requests: Decayed request count a combination needs to be considered
+            expand_levels: Also warm the other levels of a trending topic
+            question_sets: Question shapes warmed per passage
+        """
+        self.enabled = enabled
+        self.combinations = []
+        for entry in combinations:
+            try:
+                self.combinations.append(_combination(entry))
+            except (KeyError, AttributeError):
+                log(f"Warning: Ignoring PREWARM_COMBINATIONS entry without topic and level: {entry}")
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.max_jobs_per_hour = max_jobs_per_hour
+        self.top_combinations = top_combinations
+        self.min_requests = min_requests
+        self.expand_levels = expand_levels
+        self.question_sets = question_sets
+        self._started: Deque[float] = deque()
+        self._failed: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.jobs = {"text": 0, "questions": 0}
+        self.failed = 0
+        self.preempted = 0
+        self.last_job: Optional[Dict[str, Any]] = None
+
+    async def start(self) -> None:
+        """
+        Start the background loop, if enabled.
+
+        Pre-generated results only pay off through the result cache, so the
+        worker stays off while CACHE_ENABLED is false.
+        """
+        if not self.enabled or self._task is not None:
+            return
+        if not settings.CACHE_ENABLED:
+            log("Warning: Background pre-generation is disabled because the result cache is off (CACHE_ENABLED=false)")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background loop, cancelling a running job."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self) -> bool:
+        """
+        Run one scheduling pass.
+
+        Returns:
+            True if a job ran (whatever its outcome), False if there was
+            nothing to do, no budget left, no idle provider or no result
+            cache to warm
+        """
+        if self.budget_left() < 1 or not settings.CACHE_ENABLED:
+            return False
+        job = await self._next_job()
+        if job is None:
+            return False
+        kind, provider, key, run = job
+        self._started.append(time.monotonic())
+        self.jobs[kind] += 1
+        outcome = await self._run_job(provider, run)
+        if outcome == "failed":
+            self._failed[key] = time.monotonic()
+        prewarm_jobs.inc(kind, outcome)
+        return True
+
+    def budget_left(self) -> int:
+        """Jobs that may still start in the current hour."""
+        hour_ago = time.monotonic() - 3600
+        while self._started and self._started[0] <= hour_ago:
+            self._started.popleft()
+        return max(0, self.max_jobs_per_hour - len(self._started))
+
+    def candidates(self) -> List[Dict[str, Any]]:
+        """Text combinations to keep warm: configured first, then the most requested."""
+        trending = [fields for fields, _ in popularity.trending_texts(self.top_combinations, self.min_requests)]
+        candidates = list(self.combinations) + trending
+        if self.expand_levels:
+            candidates += [{**fields, "level": level}
+                           for fields in trending for level in LEVEL_RANGES if level != fields["level"]]
+        return candidates
+
+    def stats(self) -> Dict[str, Any]:
+        """Jobs run, budget and the interactive hit rates the worker is meant to raise."""
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "budget": {"max_jobs_per_hour": self.max_jobs_per_hour, "left": self.budget_left()},
+            "jobs": dict(self.jobs),
+            "failed": self.failed,
+            "preempted": self.preempted,
+            "last_job": self.last_job,
+            "configured": len(self.combinations),
+            **popularity.stats(self.top_combinations),
+        }
+
+    async def _next_job(self) -> Optional[Job]:
+        seen = set()
+        for combination in self.candidates():
+            if not self._idle(combination["provider"]):
+                continue
+            generator = TextGenerator(provider=combination["provider"], model=combination["model"])
+            text_key = generator.cache_key(
+                combination["topic"], combination["language"], combination["level"], combination["style"])
+            if text_key in seen or self._cooling_down(text_key):
+                continue
+            seen.add(text_key)
+
+            passage = await text_cache.peek(text_key)
+            if passage is None:
+                self.last_job = {"kind": "text", **combination}
+                return "text", combination["provider"], text_key, lambda g=generator, c=combination: g.generate_text(
+                    c["topic"], c["language"], c["level"], c["style"])
+
+            for shape in self._question_shapes(combination):
+                if not self._idle(shape["provider"]):
+                    continue
+                questions = QuestionGenerator(provider=shape["provider"], model=shape["model"])
+                question_key = questions.cache_key(
+                    passage["generated_text"], shape["num_questions"], shape["language"], shape["choices_num"])
+                if self._cooling_down(question_key) or await question_cache.peek(question_key) is not None:
+                    continue
+                self.last_job = {"kind": "questions", **combination, **shape}
+                return "questions", shape["provider"], question_key, lambda q=questions, s=shape: q.generate_questions(
+                    passage["generated_text"], s["num_questions"], s["language"], s["choices_num"])
+        return None
+
+    def _question_shapes(self, combination: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if combination.get("num_questions"):
+            return [{"provider": combination["provider"], "model": combination["model"],
+                     "language": combination["language"], "num_questions": combination["num_questions"],
+                     "choices_num": combination.get("choices_num") or 4}]
+        return popularity.question_shapes(combination["language"], self.question_sets)
+
+    async def _run_job(self, provider: str, run: Callable[[], Awaitable[Any]]) -> str:
+        async def background():
+            # Interactive and batch calls are admitted ahead of these
+            request_priority.set(Priority.BACKGROUND)
+            await run()
+
+        task = asyncio.create_task(background())
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=PREEMPT_CHECK_INTERVAL)
+                if done:
+                    break
+                if self._contended(provider):
+                    self.preempted += 1
+                    log(f"Pre-generation on {provider} cancelled: the provider is needed by requests")
+                    return "preempted"
+            try:
+                task.result()
+            except Exception as e:
+                self.failed += 1
+                log(f"Warning: Pre-generation on {provider} failed: {e}")
+                return "failed"
+            return "done"
+        finally:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except BaseException:
+                    pass
+
+    def _idle(self, provider: str) -> bool:
+        if popularity.idle_for(provider) < self.idle_seconds:
+            return False
+        return all(stats["active"] == 0 and stats["queue_depth"] == 0
+                   for key, stats in admission_stats().items() if key.split("/", 1)[0] == provider.lower())
+
+    @staticmethod
+    def _contended(provider: str) -> bool:
+        return any(stats["running"][priority] or stats["queued"][priority]
+                   for key, stats in admission_stats().items() if key.split("/", 1)[0] == provider.lower()
+                   for priority in ("interactive", "batch"))
+
+    def _cooling_down(self, key: str) -> bool:
+        failed_at = self._failed.get(key)
+        return failed_at is not None and time.monotonic() - failed_at < FAILURE_COOLDOWN
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                ran = await self.run_once()
+            except Exception as e:
+                log(f"Warning: Pre-generation pass failed: {e}")
+                ran = False
+            # Keep going while there is work and idle capacity
+            await asyncio.sleep(0 if ran else self.interval)
+
+
+prewarm_worker = PrewarmWorker()
@@ -0,0 +1,159 @@
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from Backend.core.settings import settings
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler that can be switched on and off at runtime.
+
+    A background thread captures the stack of the event loop thread (or of
+    every thread) at a fixed interval and counts identical stacks. Nothing
+    is hooked into the interpreter, so the cost is one stack walk per sample
+    while running and nothing while stopped. Results are available as the
+    hottest functions or as collapsed stacks for flame graph tools.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stacks: Counter = Counter()
+        self._target: Optional[int] = None
+        self.interval = settings.PROFILER_INTERVAL
+        self.all_threads = False
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self,
+              interval: float = settings.PROFILER_INTERVAL,
+              all_threads: bool = False,
+              max_seconds: float = settings.PROFILER_MAX_SECONDS) -> None:
+        """
+        Start sampling, discarding the previous profile.
+
+        Must be called from the thread to profile (the event loop thread
+        when called from an endpoint).
+
+        Args:
+            interval: Seconds between samples
+            all_threads: Sample every thread instead of only the calling one
+            max_seconds: Stop automatically after this long
+        """
+        self.stop()
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.idle_samples = 0
+        self.interval = max(0.001, interval)
+        self.all_threads = all_threads
+        self._target = threading.get_ident()
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(max_seconds,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; the collected profile is kept."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def report(self, top: int = 30) -> Dict[str, Any]:
+        """
+        Summary of the collected profile.
+
+        Args:
+            top: Number of functions to list
+
+        Returns:
+            Sampling state, and the functions with the most samples on top of
+            the stack (self) and anywhere on the stack (total); samples of an
+            idle event loop are only counted in idle_samples
+        """
+        with self._lock:
+            stacks = list(self._stacks.items())
+            samples = self.samples
+            idle = self.idle_samples
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in stacks:
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+
+        def share(counter: Counter) -> List[Dict[str, Any]]:
+            return [{"function": frame, "samples": count, "percent": round(100 * count / samples, 2)}
+                    for frame, count in counter.most_common(top)] if samples else []
+
+        end = self.stopped_at or time.time()
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "all_threads": self.all_threads,
+            "samples": samples,
+            "idle_samples": idle,
+            "duration": round(end - self.started_at, 3) if self.started_at else 0.0,
+            "self": share(own),
+            "total": share(total),
+        }
+
+    def collapsed(self) -> str:
+        """The profile as collapsed stacks ("frame;frame;frame count" lines)."""
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def _run(self, max_seconds: float) -> None:
+        deadline = time.monotonic() + max_seconds
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.all_threads:
+                targets = [frame for ident, frame in frames.items() if ident != own_ident]
+            else:
+                targets = [frames[self._target]] if self._target in frames else []
+            with self._lock:
+                for frame in targets:
+                    if self._idle(frame):
+                        self.idle_samples += 1
+                    else:
+                        self._stacks[self._stack(frame)] += 1
+                self.samples += 1
+            if time.monotonic() > deadline:
+                break
+        self.stopped_at = time.time()
+
+    @staticmethod
+    def _idle(frame) -> bool:
+        # An event loop waiting for I/O sits in the selector's select()
+        code = frame.f_code
+        return code.co_name in ("select", "poll") and code.co_filename.endswith("selectors.py")
+
+    @staticmethod
+    def _stack(frame) -> str:
+        frames: List[Tuple[str, int, str]] = []
+        while frame is not None:
+            code = frame.f_code
+            # Package and module name are enough to tell the frames apart
+            filename = os.sep.join(code.co_filename.split(os.sep)[-2:])
+            frames.append((filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        return ";".join(f"{name} ({filename}:{line})" for filename, line, name in reversed(frames))
+
+
+profiler = SamplingProfiler()
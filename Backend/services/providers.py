@@ -0,0 +1,169 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+import importlib
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from Backend.core.settings import settings
+
+
+def is_text_model(model_id: str) -> bool:
+    """Whether a listed model can generate passages (speech models cannot)."""
+    return "whisper" not in model_id.lower() and "tts" not in model_id.lower()
+
+
+class ProviderBackend(ABC):
+    """
+    Base class of an LLM provider backend.
+
+    A backend talks to one provider's API; admission control, metrics and
+    tracing are handled by `LLMProvider` around it. Subclasses must implement
+    `generate`, `stream` and `list_models` (a backend missing one fails when
+    the registry instantiates it), and are registered with
+    `providers.register` under the name clients send as "provider".
+    """
+
+    name = ""
+    # Remind the model of the exact question and choice counts in the system prompt
+    strict_question_counts = False
+
+    @abstractmethod
+    async def generate(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Dict[str, str]:
+        """
+        Generate a completion.
+
+        Args:
+            model: The model name
+            messages: List of message dictionaries with role and content
+            **kwargs: "temperature" and "response_format" (JSON mode)
+
+        Returns:
+            Dictionary with the generated "content"
+        """
+
+    @abstractmethod
+    def stream(self, model: str, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """Stream a completion; accepts the same arguments as `generate`."""
+
+    @abstractmethod
+    async def list_models(self) -> List[Dict[str, Any]]:
+        """Models offered by the provider, as {"id", "provider", "details"} dictionaries."""
+
+    def hold(self, model: str):
+        """Async context manager held around every call (e.g. model residency)."""
+        return nullcontext()
+
+    @property
+    def capacity(self) -> int:
+        """Independent servers behind the provider; admission limits are multiplied by it."""
+        return 1
+
+    def affinity(self):
+        """Context manager keeping the calls made inside it on one server, where that matters."""
+        return nullcontext()
+
+
+class ProviderRegistry:
+    """
+    Maps provider names to backends, importing each backend on first use.
+
+    Backends are registered as "module:Class" paths, so neither the backend
+    module nor the SDK it wraps is imported until a request (or the model
+    catalogue) needs that provider. Extra backends can be plugged in with
+    the PROVIDER_BACKENDS setting.
+    """
+
+    def __init__(self):
+        self._targets: Dict[str, str] = {}
+        self._defaults: Dict[str, str] = {}
+        self._backends: Dict[str, ProviderBackend] = {}
+
+    def register(self, name: str, target: str, default_model_setting: str) -> None:
+        """
+        Register a backend.
+
+        Args:
+            name: Provider name used in requests and settings
+            target: "module:Class" path of the ProviderBackend subclass
+            default_model_setting: Settings attribute with the provider's default model
+        """
+        key = name.lower()
+        self._targets[key] = target
+        self._defaults[key] = default_model_setting
+        self._backends.pop(key, None)
+
+    def get(self, name: str) -> ProviderBackend:
+        """
+        Get the backend of a provider, importing it on first use.
+
+        Args:
+            name: The provider name
+
+        Returns:
+            The provider's backend instance
+
+        Raises:
+            ValueError: If no backend is registered under that name
+        """
+        key = name.lower()
+        backend = self._backends.get(key)
+        if backend is not None:
+            return backend
+        target = self._targets.get(key)
+        if target is None:
+            raise ValueError(f"Unknown provider: {name}")
+        module_name, _, class_name = target.partition(":")
+        backend_class = getattr(importlib.import_module(module_name), class_name)
+        backend = self._backends[key] = backend_class()
+        return backend
+
+    def names(self) -> List[str]:
+        """Every registered provider name."""
+        return list(self._targets)
+
+    def default_model(self, name: str) -> str:
+        """
+        Default model of a provider, without importing its backend.
+
+        Args:
+            name: The provider name
+
+        Returns:
+            The configured default model (OLLAMA_MODEL for unknown providers)
+        """
+        return getattr(settings, self._defaults.get(name.lower(), "OLLAMA_MODEL"))
+
+    def loaded(self) -> List[str]:
+        """Providers whose backend has been imported."""
+        return list(self._backends)
+
+    def check_settings(self) -> List[str]:
+        """
+        Look for configuration problems without contacting any provider.
+
+        Returns:
+            One message per problem; empty if the configuration looks usable
+        """
+        problems = []
+        for name, target in self._targets.items():
+            if ":" not in target:
+                problems.append(f"Provider '{name}' has an invalid backend path '{target}' (expected module:Class)")
+            if not hasattr(settings, self._defaults[name]):
+                problems.append(f"Provider '{name}' refers to an unknown default model setting {self._defaults[name]}")
+        if "groq" in self._targets and not settings.GROQ_API_KEY:
+            problems.append("GROQ_API_KEY is not set; Groq calls will fail and only the default Groq model is listed")
+        for setting in ("SPECULATIVE_CANDIDATES", "QUESTION_SHARD_SIZE", "BATCH_CONCURRENCY",
+                        "ADMISSION_MAX_CONCURRENT", "ADMISSION_MAX_QUEUE"):
+            for name in getattr(settings, setting):
+                if name.lower() not in self._targets:
+                    problems.append(f"{setting} names unknown provider '{name}'")
+        if settings.OLLAMA_PROVIDER.lower() not in self._targets:
+            problems.append(f"OLLAMA_PROVIDER names unknown provider '{settings.OLLAMA_PROVIDER}'")
+        return problems
+
+
+providers = ProviderRegistry()
+providers.register("ollama", "Backend.services.ollama_backend:OllamaBackend", "OLLAMA_MODEL")
+providers.register("groq", "Backend.services.groq_backend:GroqBackend", "GROQ_MODEL")
+for _name, _spec in settings.PROVIDER_BACKENDS.items():
+    # "module:Class" or "module:Class@DEFAULT_MODEL_SETTING"
+    _target, _, _default = _spec.partition("@")
+    providers.register(_name, _target, _default or "OLLAMA_MODEL")
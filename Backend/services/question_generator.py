@@ -1,13 +1,93 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
 import os
 import json
+import math
 import asyncio
-import aiohttp
+import difflib
+import re
+from contextlib import aclosing
 from Backend.core.settings import settings
 from Backend.models.schemas import GenerateQuestionsResponse, QuestionSchema
-import ollama
-import requests
 from . import llm_provider
+from .admission import QueueFullError
+from .json_repair import repair_json, salvage_questions, validate_question
+from .metrics import question_json_failures
+from .providers import providers
+from .json_stream import JsonArrayItemStream
+from .popularity import popularity
+from .result_cache import make_cache_key, question_cache
+from .single_flight import question_flight
+from .tracing import log, span
+
+QUESTION_TEMPERATURE = 0.5
+
+
+def _normalise(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.casefold()))
+
+
+def dedupe_questions(questions: List[Dict[str, Any]],
+                     threshold: float = settings.QUESTION_DEDUP_SIMILARITY) -> List[Dict[str, Any]]:
+    """
+    Drop questions that are near-duplicates of an earlier one.
+
+    Args:
+        questions: Question dictionaries in order of preference
+        threshold: Similarity ratio (0-1) of the normalised question text
+            at or above which two questions with the same answer count as
+            duplicates
+
+    Returns:
+        The questions with duplicates removed, order preserved
+    """
+    kept: List[Dict[str, Any]] = []
+    seen: List[tuple] = []
+    for question in questions:
+        text = _normalise(question["question"])
+        answer = _normalise(question.get("answer", ""))
+        # Similar wording alone is not enough: "capital of France/Spain" differ by answer
+        if any(text == other_text or (answer == other_answer and
+                                      difflib.SequenceMatcher(None, text, other_text).ratio() >= threshold)
+               for other_text, other_answer in seen):
+            continue
+        kept.append(question)
+        seen.append((text, answer))
+    return kept
+
+
+def split_passage(generated_text: str, parts: int) -> List[str]:
+    """
+    Split a passage into `parts` consecutive excerpts of similar length.
+
+    Paragraphs are kept whole where possible; a passage with too few
+    paragraphs is split by sentence instead.
+
+    Args:
+        generated_text: The passage
+        parts: Number of excerpts
+
+    Returns:
+        Exactly `parts` excerpts; a very short passage repeats some
+    """
+    units = [p.strip() for p in generated_text.split("\n") if p.strip()]
+    if len(units) < parts:
+        units = [s.strip() for s in re.split(r"(?<=[.!?])\s+", generated_text) if s.strip()]
+    if not units:
+        return [generated_text] * parts
+    total = sum(len(unit) for unit in units)
+    excerpts: List[str] = []
+    current: List[str] = []
+    size = 0
+    for unit in units:
+        current.append(unit)
+        size += len(unit)
+        if size >= total * (len(excerpts) + 1) / parts and len(excerpts) < parts - 1:
+            excerpts.append(" ".join(current))
+            current = []
+    if current:
+        excerpts.append(" ".join(current))
+    # Very short passages: reuse excerpts so every shard still gets a focus
+    return [excerpts[i % len(excerpts)] for i in range(parts)]
 
 
 class QuestionGenerator:
@@ -15,20 +95,304 @@ class QuestionGenerator:
                  model: Optional[str] = None,
                  provider: str = settings.OLLAMA_PROVIDER):
         if model is None:
-            model = (
-                settings.GROQ_MODEL
-                if provider.lower() == "groq"
-                else settings.OLLAMA_MODEL
-            )
+            model = providers.default_model(provider)
         self.model = model
         self.provider = provider
         self.llm = llm_provider.LLMProvider(provider, model)
+        self.shard_size = max(
+            1, settings.QUESTION_SHARD_SIZE.get(provider.lower(), 5))
 
-    async def generate_questions(self, generated_text: str, num_questions: int, language: str, choices_num: int) -> Dict[str, Any]:
-        """Generate questions based on the given text."""
+    def cache_key(self, generated_text: str, num_questions: int, language: str, choices_num: int) -> str:
+        """Content-addressed key identifying a question generation request."""
+        return make_cache_key(
+            "questions",
+            provider=self.provider,
+            model=self.model,
+            generated_text=generated_text,
+            num_questions=num_questions,
+            language=language,
+            choices_num=choices_num,
+            temperature=QUESTION_TEMPERATURE,
+        )
+
+    async def generate_questions(self, generated_text: str, num_questions: int, language: str, choices_num: int, bypass_cache: bool = False) -> Dict[str, Any]:
+        """
+        Generate questions based on the given text.
+
+        Repeats are served from the result cache, and identical requests
+        arriving while one is in progress share that single generation.
+        """
         if not generated_text.strip():
             raise ValueError("Generated text cannot be empty")
 
+        key = self.cache_key(generated_text, num_questions,
+                             language, choices_num)
+        if bypass_cache:
+            popularity.questions_requested(self.provider, self.model, language, num_questions, choices_num, None)
+            return await self._generate_and_cache(key, generated_text, num_questions, language, choices_num)
+
+        with span("cache.lookup", cache="questions") as lookup_span:
+            cached = await question_cache.get(key)
+            lookup_span.set(hit=cached is not None)
+        popularity.questions_requested(self.provider, self.model, language, num_questions, choices_num, cached is not None)
+        if cached is not None:
+            return cached
+        return await question_flight.do(
+            key, lambda: self._generate_and_cache(key, generated_text, num_questions, language, choices_num))
+
+    async def generate_questions_stream(self, generated_text: str, num_questions: int, language: str, choices_num: int, bypass_cache: bool = False) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate questions, yielding each one as soon as the model finishes it.
+
+        The model output is parsed incrementally, so a question is validated
+        and yielded when its closing brace arrives. Shards stream
+        concurrently and duplicates across shards are dropped on the fly.
+        Identical requests arriving while one is in progress share that
+        single generation; a request joining late first gets the questions
+        it missed.
+
+        Args:
+            generated_text: The passage to ask about
+            num_questions: The number of questions to generate
+            language: The language of the questions
+            choices_num: The number of choices for each question
+            bypass_cache: Skip the cache lookup and always generate
+
+        Yields:
+            (event, data) tuples: "question" with {"index", "question"} for
+            every accepted question, then "result" holding the same
+            dictionary `generate_questions` returns. A cache hit replays the
+            cached questions
+
+        Raises:
+            ValueError: If the text is empty
+            Exception: If question generation fails
+        """
+        if not generated_text.strip():
+            raise ValueError("Generated text cannot be empty")
+
+        key = self.cache_key(generated_text, num_questions,
+                             language, choices_num)
+        if bypass_cache:
+            popularity.questions_requested(self.provider, self.model, language, num_questions, choices_num, None)
+            events = self._stream_and_cache(key, generated_text, num_questions, language, choices_num)
+        else:
+            with span("cache.lookup", cache="questions") as lookup_span:
+                cached = await question_cache.get(key)
+                lookup_span.set(hit=cached is not None)
+            popularity.questions_requested(self.provider, self.model, language, num_questions, choices_num, cached is not None)
+            if cached is not None:
+                for index, question in enumerate(cached["questions"]):
+                    yield "question", {"index": index, "question": question}
+                yield "result", cached
+                return
+            events = question_flight.stream(
+                key, lambda: self._stream_and_cache(key, generated_text, num_questions, language, choices_num))
+
+        streamed = 0
+        async with aclosing(events) as shared:
+            async for event, data in shared:
+                if event == "question":
+                    streamed += 1
+                elif event == "result":
+                    # Joined a non-streaming generation: replay its questions like a cache hit
+                    for index, question in enumerate(data["questions"][streamed:], streamed):
+                        yield "question", {"index": index, "question": question}
+                yield event, data
+
+    async def _stream_and_cache(self, key: str, generated_text: str, num_questions: int, language: str, choices_num: int) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        log(
+            f"Streaming questions with model: {self.model} (provider: {self.provider}), num_questions: {num_questions}, language: {language}, choices_num: {choices_num}")
+
+        questions: List[Dict[str, Any]] = []
+
+        def accept(question: Dict[str, Any]) -> bool:
+            if len(questions) >= num_questions or len(dedupe_questions(questions + [question])) == len(questions):
+                return False
+            questions.append(question)
+            return True
+
+        shards = math.ceil(num_questions / self.shard_size)
+        quotas = [num_questions // shards + (1 if i < num_questions % shards else 0)
+                  for i in range(shards)]
+        excerpts = split_passage(generated_text, shards) if shards > 1 else [None]
+        async with aclosing(self._stream_shards([
+            (self._build_prompt(generated_text, quota, language, choices_num, focus=excerpt), quota)
+            for quota, excerpt in zip(quotas, excerpts)
+        ], language, choices_num)) as streamed:
+            async for question in streamed:
+                if accept(question):
+                    yield "question", {"index": len(questions) - 1, "question": question}
+
+        missing = num_questions - len(questions)
+        if missing > 0:
+            for question in await self._top_up(generated_text, list(questions), missing, language, choices_num):
+                if accept(question):
+                    yield "question", {"index": len(questions) - 1, "question": question}
+        if len(questions) != num_questions:
+            log(
+                f"Warning: Requested {num_questions} questions, but model generated {len(questions)}. Using generated questions.")
+
+        result = {"questions": questions}
+        await question_cache.set(key, result)
+        yield "result", result
+
+    async def _stream_shards(self, shards: List[Tuple[str, int]], language: str, choices_num: int) -> AsyncIterator[Dict[str, Any]]:
+        """Run the shard streams concurrently and yield their questions as they arrive."""
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def pump(prompt: str, quota: int) -> None:
+            try:
+                async with aclosing(self._stream_once(prompt, quota, language, choices_num)) as questions:
+                    async for question in questions:
+                        queue.put_nowait(question)
+            finally:
+                queue.put_nowait(done)
+
+        tasks = [asyncio.create_task(pump(prompt, quota))
+                 for prompt, quota in shards]
+        try:
+            remaining = len(tasks)
+            produced = 0
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                produced += 1
+                yield item
+
+            errors = [task.exception() for task in tasks if task.exception() is not None]
+            if errors and not produced:
+                raise errors[0]
+            for error in errors:
+                log(f"Warning: A question shard failed and will be topped up: {error}")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _stream_once(self, prompt: str, num_questions: int, language: str, choices_num: int) -> AsyncIterator[Dict[str, Any]]:
+        parser = JsonArrayItemStream(repair=repair_json)
+        produced = 0
+        try:
+            async with aclosing(self.llm.stream(
+                    messages=self._messages(
+                        prompt, num_questions, language, choices_num),
+                    temperature=QUESTION_TEMPERATURE,
+                    response_format={"type": "json_object"})) as chunks:
+                async for chunk in chunks:
+                    for item in parser.feed(chunk):
+                        question = validate_question(item)
+                        if question is None:
+                            parser.skipped += 1
+                            continue
+                        produced += 1
+                        yield question
+        except QueueFullError:
+            raise
+        except Exception as e:
+            raise Exception(
+                f"Error streaming questions with model {self.model}: {e}")
+        finally:
+            if parser.skipped:
+                question_json_failures.inc("invalid_question", amount=parser.skipped)
+        if not produced:
+            question_json_failures.inc("unusable_response")
+            raise Exception(
+                f"Could not parse valid JSON questions from the model {self.model} ({parser.skipped} malformed)")
+
+    async def _generate_and_cache(self, key: str, generated_text: str, num_questions: int, language: str, choices_num: int) -> Dict[str, Any]:
+        log(
+            f"Generating questions with model: {self.model} (provider: {self.provider}), num_questions: {num_questions}, language: {language}, choices_num: {choices_num}")
+
+        shards = math.ceil(num_questions / self.shard_size)
+        if shards > 1:
+            questions = await self._generate_sharded(generated_text, num_questions, language, choices_num, shards)
+        else:
+            result = await self._generate_once(self._build_prompt(generated_text, num_questions, language, choices_num),
+                                               num_questions, language, choices_num)
+            questions = dedupe_questions(result["questions"])
+
+        missing = num_questions - len(questions)
+        if missing > 0:
+            questions = await self._top_up(generated_text, questions, missing, language, choices_num)
+        if len(questions) != num_questions:
+            log(
+                f"Warning: Requested {num_questions} questions, but model generated {len(questions)}. Using generated questions.")
+
+        result = {"questions": questions[:num_questions]}
+        await question_cache.set(key, result)
+        return result
+
+    async def _generate_sharded(self, generated_text: str, num_questions: int, language: str, choices_num: int, shards: int) -> List[Dict[str, Any]]:
+        """
+        Generate the questions as concurrent shards of at most `shard_size`.
+
+        Each shard is pointed at a different part of the passage so the
+        shards ask about different things; the merged set is de-duplicated.
+        A failed shard only leaves a gap for the top-up call to fill.
+        """
+        quotas = [num_questions // shards + (1 if i < num_questions % shards else 0)
+                  for i in range(shards)]
+        excerpts = split_passage(generated_text, shards)
+        results = await asyncio.gather(*(
+            self._generate_once(
+                self._build_prompt(generated_text, quota, language,
+                                   choices_num, focus=excerpt),
+                quota, language, choices_num)
+            for quota, excerpt in zip(quotas, excerpts)
+        ), return_exceptions=True)
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if len(errors) == len(results):
+            raise errors[0]
+        for error in errors:
+            log(f"Warning: A question shard failed and will be topped up: {error}")
+        return dedupe_questions([question for result in results if not isinstance(result, BaseException)
+                                 for question in result["questions"]])
+
+    async def _top_up(self, generated_text: str, questions: List[Dict[str, Any]], missing: int, language: str, choices_num: int) -> List[Dict[str, Any]]:
+        """Ask for just the missing questions, avoiding the ones already there."""
+        log(f"Topping up {missing} missing question(s)")
+        try:
+            result = await self._generate_once(
+                self._build_prompt(generated_text, missing, language, choices_num,
+                                   avoid=[question["question"] for question in questions]),
+                missing, language, choices_num)
+        except QueueFullError:
+            raise
+        except Exception as e:
+            if not questions:
+                raise
+            log(f"Warning: Question top-up failed: {e}")
+            return questions
+        return dedupe_questions(questions + result["questions"])
+
+    async def _generate_once(self, prompt: str, num_questions: int, language: str, choices_num: int) -> Dict[str, Any]:
+        # Raises ValueError for an unknown provider before anything is sent
+        messages = self._messages(prompt, num_questions, language, choices_num)
+        try:
+            response = await self.llm.generate(
+                messages=messages,
+                temperature=QUESTION_TEMPERATURE,
+                response_format={"type": "json_object"}
+            )
+            json_response_str = response.get('content')
+            return self._salvage(json_response_str)
+        except QueueFullError:
+            raise
+        except Exception as e:
+            raise Exception(
+                f"Error generating questions with model {self.model}: {e}")
+
+    @staticmethod
+    def _build_prompt(generated_text: str,
+                      num_questions: int,
+                      language: str,
+                      choices_num: int,
+                      focus: Optional[str] = None,
+                      avoid: Optional[List[str]] = None) -> str:
         prompt = f"""
         Reading Passage ({language}):
         ---
@@ -56,77 +420,47 @@ class QuestionGenerator:
             // ... more question objects
           ]
         }}
-
+        """
+        if focus:
+            prompt += f"""
+        Focus the questions on this part of the passage:
+        ---
+        {focus}
+        ---
+        """
+        if avoid:
+            listed = "\n".join(f"        - {question}" for question in avoid)
+            prompt += f"""
+        These questions already exist. Do not repeat them or ask about the same detail:
+{listed}
+        """
+        prompt += """
         Generate the JSON output now based on the provided passage.
         """
+        return prompt
 
-        print(
-            f"Generating questions with model: {self.model} (provider: {self.provider}), num_questions: {num_questions}, language: {language}, choices_num: {choices_num}")
-
-        if self.provider == "ollama":
-            return self._generate_questions_ollama(prompt, num_questions, language, choices_num)
-        if self.provider == "groq":
-            return await self._generate_questions_groq(prompt, num_questions, language, choices_num)
-        else:
-            raise ValueError(f"Unknown provider: {self.provider}")
-
-    def _generate_questions_ollama(self, prompt, num_questions, language, choices_num):
-        try:
-            response = ollama.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system",
-                        "content": f"You are an AI assistant specialized in creating multiple-choice comprehension questions based on provided text. Respond ONLY with the requested JSON object containing the questions. Ensure all text content (questions, choices, answers) is in {language}."},
-                    {"role": "user", "content": prompt}
-                ],
-                format='json',
-                options={"temperature": 0.5}
-            )
-
-            json_response_str = response['message']['content']
-            try:
-                validated_data = GenerateQuestionsResponse.model_validate_json(
-                    json_response_str)
-                if len(validated_data.questions) != num_questions:
-                    print(
-                        f"Warning: Requested {num_questions} questions, but model generated {len(validated_data.questions)}. Using generated questions.")
-                return validated_data.model_dump()
-            except (json.JSONDecodeError, Exception) as json_error:
-                print(
-                    f"Error: Failed to parse or validate JSON response from model {self.model}.")
-                print(f"Model Response String: {json_response_str}")
-                raise Exception(
-                    f"Could not parse valid JSON questions from the model: {json_error}")
-        except Exception as e:
-            raise Exception(
-                f"Error generating questions with model {self.model}: {e}")
+    def _messages(self, prompt: str, num_questions: int, language: str, choices_num: int) -> List[Dict[str, str]]:
+        system = f"You are an AI assistant specialized in creating multiple-choice comprehension questions based on provided text. Respond ONLY with the requested JSON object containing the questions. Ensure all text content (questions, choices, answers) is in {language}."
+        if providers.get(self.provider).strict_question_counts:
+            system += f" you need to make sure that there are exactly {num_questions} questions and {choices_num} choices for each question."
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ]
 
-    async def _generate_questions_groq(self, prompt, num_questions, language, choices_num):
-        try:
-            messages = [
-                {"role": "system",
-                    "content": f"You are an AI assistant specialized in creating multiple-choice comprehension questions based on provided text. Respond ONLY with the requested JSON object containing the questions. Ensure all text content (questions, choices, answers) is in {language}. you need to make sure that there are exactly {num_questions} questions and {choices_num} choices for each question."},
-                {"role": "user", "content": prompt}
-            ]
-            response = await self.llm.generate(
-                messages=messages,
-                temperature=0.5,
-                response_format={"type": "json_object"}
-            )
-            json_response_str = response.get('content')
-            try:
-                validated_data = GenerateQuestionsResponse.model_validate_json(
-                    json_response_str)
-                if len(validated_data.questions) != num_questions:
-                    print(
-                        f"Warning: Requested {num_questions} questions, but model generated {len(validated_data.questions)}. Using generated questions.")
-                return validated_data.model_dump()
-            except (json.JSONDecodeError, Exception) as json_error:
-                print(
-                    f"Error: Failed to parse or validate JSON response from model {self.model}.")
-                print(f"Model Response String: {json_response_str}")
-                raise Exception(
-                    f"Could not parse valid JSON questions from the model: {json_error}")
-        except Exception as e:
+    def _salvage(self, json_response_str: str) -> Dict[str, Any]:
+        # Repair locally and keep every valid question; a short set is topped up by the caller
+        with span("questions.validate") as validate_span:
+            questions, rejected = salvage_questions(json_response_str)
+            validate_span.set(valid=len(questions), rejected=rejected)
+        if not questions:
+            question_json_failures.inc("unusable_response")
+            log(
+                f"Error: Failed to parse or validate JSON response from model {self.model}.")
+            log(f"Model Response String: {json_response_str}")
             raise Exception(
-                f"Error generating questions with model {self.model}: {e}")
+                "Could not parse valid JSON questions from the model")
+        if rejected:
+            log(
+                f"Warning: Dropped {rejected} invalid question(s) from model {self.model}; kept {len(questions)}.")
+        return {"questions": questions}
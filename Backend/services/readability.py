@@ -0,0 +1,122 @@
+from typing import Optional, Tuple
+import re
+
+# Gunning Fog counts words of three or more syllables as complex
+COMPLEX_WORD_SYLLABLES = 3
+
+_WORD_RE = re.compile(r"[\w'’-]+", re.UNICODE)
+_SENTENCE_END_RE = re.compile(r"[.!?][\"'”’)\]]*$")
+
+
+def parse_word_range(words_range: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parse a "150-250" style word range.
+
+    Args:
+        words_range: The range string from `WORDS_RANGES`
+
+    Returns:
+        (low, high) tuple, or None if the range cannot be parsed
+    """
+    if not words_range:
+        return None
+    try:
+        low, high = words_range.split("-")
+        return int(low), int(high)
+    except ValueError:
+        return None
+
+
+class IncrementalFogScorer:
+    """
+    Running Gunning Fog estimate over text that arrives in chunks.
+
+    Keeps sentence, word and complex-word counts up to date as chunks are
+    fed, so the score of the prefix is available at any time without
+    re-scanning the text. Counting follows textstat: sentences of two words
+    or fewer are not counted as sentences.
+    """
+
+    def __init__(self):
+        # textstat is imported by the first scorer, not when the app starts
+        import textstat
+
+        self._difficult_words = textstat.difficult_words
+        self.words = 0
+        self.complex_words = 0
+        self.sentences = 0
+        self._sentence_words = 0
+        self._pending = ""
+
+    def feed(self, chunk: str) -> None:
+        """
+        Add a chunk of streamed text.
+
+        Args:
+            chunk: The next piece of text, possibly ending mid-word
+        """
+        text = self._pending + chunk
+        tokens = text.split()
+        if not tokens:
+            self._pending = text
+            return
+        # The last token may still be growing unless the chunk ended in whitespace
+        if text[-1].isspace():
+            self._pending = ""
+        else:
+            self._pending = tokens.pop()
+        for token in tokens:
+            self._add_token(token)
+
+    def finish(self) -> None:
+        """Count the trailing partial word once the stream has ended."""
+        if self._pending.strip():
+            self._add_token(self._pending.strip())
+        self._pending = ""
+
+    def _add_token(self, token: str) -> None:
+        for word in _WORD_RE.findall(token):
+            self.words += 1
+            self._sentence_words += 1
+            if self._difficult_words(word, syllable_threshold=COMPLEX_WORD_SYLLABLES):
+                self.complex_words += 1
+        if _SENTENCE_END_RE.search(token):
+            if self._sentence_words > 2:
+                self.sentences += 1
+            self._sentence_words = 0
+
+    @property
+    def score(self) -> float:
+        """Gunning Fog index of the text seen so far."""
+        if self.words == 0:
+            return 0.0
+        # An unterminated trailing sentence still counts as one
+        sentences = self.sentences + (1 if self._sentence_words > 2 else 0)
+        sentences = max(1, sentences)
+        return 0.4 * (self.words / sentences + 100 * self.complex_words / self.words)
+
+    def out_of_range(self,
+                     low: float,
+                     high: float,
+                     min_words: int,
+                     margin: float) -> bool:
+        """
+        Check whether the prefix is confidently outside the target band.
+
+        The margin shrinks as more words arrive, since the running score
+        stabilises with length.
+
+        Args:
+            low: Lower bound of the target range
+            high: Upper bound of the target range
+            min_words: Words required before any decision is made
+            margin: Allowed distance outside the band at `min_words`
+
+        Returns:
+            True if generation should be abandoned
+        """
+        if self.words < min_words:
+            return False
+        allowed = margin * (min_words / self.words) ** 0.5
+        score = self.score
+        return score < low - allowed or score > high + allowed
@@ -0,0 +1,205 @@
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import asyncio
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from Backend.core.settings import settings
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def make_cache_key(kind: str, **fields: Any) -> str:
+    """
+    Build a content-addressed key for a generation request.
+
+    Strings are whitespace-normalised and the provider name is lower-cased,
+    so trivially different payloads map to the same entry.
+
+    Args:
+        kind: The kind of result ("text" or "questions")
+        **fields: Provider, model, prompt inputs and temperature
+
+    Returns:
+        Hex SHA-256 digest of the normalised request
+    """
+    normalized = {name: _normalize(value) for name, value in fields.items()}
+    if isinstance(normalized.get("provider"), str):
+        normalized["provider"] = normalized["provider"].lower()
+    payload = json.dumps({"kind": kind, **normalized},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache for generation results.
+
+    An in-memory LRU with a TTL sits in front of an optional SQLite tier
+    that survives restarts. Disk reads and writes run in a worker thread so
+    the event loop is never blocked.
+    """
+
+    def __init__(self,
+                 name: str,
+                 max_entries: int = settings.CACHE_MAX_ENTRIES,
+                 ttl: float = settings.CACHE_TTL_SECONDS,
+                 sqlite_path: Optional[str] = settings.CACHE_SQLITE_PATH):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Cache name, also used as the SQLite table name
+            max_entries: Maximum number of in-memory entries
+            ttl: Time to live of an entry in seconds
+            sqlite_path: Path of the SQLite file, or None for memory only
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.sqlite_path = sqlite_path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from `make_cache_key`
+
+        Returns:
+            A copy of the cached result, or None on a miss
+        """
+        if not settings.CACHE_ENABLED:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return copy.deepcopy(value)
+            del self._entries[key]
+
+        if self.sqlite_path:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                expires_at, value = row
+                self._remember(key, value, expires_at)
+                self.disk_hits += 1
+                return copy.deepcopy(value)
+
+        self.misses += 1
+        return None
+
+    async def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result without counting a hit or miss or refreshing its LRU position.
+
+        Args:
+            key: Key from `make_cache_key`
+
+        Returns:
+            A copy of the cached result, or None if there is none
+        """
+        if not settings.CACHE_ENABLED:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            return copy.deepcopy(entry[1])
+        if self.sqlite_path:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                return row[1]
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result.
+
+        Args:
+            key: Key from `make_cache_key`
+            value: JSON-serialisable result
+        """
+        if not settings.CACHE_ENABLED:
+            return
+        expires_at = time.time() + self.ttl
+        value = copy.deepcopy(value)
+        self._remember(key, value, expires_at)
+        if self.sqlite_path:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the cache."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "persistent": bool(self.sqlite_path),
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection, if open."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(
+                self.sqlite_path, check_same_thread=False)
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.name} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        with self._db_lock:
+            db = self._connection()
+            row = db.execute(
+                f"SELECT expires_at, value FROM {self.name} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] <= time.time():
+                db.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+                db.commit()
+                return None
+            return row[0], json.loads(row[1])
+
+    def _disk_set(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        with self._db_lock:
+            db = self._connection()
+            db.execute(
+                f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at))
+            db.commit()
+
+
+text_cache = ResultCache("text_results")
+question_cache = ResultCache("question_results")
@@ -0,0 +1,167 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from contextlib import aclosing
+import asyncio
+import copy
+from .admission import Priority, request_priority
+
+Event = Tuple[str, Any]
+# Marks the end of a flight's events
+_DONE = object()
+
+
+class _Flight:
+    def __init__(self, priority: Priority):
+        # The work runs at the priority of the caller that started it
+        self.priority = priority
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        # Events published so far, replayed to callers that join late
+        self.events: List[Event] = []
+        self.subscribers: List[asyncio.Queue] = []
+
+    def publish(self, item: Any) -> None:
+        if item is not _DONE:
+            self.events.append(item)
+        for queue in self.subscribers:
+            queue.put_nowait(item)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key starts the work as a separate task; callers
+    arriving while it runs await the same task instead of starting their
+    own. Streamed work (`stream`) fans its events out to every caller, and
+    callers joining late first get the events they missed. Errors are
+    delivered to every waiter. A waiter that is cancelled only stops
+    waiting; the shared work is cancelled once nobody is left waiting for it.
+
+    The work runs at the admission priority of the caller that started it,
+    so a caller only joins work started at the same or a higher priority.
+    An interactive request never waits on a batch item or a background
+    pre-generation; it starts its own run, which later callers join.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn` for `key`, or join the run already in flight.
+
+        Args:
+            key: Identity of the work, e.g. a normalised request hash
+            fn: Zero-argument coroutine function doing the work
+
+        Returns:
+            The result of the shared run (a private copy per caller)
+        """
+        flight = self._join(key, lambda flight: self._run(flight, fn))
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        finally:
+            self._leave(key, flight)
+        return copy.deepcopy(result)
+
+    async def stream(self, key: str, events: Callable[[], AsyncIterator[Event]]) -> AsyncIterator[Event]:
+        """
+        Stream the events of `events` for `key`, or join the stream already in flight.
+
+        Args:
+            key: Identity of the work, e.g. a normalised request hash
+            events: Zero-argument function returning an async iterator of
+                (event, data) tuples, the last of them a "result" event
+
+        Yields:
+            Every (event, data) tuple of the shared run, from its start
+            (private copies per caller). A caller that joined a `do` run
+            only gets its "result" event
+        """
+        flight = self._join(key, lambda flight: self._run_stream(flight, events))
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in flight.events:
+            queue.put_nowait(item)
+        if flight.task.done():
+            queue.put_nowait(_DONE)
+        flight.subscribers.append(queue)
+        flight.waiters += 1
+        try:
+            got_result = False
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                event, data = item
+                got_result = got_result or event == "result"
+                yield event, copy.deepcopy(data)
+            result = await asyncio.shield(flight.task)
+            if not got_result:
+                yield "result", copy.deepcopy(result)
+        finally:
+            flight.subscribers.remove(queue)
+            self._leave(key, flight)
+
+    def in_flight(self) -> int:
+        """Number of distinct keys currently being worked on."""
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters of started and coalesced calls."""
+        return {
+            "in_flight": self.in_flight(),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+    def _join(self, key: str, start: Callable[[_Flight], Awaitable[Any]]) -> _Flight:
+        priority = request_priority.get()
+        flight = self._flights.get(key)
+        if flight is not None and flight.priority <= priority:
+            self.coalesced += 1
+            return flight
+        # A lower-priority run keeps going for its own callers
+        flight = _Flight(priority)
+        flight.task = asyncio.create_task(start(flight))
+        self._flights[key] = flight
+        flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        self.started += 1
+        return flight
+
+    def _leave(self, key: str, flight: _Flight) -> None:
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done():
+            # Every caller gave up: stop the work and let the next caller start afresh
+            self._forget(key, flight)
+            flight.task.cancel()
+
+    @staticmethod
+    async def _run(flight: _Flight, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await fn()
+        finally:
+            flight.publish(_DONE)
+
+    @staticmethod
+    async def _run_stream(flight: _Flight, events: Callable[[], AsyncIterator[Event]]) -> Any:
+        result = None
+        try:
+            async with aclosing(events()) as stream:
+                async for event, data in stream:
+                    if event == "result":
+                        result = data
+                    flight.publish((event, data))
+            return result
+        finally:
+            flight.publish(_DONE)
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+text_flight = SingleFlight()
+question_flight = SingleFlight()
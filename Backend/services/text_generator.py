@@ -1,43 +1,64 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
 import os
 import json
 import asyncio
-import textstat
-from functools import lru_cache
-import aiohttp
+from contextlib import aclosing
 
-from Backend.core.prompts import build_english_prompt, build_other_language_prompt, LEVEL_RANGES
+from Backend.core.prompts import build_english_prompt, build_other_language_prompt, LEVEL_RANGES, WORDS_RANGES
 from Backend.core.settings import settings
 from Backend.models.schemas import GeneratedTextResponse
 from . import llm_provider
-
-import ollama
-import requests
+from .admission import QueueFullError
+from .calibration import calibration_store
+from .metrics import english_iterations
+from .model_catalogue import model_catalogue
+from .passage_library import passage_library
+from .popularity import popularity
+from .providers import providers
+from .readability import IncrementalFogScorer, parse_word_range
+from .result_cache import make_cache_key, text_cache
+from .single_flight import text_flight
+from .tracing import log, span
 
 MAX_ITERATIONS = 10
 
+ENGLISH_SYSTEM_PROMPT = "You are a professional language teacher tasked to create a reading passage. Do not give any output besides the text do not include things like 'ok here is your text' or 'here is the text'. Always make sure that generated text is in English event the topic is in another language."
+
+# (prompt nudge, temperature) per speculative candidate; candidate 0 is the plain
+# prompt, or the nudge and temperature planned by the calibration store
+SPECULATIVE_VARIANTS = [
+    (None, None),
+    ("simpler", 0.7),
+    ("more complex", 0.7),
+    (None, 1.2),
+    ("simpler", 1.0),
+    ("more complex", 1.0),
+]
+
 
 async def get_available_models() -> List[str]:
     """
     Gets the list of available models from Ollama.
 
+    Served from the model catalogue, so this never waits on Ollama once the
+    catalogue is loaded.
+
     Returns:
         List of available model names
     """
-    try:
-        loop = asyncio.get_running_loop()
-        models_response = await loop.run_in_executor(None, ollama.list)
-        available_models = [model['model']
-                            for model in models_response.get('models', [])]
-        if not available_models:
-            # Fallback if list is empty but ollama responded
-            available_models = [settings.OLLAMA_MODEL]
-        return available_models
-    except Exception as e:
-        print(
-            f"Warning: Could not fetch models from Ollama: {e}. Using default.")
-        # Return a default list if Ollama isn't running or reachable
-        return [settings.OLLAMA_MODEL]
+    available_models = await model_catalogue.get_model_ids("ollama")
+    if not available_models:
+        # Fallback if list is empty but ollama responded
+        available_models = [settings.OLLAMA_MODEL]
+    return available_models
+
+
+def _gunning_fog(text: str) -> float:
+    # Imported on first use: textstat loads its dictionaries at import time
+    import textstat
+
+    with span("score.gunning_fog"):
+        return textstat.gunning_fog(text)
 
 
 class TextGenerator:
@@ -53,18 +74,16 @@ class TextGenerator:
         Initialize the text generator.
 
         Args:
-            model: The model name to use (defaults to settings.OLLAMA_MODEL)
+            model: The model name to use (defaults to the provider's default model)
             provider: The provider name (defaults to settings.OLLAMA_PROVIDER)
         """
         if model is None:
-            model = (
-                settings.GROQ_MODEL
-                if provider.lower() == "groq"
-                else settings.OLLAMA_MODEL
-            )
+            model = providers.default_model(provider)
         self.model = model
         self.provider = provider
         self.llm = llm_provider.LLMProvider(provider, model)
+        self.speculative_candidates = max(
+            1, settings.SPECULATIVE_CANDIDATES.get(provider.lower(), 1))
 
     async def check_model_availability(self) -> bool:
         """
@@ -76,19 +95,54 @@ class TextGenerator:
         available_models = await get_available_models()
         return self.model in available_models
 
+    def cache_key(self, topic: str, language: str, level: str, style: str) -> str:
+        """
+        Content-addressed key identifying a text generation request.
+
+        Args:
+            topic: The topic for the generated text
+            language: The language of the text
+            level: The difficulty level
+            style: The writing style
+
+        Returns:
+            Cache key for the request
+        """
+        return make_cache_key(
+            "text",
+            provider=self.provider,
+            model=self.model,
+            topic=topic.casefold(),
+            language=language,
+            level=level,
+            style=style.casefold(),
+            temperature=None,
+        )
+
     async def generate_text(self,
                             topic: str,
                             language: str,
                             level: str,
-                            style: str) -> Dict[str, Any]:
+                            style: str,
+                            bypass_cache: bool = False,
+                            reuse: bool = False) -> Dict[str, Any]:
         """
         Generate text based on the given parameters.
 
+        Results are cached by a normalised hash of the request; a cache hit
+        skips the LLM entirely. Identical requests that arrive while one is
+        being generated share that single generation. Accepted passages are
+        also stored in the passage library, which reuse mode serves from.
+
         Args:
             topic: The topic for the generated text
             language: The language of the text
             level: The difficulty level (Basic, Intermediate, Advanced)
             style: The writing style (Formal, Casual, etc.)
+            bypass_cache: Skip the cache lookup and always generate (the new
+                result still refreshes the cache)
+            reuse: On a cache miss, serve a stored passage on the same or a
+                near-matching topic if the library has one
 
         Returns:
             Dictionary containing the generated text and metadata
@@ -100,13 +154,170 @@ class TextGenerator:
         if not topic.strip():
             raise ValueError("Topic cannot be empty")
 
-        print(
+        key = self.cache_key(topic, language, level, style)
+        if bypass_cache:
+            popularity.text_requested(self.provider, self.model, topic, language, level, style, None)
+            return await self._generate_and_cache(key, topic, language, level, style)
+
+        with span("cache.lookup", cache="text") as lookup_span:
+            cached = await text_cache.get(key)
+            lookup_span.set(hit=cached is not None)
+        popularity.text_requested(self.provider, self.model, topic, language, level, style, cached is not None)
+        if cached is not None:
+            return cached
+        if reuse:
+            reused = await self._from_library(topic, language, level, style)
+            if reused is not None:
+                return reused
+        return await text_flight.do(
+            key, lambda: self._generate_and_cache(key, topic, language, level, style))
+
+    async def _generate_and_cache(self,
+                                  key: str,
+                                  topic: str,
+                                  language: str,
+                                  level: str,
+                                  style: str) -> Dict[str, Any]:
+        log(
             f"Generating text with model: {self.model} (provider: {self.provider}), on topic: {topic}, language: {language}, level: {level}, style: {style}")
 
         if language == "English":
-            return await self._generate_text_english(topic, language, level, style)
+            result = await self._generate_text_english(topic, language, level, style)
+        else:
+            result = await self._generate_text_other_languages(topic, language, level, style)
+        await self._store(key, topic, result)
+        return result
+
+    async def _store(self, key: str, topic: str, result: Dict[str, Any]) -> None:
+        await text_cache.set(key, result)
+        await passage_library.add(topic, result, self.provider, self.model)
+
+    async def _from_library(self,
+                            topic: str,
+                            language: str,
+                            level: str,
+                            style: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored passage to serve instead of generating.
+
+        Args:
+            topic: The topic for the generated text
+            language: The language of the text
+            level: The difficulty level
+            style: The writing style
+
+        Returns:
+            The passage as a GeneratedTextResponse dictionary with its
+            `library_id` set, or None if the library has no match
+        """
+        with span("library.lookup") as lookup_span:
+            passage = await passage_library.find_reusable(topic, language, level, style)
+            lookup_span.set(hit=passage is not None)
+            if passage is not None:
+                lookup_span.set(passage=passage["id"], similarity=passage["similarity"])
+        if passage is None:
+            return None
+        log(f"Reusing library passage {passage['id']} (topic: {passage['topic']}) for topic: {topic}")
+        return GeneratedTextResponse(
+            generated_text=passage["text"],
+            score=passage["score"],
+            level=passage["level"],
+            language=passage["language"],
+            style=passage["style"],
+            iterations=0,
+            failed_texts=[],
+            prompts_used=[],
+            library_id=passage["id"]
+        ).model_dump()
+
+    async def generate_text_stream(self,
+                                   topic: str,
+                                   language: str,
+                                   level: str,
+                                   style: str,
+                                   bypass_cache: bool = False,
+                                   stream_tokens: bool = True,
+                                   reuse: bool = False) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate text while reporting progress as it happens.
+
+        Args:
+            topic: The topic for the generated text
+            language: The language of the text
+            level: The difficulty level (Basic, Intermediate, Advanced)
+            style: The writing style (Formal, Casual, etc.)
+            bypass_cache: Skip the cache lookup and always generate
+            stream_tokens: Stream the provider output as "token" events;
+                without it only progress events are yielded, and English
+                rounds may run speculative candidates
+            reuse: On a cache miss, serve a stored passage on the same or a
+                near-matching topic if the library has one
+
+        Identical requests arriving while one is being generated share that
+        single generation: a request joining late first gets the events it
+        missed, and requests that do not stream tokens only get the
+        progress events.
+
+        Yields:
+            (event, data) tuples: "token" for each streamed chunk, "iteration"
+            for each scored English attempt and a final "result" holding the
+            same dictionary `generate_text` returns. A cache hit or reused
+            library passage yields only the "result" event
+
+        Raises:
+            ValueError: If topic is empty
+            Exception: If text generation fails
+        """
+        if not topic.strip():
+            raise ValueError("Topic cannot be empty")
+
+        key = self.cache_key(topic, language, level, style)
+        if bypass_cache:
+            popularity.text_requested(self.provider, self.model, topic, language, level, style, None)
+            events = self._stream_and_cache(key, topic, language, level, style, stream_tokens)
+        else:
+            with span("cache.lookup", cache="text") as lookup_span:
+                cached = await text_cache.get(key)
+                lookup_span.set(hit=cached is not None)
+            popularity.text_requested(self.provider, self.model, topic, language, level, style, cached is not None)
+            if cached is not None:
+                yield "result", cached
+                return
+            if reuse:
+                reused = await self._from_library(topic, language, level, style)
+                if reused is not None:
+                    yield "result", reused
+                    return
+            events = text_flight.stream(
+                key, lambda: self._stream_and_cache(key, topic, language, level, style, stream_tokens))
+
+        async with aclosing(events) as shared:
+            async for event, data in shared:
+                if event == "token" and not stream_tokens:
+                    continue
+                yield event, data
+
+    async def _stream_and_cache(self,
+                                key: str,
+                                topic: str,
+                                language: str,
+                                level: str,
+                                style: str,
+                                stream_tokens: bool) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        log(
+            f"Streaming text with model: {self.model} (provider: {self.provider}), on topic: {topic}, language: {language}, level: {level}, style: {style}")
+
+        if language == "English":
+            events = self._english_events(
+                topic, language, level, style, stream_tokens=stream_tokens)
         else:
-            return await self._generate_text_other_languages(topic, language, level, style)
+            events = self._other_language_events(
+                topic, language, level, style, stream_tokens=stream_tokens)
+        with self.llm.affinity():
+            async for event, data in events:
+                if event == "result":
+                    await self._store(key, topic, data)
+                yield event, data
 
     async def _generate_text_english(self,
                                      topic: str,
@@ -125,6 +336,43 @@ class TextGenerator:
         Returns:
             Dictionary containing the generated text and metadata
         """
+        result = None
+        # Every iteration (and speculative candidate) runs on the same server
+        with self.llm.affinity():
+            async for event, data in self._english_events(topic, language, level, style):
+                if event == "result":
+                    result = data
+        return result
+
+    async def _english_events(self,
+                              topic: str,
+                              language: str,
+                              level: str,
+                              style: str,
+                              stream_tokens: bool = False) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run the Gunning Fog calibration loop, yielding progress events.
+
+        When speculative candidates are configured for the provider, each
+        round fans out several prompt/temperature variants concurrently and
+        stops at the first one that lands in range. Token streaming always
+        uses a single candidate so the streamed draft stays coherent.
+
+        With early abort enabled, attempts are streamed and scored
+        incrementally, and abandoned as soon as the prefix is confidently out
+        of range. The last iteration is never aborted so a complete passage
+        is always available.
+
+        Args:
+            topic: The topic for the generated text
+            language: The language (should be "English")
+            level: The difficulty level
+            style: The writing style
+            stream_tokens: Stream the provider output and yield "token" events
+
+        Yields:
+            (event, data) tuples, ending with the "result" event
+        """
         iterations = 0
         best_text = None
         best_score = None
@@ -132,65 +380,260 @@ class TextGenerator:
         failed_texts = []
         previous_text = None
         prompts_used = []
+        in_range = False
+        aborted_score = None
+        # Nudges behind best_score/aborted_score, so the next plan knows where it stands
+        best_nudge = None
+        aborted_nudge = None
+        adaptive = settings.CALIBRATION_ENABLED
+        candidates = 1 if stream_tokens else self.speculative_candidates
+        low, high = LEVEL_RANGES.get(level, (0, 25))
+        range_center = (high + low) / 2
 
         for _ in range(MAX_ITERATIONS):
             iterations += 1
-            prompt = build_english_prompt(
-                topic, level, style, best_score, previous_text)
-            prompts_used.append(prompt)
-
-            try:
-                messages = [
-                    {"role": "system", "content": "You are a professional language teacher tasked to create a reading passage. Do not give any output besides the text do not include things like 'ok here is your text' or 'here is the text'. Always make sure that generated text is in English event the topic is in another language."},
-                    {"role": "user", "content": prompt}
-                ]
-                response = await self.llm.generate(messages)
-                generated_text = response['content']
-                previous_text = generated_text
-
-                score = textstat.gunning_fog(generated_text)
-
-                low, high = LEVEL_RANGES.get(level, (0, 25))
-                range_center = (high + low) / 2
-                score_difference = abs(score - range_center)
-
-                if low <= score <= high:
-                    best_text = generated_text
-                    best_score = score
-                    break
-                else:
-                    failed_texts.append(
-                        f"Iteration {iterations} (score {score:.2f}): {generated_text}")
-                    if best_difference is None or score_difference < best_difference:
-                        best_text = generated_text
-                        best_score = score
-                        best_difference = score_difference
-                previous_text = generated_text
-            except Exception as e:
-                print(
-                    f"Error during text generation iteration {iterations}: {e}")
-                if best_text:
-                    break
-                else:
-                    raise Exception(
-                        f"Failed to generate text using model {self.model}: {e}")
+            early_abort = settings.EARLY_ABORT_ENABLED and iterations < MAX_ITERATIONS
+            # Fall back to an aborted attempt's estimate until a full passage has been scored
+            steer_score = best_score if best_score is not None else aborted_score
+            steer_nudge = best_nudge if best_score is not None else aborted_nudge
+
+            with span("english.iteration", iteration=iterations, candidates=candidates) as iteration_span:
+                try:
+                    nudge, temperature = None, None
+                    if adaptive:
+                        with span("calibration.plan"):
+                            nudge, temperature = await calibration_store.plan(
+                                self.provider, self.model, level, style, steer_score, steer_nudge)
+                        iteration_span.set(nudge=nudge, temperature=temperature)
+                    kwargs = {} if temperature is None else {
+                        "temperature": temperature}
+
+                    if candidates > 1:
+                        attempts = await self._speculative_round(
+                            topic, level, style, steer_score, previous_text, candidates, early_abort,
+                            base=(nudge, temperature))
+                        prompts_used.extend(attempt[0] for attempt in attempts)
+                    else:
+                        with span("prompt.build"):
+                            prompt = build_english_prompt(
+                                topic, level, style, steer_score, previous_text, nudge=nudge)
+                        prompts_used.append(prompt)
+                        messages = [
+                            {"role": "system", "content": ENGLISH_SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ]
+                        estimate = None
+                        if stream_tokens or early_abort:
+                            async for kind, value in self._stream_candidate(messages, level, early_abort, **kwargs):
+                                if kind == "token":
+                                    if stream_tokens:
+                                        yield "token", {"iteration": iterations, "text": value}
+                                else:
+                                    generated_text, estimate = value
+                        else:
+                            response = await self.llm.generate(messages, **kwargs)
+                            generated_text = response['content']
+                        if estimate is None:
+                            attempts = [(prompt, generated_text,
+                                         _gunning_fog(generated_text), False, nudge)]
+                        else:
+                            attempts = [(prompt, generated_text, estimate, True, nudge)]
+
+                    round_best_difference = None
+                    for candidate, (_, generated_text, score, aborted, attempt_nudge) in enumerate(attempts):
+                        score_difference = abs(score - range_center)
+                        candidate_in_range = not aborted and low <= score <= high
+                        event = {"iteration": iterations,
+                                 "score": score, "in_range": candidate_in_range, "aborted": aborted}
+                        if candidates > 1:
+                            event["candidate"] = candidate
+                        yield "iteration", event
+                        if not aborted:
+                            await calibration_store.observe(
+                                self.provider, self.model, level, style, attempt_nudge, score)
+
+                        if candidate_in_range:
+                            best_text = generated_text
+                            best_score = score
+                            in_range = True
+                            break
+                        if aborted:
+                            # A truncated draft is never returned or used as the reference text
+                            failed_texts.append(
+                                f"Iteration {iterations} (aborted, estimated score {score:.2f}): {generated_text}")
+                            aborted_score = score
+                            aborted_nudge = attempt_nudge
+                            continue
+                        failed_texts.append(
+                            f"Iteration {iterations} (score {score:.2f}): {generated_text}")
+                        if best_difference is None or score_difference < best_difference:
+                            best_text = generated_text
+                            best_score = score
+                            best_nudge = attempt_nudge
+                            best_difference = score_difference
+                        # The closest attempt of the round is the reference for the next one
+                        if round_best_difference is None or score_difference < round_best_difference:
+                            previous_text = generated_text
+                            round_best_difference = score_difference
+                    iteration_span.set(scores=[round(attempt[2], 2) for attempt in attempts],
+                                       aborted=sum(attempt[3] for attempt in attempts), in_range=in_range)
+                    if in_range:
+                        break
+                except Exception as e:
+                    log(
+                        f"Error during text generation iteration {iterations}: {e}")
+                    if best_text:
+                        break
+                    elif isinstance(e, QueueFullError):
+                        raise
+                    else:
+                        raise Exception(
+                            f"Failed to generate text using model {self.model}: {e}")
 
         if best_text is None:
             raise Exception(
                 f"Could not generate suitable text after {iterations} iterations using model {self.model}.")
 
-        result = GeneratedTextResponse(
-            generated_text=best_text,
-            score=best_score,
-            level=level,
-            language=language,
-            style=style,
-            iterations=iterations,
-            failed_texts=failed_texts,
-            prompts_used=prompts_used
-        ).model_dump()
+        with span("serialize"):
+            result = GeneratedTextResponse(
+                generated_text=best_text,
+                score=best_score,
+                level=level,
+                language=language,
+                style=style,
+                iterations=iterations,
+                failed_texts=failed_texts,
+                prompts_used=prompts_used
+            ).model_dump()
+        await calibration_store.record_request(
+            self.provider, self.model, level, adaptive, iterations)
+        english_iterations.observe(iterations, self.provider, level)
+
+        yield "result", result
+
+    async def _speculative_round(self,
+                                 topic: str,
+                                 level: str,
+                                 style: str,
+                                 previous_score: Optional[float],
+                                 previous_text: Optional[str],
+                                 candidates: int,
+                                 early_abort: bool = False,
+                                 base: Tuple[Optional[str], Optional[float]] = (None, None)) -> List[Tuple[str, str, float, bool, Optional[str]]]:
+        """
+        Generate several candidates concurrently and score them as they finish.
 
-        return result
+        Returns as soon as one candidate is inside the level range; the
+        remaining requests are cancelled.
+
+        Args:
+            topic: The topic for the generated text
+            level: The difficulty level
+            style: The writing style
+            previous_score: Score used to steer the prompt, if any
+            previous_text: Reference text from the previous round, if any
+            candidates: Number of concurrent candidates
+            early_abort: Stream each candidate and abandon it once it is confidently out of range
+            base: (nudge, temperature) of the first candidate, e.g. from the
+                calibration store; the others use SPECULATIVE_VARIANTS
+
+        Returns:
+            List of (prompt, text, score, aborted, nudge) tuples in completion
+            order; aborted candidates carry their estimated prefix score
+
+        Raises:
+            Exception: If every candidate failed
+        """
+        low, high = LEVEL_RANGES.get(level, (0, 25))
+
+        async def run_candidate(nudge: Optional[str], temperature: Optional[float]) -> Tuple[str, str, float, bool, Optional[str]]:
+            prompt = build_english_prompt(
+                topic, level, style, previous_score, previous_text, nudge=nudge)
+            messages = [
+                {"role": "system", "content": ENGLISH_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ]
+            kwargs = {} if temperature is None else {
+                "temperature": temperature}
+            if early_abort:
+                async for kind, value in self._stream_candidate(messages, level, True, **kwargs):
+                    if kind == "done":
+                        generated_text, estimate = value
+                if estimate is not None:
+                    return prompt, generated_text, estimate, True, nudge
+            else:
+                response = await self.llm.generate(messages, **kwargs)
+                generated_text = response['content']
+            return prompt, generated_text, _gunning_fog(generated_text), False, nudge
+
+        variants = [base] + SPECULATIVE_VARIANTS[1:]
+        tasks = [
+            asyncio.create_task(run_candidate(
+                *variants[i % len(variants)]))
+            for i in range(candidates)
+        ]
+        attempts = []
+        errors = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    attempt = await next_done
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                attempts.append(attempt)
+                if not attempt[3] and low <= attempt[2] <= high:
+                    break
+        finally:
+            # Cancel the stragglers once a candidate is accepted (or on error)
+            for task in tasks:
+                task.cancel()
+
+        if not attempts:
+            raise errors[0]
+        return attempts
+
+    async def _stream_candidate(self,
+                                messages: List[Dict[str, str]],
+                                level: str,
+                                early_abort: bool,
+                                **kwargs) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream one English attempt, scoring it incrementally as it arrives.
+
+        Args:
+            messages: The chat messages for the attempt
+            level: The difficulty level
+            early_abort: Stop once the running score is confidently out of range
+                or the word count overruns `WORDS_RANGES[level]`
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            ("token", chunk) for each chunk, then ("done", (text, estimate)) where
+            estimate is the prefix score if the attempt was aborted, else None
+        """
+        low, high = LEVEL_RANGES.get(level, (0, 25))
+        word_range = parse_word_range(WORDS_RANGES.get(level))
+        max_words = word_range[1] * \
+            settings.EARLY_ABORT_WORD_SLACK if word_range else None
+        scorer = IncrementalFogScorer()
+        chunks = []
+
+        async with aclosing(self.llm.stream(messages, **kwargs)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield "token", chunk
+                if not early_abort:
+                    continue
+                scorer.feed(chunk)
+                if (max_words is not None and scorer.words > max_words) or scorer.out_of_range(
+                        low, high, settings.EARLY_ABORT_MIN_WORDS, settings.EARLY_ABORT_MARGIN):
+                    log(
+                        f"Aborting attempt after {scorer.words} words (estimated score {scorer.score:.2f})")
+                    yield "done", ("".join(chunks), scorer.score)
+                    return
+
+        yield "done", ("".join(chunks), None)
 
     async def _generate_text_other_languages(self,
                                              topic: str,
@@ -209,29 +652,64 @@ class TextGenerator:
         Returns:
             Dictionary containing the generated text and metadata
         """
+        result = None
+        async for event, data in self._other_language_events(topic, language, level, style):
+            if event == "result":
+                result = data
+        return result
+
+    async def _other_language_events(self,
+                                     topic: str,
+                                     language: str,
+                                     level: str,
+                                     style: str,
+                                     stream_tokens: bool = False) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate a non-English passage in a single call, yielding progress events.
+
+        Args:
+            topic: The topic for the generated text
+            language: The target language
+            level: The difficulty level
+            style: The writing style
+            stream_tokens: Stream the provider output and yield "token" events
+
+        Yields:
+            (event, data) tuples, ending with the "result" event
+        """
         prompt = build_other_language_prompt(topic, level, language, style)
         try:
             messages = [
                 {"role": "system", "content": f"You are a professional language teacher tasked to create a reading passage. Do not give any output besides the text do not include things like 'ok here is your text' or 'here is the text'. Always make sure that generated text is in {language} event the topic is in another language. Make sure that style is {style} and level is {level}."},
                 {"role": "user", "content": prompt}
             ]
-            response = await self.llm.generate(messages)
-            generated_text = response['content']
+            if stream_tokens:
+                chunks = []
+                async for chunk in self.llm.stream(messages):
+                    chunks.append(chunk)
+                    yield "token", {"iteration": 1, "text": chunk}
+                generated_text = "".join(chunks)
+            else:
+                response = await self.llm.generate(messages)
+                generated_text = response['content']
 
             if not generated_text or len(generated_text) < 20:
                 raise ValueError("Generated text is too short or empty.")
 
-            result = GeneratedTextResponse(
-                generated_text=generated_text,
-                level=level,
-                language=language,
-                style=style,
-                iterations=1,
-                prompts_used=[prompt],
-                failed_texts=[]
-            ).model_dump()
-
-            return result
+            with span("serialize"):
+                result = GeneratedTextResponse(
+                    generated_text=generated_text,
+                    level=level,
+                    language=language,
+                    style=style,
+                    iterations=1,
+                    prompts_used=[prompt],
+                    failed_texts=[]
+                ).model_dump()
+        except QueueFullError:
+            raise
         except Exception as e:
             raise Exception(
                 f"Error generating non-English text with model {self.model}: {e}")
+
+        yield "result", result
@@ -0,0 +1,232 @@
+from typing import Any, Deque, Dict, Iterator, List, Optional
+import asyncio
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from Backend.core.settings import settings
+
+REQUEST_ID_HEADER = "x-request-id"
+DEBUG_TRACE_HEADER = "x-debug-trace"
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed step of a request."""
+
+    __slots__ = ("span_id", "parent_id", "name", "start", "end", "attributes", "error")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, attributes: Dict[str, Any]):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes (scores, counts, outcomes) to the span."""
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    """Stands in for a span when the request is not traced."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """The spans and log lines recorded for one request."""
+
+    def __init__(self, trace_id: str, method: str, path: str):
+        self.request_id = trace_id
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.status: Optional[int] = None
+        self.spans: List[Span] = []
+        self.logs: List[Dict[str, Any]] = []
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": _ms(self.duration),
+            "spans": len(self.spans),
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The trace with span offsets and durations in milliseconds from the request start."""
+        spans = [{
+            "id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "start_ms": _ms(span.start - self.start),
+            "duration_ms": _ms(span.end - span.start) if span.end is not None else None,
+            "attributes": span.attributes,
+            "error": span.error,
+        } for span in self.spans]
+        return {**self.summary(), "spans": spans, "logs": self.logs}
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class TraceBuffer:
+    """Ring buffer of the most recent finished traces."""
+
+    def __init__(self, size: int = settings.TRACE_BUFFER_SIZE):
+        self._traces: Deque[Trace] = deque(maxlen=size)
+
+    def add(self, trace: Trace) -> None:
+        self._traces.append(trace)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        for trace in reversed(self._traces):
+            if trace.request_id == trace_id:
+                return trace
+        return None
+
+    def recent(self, limit: int = 50, min_duration_ms: float = 0.0, path: Optional[str] = None) -> List[Trace]:
+        """
+        Most recent traces first.
+
+        Args:
+            limit: Maximum number of traces
+            min_duration_ms: Only traces at least this slow
+            path: Only traces of this request path
+
+        Returns:
+            The matching traces
+        """
+        matches = []
+        for trace in reversed(self._traces):
+            if (trace.duration or 0) * 1000 < min_duration_ms or (path and trace.path != path):
+                continue
+            matches.append(trace)
+            if len(matches) >= limit:
+                break
+        return matches
+
+
+trace_buffer = TraceBuffer()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time a step of the current request.
+
+    Nested spans (also in tasks started inside the span) record this span as
+    their parent. Outside a traced request this costs one context variable
+    lookup.
+
+    Args:
+        name: Span name, e.g. "llm.generate"
+        **attributes: Initial span attributes
+
+    Yields:
+        The span (call `.set(...)` to add attributes)
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(len(trace.spans) + 1, parent.span_id if parent else None, name, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except (GeneratorExit, asyncio.CancelledError):
+        current.attributes["cancelled"] = True
+        raise
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # An async generator finished in a different context than it started in
+            _current_span.set(parent)
+
+
+def log(message: str) -> None:
+    """
+    Print a log line tagged with the current request ID.
+
+    The line is also kept with the request's trace, if it is traced.
+
+    Args:
+        message: The message to print
+    """
+    current_id = request_id.get()
+    print(f"[{current_id}] {message}" if current_id else message)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.logs.append({"at_ms": _ms(time.perf_counter() - trace.start), "message": message})
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware assigning each request an ID and, if sampled, a trace.
+
+    The ID comes from the `X-Request-ID` header or is generated, and is
+    returned in the response's `X-Request-ID` header. Requests are traced
+    with probability TRACE_SAMPLE_RATE, or always with `X-Debug-Trace: 1`;
+    finished traces go to `trace_buffer` and are served by `/debug/traces`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        trace_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")[:64] or uuid.uuid4().hex[:16]
+        forced = headers.get(DEBUG_TRACE_HEADER.encode(), b"").decode("latin-1") in ("1", "true")
+        trace = None
+        if forced or random.random() < settings.TRACE_SAMPLE_RATE:
+            trace = Trace(trace_id, scope.get("method", ""), scope.get("path", ""))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                extra = [(REQUEST_ID_HEADER.encode(), trace_id.encode("latin-1"))]
+                if trace is not None:
+                    trace.status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), *extra]}
+            await send(message)
+
+        id_token = request_id.set(trace_id)
+        trace_token = _current_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(trace_token)
+            request_id.reset(id_token)
+            if trace is not None:
+                trace.duration = time.perf_counter() - trace.start
+                trace_buffer.add(trace)
@@ -76,7 +76,7 @@ const GeneratedContent = ({
             <Button
               className="btn secondary"
               onClick={onGenerateQuestions}
-              disabled={isQuestionsLoading}
+              disabled={isQuestionsLoading || isLoading}
             >
               {isQuestionsLoading ? (
                 <LoadingSpinner text="Generating Questions..." />
@@ -1,4 +1,5 @@
 import { useState } from "react";
+import { apiClient } from "../services/api";
 
 export const useQuestionGeneration = () => {
   const [questions, setQuestions] = useState([]);
@@ -31,21 +32,18 @@ export const useQuestionGeneration = () => {
         model: model, // Include the selected model
       };
 
-      const response = await fetch("http://127.0.0.1:8000/questions/generate", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify(questionsData),
-      });
-
-      if (!response.ok) {
-        throw new Error(
-          `Failed to generate questions: ${response.status} ${response.statusText}`
-        );
-      }
-
-      const data = await response.json();
+      // Show each question as soon as it arrives
+      const data = await apiClient.generateQuestionsStream(
+        questionsData,
+        (index, question) => {
+          setQuestions((current) => {
+            const next = [...current];
+            next[index] = question;
+            return next;
+          });
+          setShowQuestions(true);
+        }
+      );
       setQuestions(data.questions);
       setShowQuestions(true);
       return data.questions;
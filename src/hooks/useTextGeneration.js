@@ -12,7 +12,17 @@ export const useTextGeneration = () => {
     setGeneratedText("");
 
     try {
-      const data = await apiClient.generateText(formData);
+      // Show each attempt as it streams in; a new iteration starts a fresh draft
+      let currentIteration = null;
+      const data = await apiClient.generateTextStream(formData, (event, payload) => {
+        if (event !== "token") return;
+        if (payload.iteration !== currentIteration) {
+          currentIteration = payload.iteration;
+          setGeneratedText(payload.text);
+        } else {
+          setGeneratedText((text) => text + payload.text);
+        }
+      });
       setGeneratedText(data.generated_text);
       return data.generated_text;
     } catch (err) {
@@ -44,6 +44,73 @@ export const apiClient = {
     }
   },
 
+  /**
+   * Generate a reading passage, receiving progress as Server-Sent Events
+   * @param {Object} params - Text generation parameters
+   * @param {Function} onEvent - Called with (event, data) for every "token" and "iteration" event
+   * @returns {Promise<Object>} Generated text response carried by the final "result" event
+   */
+  async generateTextStream(params, onEvent) {
+    try {
+      const response = await fetch(`${API_BASE_URL}/text/generate/stream`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify(params),
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(
+          `Failed to generate text: ${errorData.detail || response.statusText}`
+        );
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let result = null;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+          const frame = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+
+          let event = "message";
+          let data = "";
+          for (const line of frame.split("\n")) {
+            if (line.startsWith("event:")) event = line.slice(6).trim();
+            else if (line.startsWith("data:")) data += line.slice(5).trim();
+          }
+          const payload = data ? JSON.parse(data) : null;
+
+          if (event === "error") {
+            throw new Error(`Failed to generate text: ${payload.detail}`);
+          } else if (event === "result") {
+            result = payload;
+          } else if (onEvent) {
+            onEvent(event, payload);
+          }
+        }
+      }
+
+      if (!result) {
+        throw new Error("Failed to generate text: stream ended without a result");
+      }
+      return result;
+    } catch (error) {
+      console.error("Text generation error:", error);
+      throw error;
+    }
+  },
+
   /**
    * Generate questions for a given text
    * @param {Object} params - Question generation parameters
@@ -72,6 +139,65 @@ export const apiClient = {
     }
   },
 
+  /**
+   * Generate questions, receiving each one as soon as it is complete (NDJSON)
+   * @param {Object} params - Question generation parameters
+   * @param {Function} onQuestion - Called with (index, question) for every streamed question
+   * @returns {Promise<Object>} Generated questions response carried by the final "result" record
+   */
+  async generateQuestionsStream(params, onQuestion) {
+    try {
+      const response = await fetch(`${API_BASE_URL}/questions/generate/stream`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify(params),
+      });
+
+      if (!response.ok) {
+        throw new Error(
+          `Failed to generate questions: ${response.status} ${response.statusText}`
+        );
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let result = null;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let newline;
+        while ((newline = buffer.indexOf("\n")) !== -1) {
+          const line = buffer.slice(0, newline).trim();
+          buffer = buffer.slice(newline + 1);
+          if (!line) continue;
+
+          const { event, data } = JSON.parse(line);
+          if (event === "error") {
+            throw new Error(`Failed to generate questions: ${data.detail}`);
+          } else if (event === "result") {
+            result = data;
+          } else if (event === "question" && onQuestion) {
+            onQuestion(data.index, data.question);
+          }
+        }
+      }
+
+      if (!result) {
+        throw new Error("Failed to generate questions: stream ended without a result");
+      }
+      return result;
+    } catch (error) {
+      console.error("Question generation error:", error);
+      throw error;
+    }
+  },
+
   /**
    * Fetch available models from both Ollama and Groq
    * @returns {Promise<Object>} List of available models